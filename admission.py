@@ -0,0 +1,147 @@
+import threading
+import time
+from flask import g, request, jsonify, make_response
+
+
+class AdmissionController:
+    """
+    提交类请求的准入控制（背压）
+
+    功能:
+    - 限制指定路由同时处理的请求数（max_inflight），超出的请求排队等待
+    - 队列已满或排队超过 queue_timeout 秒时直接返回 503 + Retry-After，
+      由前端稍后自动重试，避免大量请求同时占用数据库连接导致整体吞吐下降
+    - 统计当前处理中、排队数量及拒绝次数，供管理后台查看
+
+    限制按进程生效，多进程部署时总并发为 工作进程数 × max_inflight
+    """
+
+    def __init__(self, enabled=True, endpoints=None, max_inflight=8, max_queue=32,
+                 queue_timeout=2.0, retry_after=2):
+        """
+        Args:
+            enabled: 是否启用
+            endpoints: 受控的路由（endpoint 名），只对 POST 请求生效
+            max_inflight: 同时处理的请求数上限
+            max_queue: 排队请求数上限
+            queue_timeout: 最长排队时间（秒）
+            retry_after: 503 响应的 Retry-After（秒）
+        """
+        self.enabled = enabled
+        self.endpoints = set(endpoints or [])
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._waiting = 0
+        self._stats = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected_full': 0,
+            'rejected_timeout': 0,
+            'peak_inflight': 0,
+            'peak_waiting': 0,
+            'wait_seconds': 0.0,
+        }
+
+    def init_app(self, app):
+        """
+        注册请求钩子
+        """
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def acquire(self):
+        """
+        申请处理名额
+
+        Returns:
+            str or None: 获得名额返回 None，被拒绝时返回原因（'full' / 'timeout'）
+        """
+        with self._cond:
+            if self._inflight < self.max_inflight and self._waiting == 0:
+                self._admit()
+                return None
+
+            if self._waiting >= self.max_queue:
+                self._stats['rejected_full'] += 1
+                return 'full'
+
+            # 排队等待，先到先得由 Condition 唤醒顺序近似保证
+            self._waiting += 1
+            self._stats['queued'] += 1
+            self._stats['peak_waiting'] = max(self._stats['peak_waiting'], self._waiting)
+            start = time.monotonic()
+            try:
+                admitted = self._cond.wait_for(
+                    lambda: self._inflight < self.max_inflight,
+                    timeout=self.queue_timeout
+                )
+            finally:
+                self._waiting -= 1
+                self._stats['wait_seconds'] += time.monotonic() - start
+
+            if not admitted:
+                self._stats['rejected_timeout'] += 1
+                # 超时前恰好被唤醒时，把名额让给下一个排队请求
+                if self._inflight < self.max_inflight:
+                    self._cond.notify()
+                return 'timeout'
+
+            self._admit()
+            return None
+
+    def _admit(self):
+        self._inflight += 1
+        self._stats['admitted'] += 1
+        self._stats['peak_inflight'] = max(self._stats['peak_inflight'], self._inflight)
+
+    def release(self):
+        """
+        释放处理名额并唤醒一个排队请求
+        """
+        with self._cond:
+            self._inflight -= 1
+            self._cond.notify()
+
+    def _before_request(self):
+        if not self.enabled or request.method != 'POST' or request.endpoint not in self.endpoints:
+            return None
+
+        reason = self.acquire()
+        if reason is None:
+            g._admitted = True
+            return None
+
+        message = '提交人数较多，请稍后重试'
+        if request.accept_mimetypes.accept_json and not request.accept_mimetypes.accept_html:
+            response = jsonify({'error': message, 'reason': reason})
+        else:
+            response = make_response(message)
+        response.status_code = 503
+        response.headers['Retry-After'] = str(self.retry_after)
+        return response
+
+    def _teardown_request(self, exc=None):
+        if g.pop('_admitted', False):
+            self.release()
+
+    def stats(self):
+        """
+        当前状态与累计计数
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'enabled': self.enabled,
+                'endpoints': sorted(self.endpoints),
+                'max_inflight': self.max_inflight,
+                'max_queue': self.max_queue,
+                'inflight': self._inflight,
+                'waiting': self._waiting,
+            })
+        stats['avg_wait_ms'] = round(stats.pop('wait_seconds') * 1000 / (stats['queued'] or 1), 1)
+        return stats
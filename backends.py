@@ -0,0 +1,411 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+
+class TrackedConnection(pymysql.connections.Connection):
+    """
+    记录是否提交过事务的连接（用于读写分离的“读己之写”）
+    """
+
+    committed = False
+
+    def commit(self):
+        super().commit()
+        self.committed = True
+
+
+class TimedDictCursor(pymysql.cursors.DictCursor):
+    """
+    带耗时统计的 DictCursor
+
+    功能:
+    - 统计每条语句的执行耗时
+    - 交给连接上挂载的慢查询记录器处理
+    """
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        result = super().execute(query, args)
+        elapsed = time.perf_counter() - start
+
+        slow_log = getattr(self.connection, 'slow_query_log', None)
+        if slow_log is not None:
+            slow_log.observe(query, args, elapsed, explain=lambda: self._explain(query, args))
+        return result
+
+    def _explain(self, query, args):
+        # 使用普通 DictCursor，避免 EXPLAIN 本身再被记录
+        with self.connection.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute('EXPLAIN ' + query, args)
+            return cursor.fetchall()
+
+
+class TimedSSDictCursor(pymysql.cursors.SSDictCursor):
+    """
+    带耗时统计的服务端游标（SSDictCursor），用于逐批读取大结果集
+
+    结果未读完前连接不能执行其他语句，因此慢查询只记录耗时，不执行 EXPLAIN
+    """
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        result = super().execute(query, args)
+        elapsed = time.perf_counter() - start
+
+        slow_log = getattr(self.connection, 'slow_query_log', None)
+        if slow_log is not None:
+            slow_log.observe(query, args, elapsed)
+        return result
+
+
+class MySQLBackend:
+    """
+    MySQL 存储后端（pymysql）
+    """
+
+    name = 'mysql'
+    # 大结果集使用的游标类型
+    streaming_cursor = TimedSSDictCursor
+
+    def __init__(self, config, slow_query_log=None):
+        self.config = config
+        self.slow_query_log = slow_query_log
+
+    def connect(self):
+        """
+        建立新连接，使用 DictCursor 返回字典格式结果
+        """
+        conn = TrackedConnection(
+            host=self.config['host'],
+            port=self.config['port'],
+            user=self.config['user'],
+            password=self.config['password'],
+            database=self.config['database'],
+            charset='utf8mb4',
+            cursorclass=TimedDictCursor
+        )
+        conn.slow_query_log = self.slow_query_log
+        return conn
+
+    def upsert_sql(self, table, columns, keys, updates, touch=None):
+        """
+        生成“插入或更新”语句（ON DUPLICATE KEY UPDATE）
+
+        Args:
+            table: 表名
+            columns: 插入列
+            keys: 唯一键列（MySQL 依据表上的唯一索引，此处仅为接口一致）
+            updates: 冲突时用新值覆盖的列
+            touch: 冲突时刷新为当前时间的列
+        """
+        assignments = [f"{c} = VALUES({c})" for c in updates]
+        if touch:
+            assignments.append(f"{touch} = CURRENT_TIMESTAMP")
+        return (
+            f"INSERT INTO {table}({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+        )
+
+
+class ReplicaSet:
+    """
+    MySQL 只读从库组
+
+    功能:
+    - 只读查询在健康的从库间轮询
+    - 定期检查复制延迟（SHOW REPLICA STATUS），超过 max_lag 秒、复制中断或无法连接的从库暂不使用
+    - 没有可用从库时返回 None，由调用方回退到主库
+    """
+
+    def __init__(self, primary_config, replicas, max_lag=5, check_interval=5, slow_query_log=None):
+        """
+        Args:
+            primary_config: 主库连接参数，从库未填写的项沿用主库
+            replicas: 从库连接参数列表
+            max_lag: 允许的最大复制延迟（秒）
+            check_interval: 延迟检查间隔（秒）
+        """
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.backends = [
+            MySQLBackend({**{k: v for k, v in primary_config.items() if k != 'replicas'}, **replica}, slow_query_log)
+            for replica in replicas
+        ]
+
+        self._lock = threading.Lock()
+        self._next = 0
+        self._checked_at = 0
+        self._status = [{'healthy': False, 'lag': None, 'error': '尚未检查'} for _ in self.backends]
+
+    def _check_one(self, backend):
+        conn = backend.connect()
+        try:
+            with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except pymysql.err.ProgrammingError:
+                    # MySQL 8.0.22 之前的版本
+                    cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone()
+        finally:
+            conn.close()
+
+        if not row:
+            return {'healthy': False, 'lag': None, 'error': '未配置复制'}
+
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        if lag is None:
+            return {'healthy': False, 'lag': None, 'error': '复制未运行'}
+        if lag > self.max_lag:
+            return {'healthy': False, 'lag': lag, 'error': f'复制延迟 {lag} 秒'}
+        return {'healthy': True, 'lag': lag, 'error': None}
+
+    def check(self, force=False):
+        """
+        检查各从库延迟（间隔内只检查一次）
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return
+        if not self._lock.acquire(blocking=False):
+            # 其他线程正在检查，沿用上次结果
+            return
+        try:
+            status = []
+            for backend in self.backends:
+                try:
+                    status.append(self._check_one(backend))
+                except Exception as e:
+                    status.append({'healthy': False, 'lag': None, 'error': str(e)})
+            for old, new, backend in zip(self._status, status, self.backends):
+                if old['healthy'] and not new['healthy']:
+                    logger.warning('从库 %s 不可用：%s', backend.config['host'], new['error'])
+            self._status = status
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def pick(self):
+        """
+        选择一个健康的从库
+
+        Returns:
+            MySQLBackend or None: 无可用从库时返回 None
+        """
+        self.check()
+        healthy = [b for b, st in zip(self.backends, self._status) if st['healthy']]
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next]
+
+    def status(self):
+        return [
+            {'host': b.config['host'], 'port': b.config['port'], **st}
+            for b, st in zip(self.backends, self._status)
+        ]
+
+
+def _dict_factory(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """
+    sqlite3 游标包装，行为与 pymysql DictCursor 保持一致
+
+    - 支持 %s 占位符
+    - 返回字典格式结果
+    - 支持 with 语句
+    - 语句耗时交给慢查询记录器
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._cursor = connection.raw.cursor()
+
+    @staticmethod
+    def _translate(query, args):
+        if args is None:
+            return query
+        return query.replace('%s', '?').replace('%%', '%')
+
+    def execute(self, query, args=None):
+        sql = self._translate(query, args)
+        start = time.perf_counter()
+        self._cursor.execute(sql, tuple(args) if args is not None else ())
+        elapsed = time.perf_counter() - start
+
+        slow_log = self.connection.slow_query_log
+        if slow_log is not None:
+            slow_log.observe(query, args, elapsed, explain=lambda: self._explain(sql, args))
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_args):
+        seq_of_args = [tuple(a) for a in seq_of_args]
+        if not seq_of_args:
+            return 0
+        sql = self._translate(query, seq_of_args[0])
+        start = time.perf_counter()
+        self._cursor.executemany(sql, seq_of_args)
+        elapsed = time.perf_counter() - start
+
+        slow_log = self.connection.slow_query_log
+        if slow_log is not None:
+            slow_log.observe(query, seq_of_args[0], elapsed)
+        return self._cursor.rowcount
+
+    def _explain(self, sql, args):
+        cursor = self.connection.raw.cursor()
+        try:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, tuple(args) if args is not None else ())
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size or self._cursor.arraysize)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteConnection:
+    """
+    sqlite3 连接包装，提供与 pymysql 连接一致的 cursor/commit/rollback/close
+    """
+
+    def __init__(self, raw, slow_query_log=None):
+        self.raw = raw
+        self.slow_query_log = slow_query_log
+        self.committed = False
+
+    def cursor(self, cursorclass=None):
+        return SQLiteCursor(self)
+
+    def commit(self):
+        self.raw.commit()
+        self.committed = True
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteBackend:
+    """
+    嵌入式 SQLite 存储后端
+
+    功能:
+    - WAL 模式，读写互不阻塞
+    - 首次使用时按 jxkh_sqlite.sql 建表（含与 MySQL 一致的索引）
+    - 适合小规模部署及本地测试、基准测试
+    """
+
+    name = 'sqlite'
+    # sqlite3 游标本身按需逐行读取
+    streaming_cursor = None
+
+    SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jxkh_sqlite.sql')
+
+    def __init__(self, config, slow_query_log=None):
+        self.path = config.get('path', 'jxkh.db')
+        self.busy_timeout = config.get('busy_timeout', 5)
+        self.slow_query_log = slow_query_log
+        self._init_schema()
+
+    def _init_schema(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        with open(self.SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            schema = f.read()
+
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        try:
+            raw.execute("PRAGMA journal_mode=WAL")
+            raw.executescript(schema)
+            raw.commit()
+        finally:
+            raw.close()
+
+    def connect(self):
+        """
+        建立新连接（WAL 模式下连接开销很小，沿用每次操作一个连接的用法）
+        """
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        raw.row_factory = _dict_factory
+        raw.execute("PRAGMA synchronous=NORMAL")
+        return SQLiteConnection(raw, self.slow_query_log)
+
+    def upsert_sql(self, table, columns, keys, updates, touch=None):
+        """
+        生成“插入或更新”语句（ON CONFLICT ... DO UPDATE）
+
+        Args:
+            table: 表名
+            columns: 插入列
+            keys: 冲突判定的唯一键列
+            updates: 冲突时用新值覆盖的列
+            touch: 冲突时刷新为当前时间的列
+        """
+        assignments = [f"{c} = excluded.{c}" for c in updates]
+        if touch:
+            assignments.append(f"{touch} = datetime('now', 'localtime')")
+        return (
+            f"INSERT INTO {table}({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {', '.join(assignments)}"
+        )
+
+
+BACKENDS = {
+    'mysql': MySQLBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def create_backend(db_config, slow_query_log=None):
+    """
+    根据 config.yaml 中 database.backend 创建存储后端（默认 mysql）
+    """
+    name = db_config.get('backend', 'mysql')
+    if name not in BACKENDS:
+        raise ValueError(f"不支持的数据库后端: {name}")
+    return BACKENDS[name](db_config.get(name) or {}, slow_query_log)
@@ -0,0 +1,357 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def _file_lock(path, blocking=True):
+    """
+    跨进程文件锁
+
+    Yields:
+        bool: 是否获得锁（blocking=False 时可能为 False）
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+class BallotJournal:
+    """
+    评分提交预写日志（write-behind）
+
+    功能:
+    - 提交时将已校验的评分表追加写入本地日志并 fsync，随即返回
+    - 后台线程按批读取日志，调用 writer 批量写库，成功后推进已提交偏移量
+    - 进程重启后从已提交偏移量继续重放；writer 需按登录码幂等
+    - 多进程共用同一日志：追加与消费分别由文件锁串行化，同一时刻只有一个进程消费
+
+    文件:
+    - {path}          日志，每行一份评分表（JSON）
+    - {path}.offset   清空代数与已写库的字节偏移量
+    - {path}.lock     追加锁
+    - {path}.drain    消费锁
+    """
+
+    def __init__(self, path, writer, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.writer = writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.offset_path = path + '.offset'
+        self.lock_path = path + '.lock'
+        self.drain_path = path + '.drain'
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._pending = {}
+
+        self.last_error = None
+        self.last_drain = None
+        self.drained_total = 0
+
+    # ==================== 写入 ====================
+
+    def _open(self):
+        """
+        打开日志（追加模式）；若上次异常退出留下半行，先补齐换行
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        size = os.fstat(fd).st_size
+        if size:
+            os.lseek(fd, size - 1, os.SEEK_SET)
+            if os.read(fd, 1) != b'\n':
+                os.write(fd, b'\n')
+        return fd
+
+    def submit(self, ballot):
+        """
+        追加一份评分表并落盘
+
+        Args:
+            ballot: {'login_code', 'role_id', 'zdgz': {id: score}, 'myd': {id: score}}
+        """
+        self.ensure_started()
+
+        line = (json.dumps(ballot, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock, _file_lock(self.lock_path):
+            if self._fd is None:
+                self._fd = self._open()
+            os.write(self._fd, line)
+            os.fsync(self._fd)
+            end = os.fstat(self._fd).st_size
+            generation, _ = self._read_offset()
+
+        self._pending[ballot['login_code']] = (generation, end)
+        self._wakeup.set()
+
+    def is_pending(self, login_code):
+        """
+        该登录码的评分是否仍在日志中未写库（含其他进程提交的）
+
+        功能:
+        - 本进程提交的先按记录的位置判断，不读日志
+        - 否则扫描已写库偏移量之后的记录；后台线程持续消费，未写库部分通常很短
+        """
+        position = self._pending.get(login_code)
+        if position is not None:
+            if self._read_offset() < position:
+                return True
+            self._pending.pop(login_code, None)
+
+        # 记录由 submit 以紧凑格式写入，先按字节匹配，命中后再解析确认
+        needle = b'"login_code":' + json.dumps(login_code, ensure_ascii=False).encode('utf-8')
+        _, offset = self._read_offset()
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return False
+        with f:
+            f.seek(offset)
+            for line in f:
+                if needle not in line or not line.endswith(b'\n'):
+                    continue
+                try:
+                    if json.loads(line).get('login_code') == login_code:
+                        return True
+                except ValueError:
+                    continue
+        return False
+
+    # ==================== 消费 ====================
+
+    def _read_offset(self):
+        """
+        Returns:
+            tuple: (清空代数, 已写库偏移量)，可直接比较先后
+        """
+        try:
+            with open(self.offset_path, 'r') as f:
+                generation, offset = f.read().split()
+                return int(generation), int(offset)
+        except (FileNotFoundError, ValueError):
+            return 0, 0
+
+    def _write_offset(self, generation, offset):
+        tmp = self.offset_path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(f'{generation} {offset}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.offset_path)
+
+    def _read_batch(self, offset):
+        """
+        从偏移量开始读取至多 batch_size 行完整记录
+
+        Returns:
+            tuple: (评分表列表, 新偏移量)
+        """
+        ballots = []
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while len(ballots) < self.batch_size:
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    ballots.append(json.loads(line))
+                except ValueError:
+                    logger.error('评分日志存在无法解析的记录，已跳过: %r', line[:200])
+        return ballots, offset
+
+    def _compact(self, generation, offset):
+        """
+        日志已全部写库时清空文件并递增代数，避免无限增长
+        """
+        with _file_lock(self.lock_path):
+            if os.path.getsize(self.path) == offset:
+                os.truncate(self.path, 0)
+                self._write_offset(generation + 1, 0)
+
+    def _drain_locked(self):
+        count = 0
+        while True:
+            if not os.path.exists(self.path):
+                break
+
+            generation, offset = self._read_offset()
+            if os.path.getsize(self.path) < offset:
+                # 日志被外部清理，偏移量归零
+                generation, offset = generation + 1, 0
+                self._write_offset(generation, offset)
+
+            ballots, new_offset = self._read_batch(offset)
+            if new_offset == offset:
+                break
+
+            if ballots:
+                # 同一登录码在一批中多次出现时以最后一次为准
+                latest = {}
+                for b in ballots:
+                    latest[b['login_code']] = b
+                self.writer(list(latest.values()))
+
+            self._write_offset(generation, new_offset)
+            count += len(ballots)
+            self._compact(generation, new_offset)
+
+        if count:
+            self.drained_total += count
+            self.last_drain = time.time()
+        return count
+
+    def drain(self, blocking=False):
+        """
+        将日志中未写库的记录写入数据库
+
+        Args:
+            blocking: 是否等待其他进程的消费结束
+
+        Returns:
+            int: 本次写库的评分表数量
+        """
+        with _file_lock(self.drain_path, blocking=blocking) as locked:
+            if not locked:
+                return 0
+            return self._drain_locked()
+
+    def flush(self):
+        """
+        同步写库直至日志为空（管理员清空数据前调用）
+        """
+        return self.drain(blocking=True)
+
+    # ==================== 后台线程 ====================
+
+    def ensure_started(self):
+        """
+        启动后台消费线程；fork 后的子进程会重新启动自己的线程
+        """
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._fd = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='ballot-journal', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        backoff = self.flush_interval
+        while not self._stop.is_set():
+            self._wakeup.wait(backoff)
+            self._wakeup.clear()
+            try:
+                self.drain()
+                self.last_error = None
+                backoff = self.flush_interval
+            except Exception as e:
+                # 写库失败保留偏移量，退避后重试
+                logger.exception('评分日志写库失败')
+                self.last_error = str(e)
+                backoff = min(backoff * 2, 30)
+
+    def stop(self, timeout=10):
+        """
+        停止后台线程并尽量写完剩余记录
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        try:
+            self.drain()
+        except Exception:
+            logger.exception('评分日志停止前写库失败')
+
+    def backlog(self):
+        """
+        日志积压情况
+
+        Returns:
+            dict: 待写库记录数、字节数、最近写库时间及错误
+        """
+        _, offset = self._read_offset()
+        pending = 0
+        pending_bytes = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if line.endswith(b'\n') and line.strip():
+                        pending += 1
+                        pending_bytes += len(line)
+
+        return {
+            'pending': pending,
+            'pending_bytes': pending_bytes,
+            'committed_offset': offset,
+            'drained_total': self.drained_total,
+            'last_drain': self.last_drain,
+            'last_error': self.last_error
+        }
+
+
+def create_journal(submission_config, writer):
+    """
+    按 config.yaml 的 submission 配置创建评分日志
+
+    Args:
+        submission_config: submission 配置
+        writer: 批量写库函数（Database.save_ballots）
+
+    Returns:
+        BallotJournal or None: direct 模式（同步写库）时返回 None
+    """
+    if submission_config.get('mode', 'direct') != 'journal':
+        return None
+    return BallotJournal(
+        path=submission_config.get('journal_path', 'data/ballots.journal'),
+        writer=writer,
+        batch_size=submission_config.get('batch_size', 500),
+        flush_interval=submission_config.get('flush_interval', 0.5)
+    )
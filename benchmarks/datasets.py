@@ -0,0 +1,172 @@
+"""
+基准测试用的合成数据集
+
+会清空并重建以下表：department、evaluator_role、zdgz、role_zdgz_permission、
+role_dept_permission、login_no、zdgz_score、myd_score，请只在专用库上运行。
+"""
+import random
+import string
+from io import BytesIO
+
+from openpyxl import Workbook
+
+from database import db
+
+SIZES = {
+    'small': {
+        'departments': 10, 'indicators': 50, 'roles': 5,
+        'login_codes': 500, 'zdgz_scores': 10_000, 'myd_scores': 2_000
+    },
+    'medium': {
+        'departments': 30, 'indicators': 300, 'roles': 10,
+        'login_codes': 5_000, 'zdgz_scores': 100_000, 'myd_scores': 20_000
+    },
+    'large': {
+        'departments': 50, 'indicators': 1_000, 'roles': 20,
+        'login_codes': 20_000, 'zdgz_scores': 300_000, 'myd_scores': 100_000
+    },
+    'xlarge': {
+        'departments': 80, 'indicators': 2_000, 'roles': 30,
+        'login_codes': 100_000, 'zdgz_scores': 1_000_000, 'myd_scores': 300_000
+    },
+}
+
+CHUNK = 5_000
+
+TABLES = [
+    'zdgz_score', 'myd_score', 'login_no', 'role_zdgz_permission',
+    'role_dept_permission', 'zdgz', 'evaluator_role', 'department'
+]
+
+
+def _text(rng, length):
+    """
+    生成夹杂不可见字符与多余空行的中文文本，贴近 Excel 导入的真实数据
+    """
+    pieces = []
+    while sum(len(p) for p in pieces) < length:
+        pieces.append(rng.choice(['推进', '完成', '指标', '客户', '存款', '贷款', '风险', '合规']))
+        if rng.random() < 0.02:
+            pieces.append(rng.choice(['\u00A0', '\u3000', '\u200B', '\r\n\r\n\r\n']))
+    return ''.join(pieces)[:length]
+
+
+def _insert_chunks(cursor, sql, rows):
+    for i in range(0, len(rows), CHUNK):
+        cursor.executemany(sql, rows[i:i + CHUNK])
+
+
+def populate(size, seed=42):
+    """
+    按规模生成合成数据并写入数据库
+
+    Args:
+        size: SIZES 中的规模名称
+        seed: 随机种子，保证多次运行数据一致
+    """
+    spec = SIZES[size]
+    rng = random.Random(seed)
+
+    dept_names = [f'部门{i:03d}' for i in range(1, spec['departments'] + 1)]
+    role_names = [f'角色{i:03d}' for i in range(1, spec['roles'] + 1)]
+
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        for table in TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+
+        _insert_chunks(cursor, """
+            INSERT INTO department (id, dept_name, dept_type, enable, work_desc)
+            VALUES (%s, %s, %s, 1, %s)
+        """, [
+            (i + 1, name, 'front' if i % 2 else 'middle', _text(rng, 500))
+            for i, name in enumerate(dept_names)
+        ])
+
+        _insert_chunks(cursor, """
+            INSERT INTO evaluator_role (id, role_name, zdgz_weight)
+            VALUES (%s, %s, %s)
+        """, [(i + 1, name, round(1 / spec['roles'], 2)) for i, name in enumerate(role_names)])
+
+        _insert_chunks(cursor, """
+            INSERT INTO zdgz (id, department, indicator_name, description, work_desc)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [
+            (i + 1, dept_names[i % len(dept_names)], f'指标{i + 1:05d}', _text(rng, 300), _text(rng, 1000))
+            for i in range(spec['indicators'])
+        ])
+
+        # 每个角色可评价约一半部门
+        zdgz_perm = []
+        myd_perm = []
+        for role_id in range(1, spec['roles'] + 1):
+            for dept_id, dept in enumerate(dept_names, start=1):
+                if rng.random() < 0.5:
+                    zdgz_perm.append((role_id, dept))
+                    myd_perm.append((role_id, dept_id, round(rng.uniform(0.1, 1), 2)))
+        _insert_chunks(cursor, "INSERT INTO role_zdgz_permission (role_id, department) VALUES (%s, %s)", zdgz_perm)
+        _insert_chunks(cursor, "INSERT INTO role_dept_permission (role_id, dept_id, myd_weight) VALUES (%s, %s, %s)",
+                       myd_perm)
+
+        alphabet = string.ascii_letters + string.digits
+        codes = []
+        for i in range(spec['login_codes']):
+            account = f'B{i:07d}' + ''.join(rng.choice(alphabet) for _ in range(4))
+            codes.append((rng.randint(1, spec['roles']), account, 'pw', 1 if rng.random() < 0.7 else 0))
+        _insert_chunks(cursor, "INSERT INTO login_no (role_id, account, password, used) VALUES (%s, %s, %s, %s)",
+                       codes)
+
+        scores = [130, 110, 90, 70]
+        zdgz_rows = []
+        n_ind = spec['indicators']
+        for i in range(spec['zdgz_scores']):
+            role_id, account, _, _ = codes[(i // n_ind) % len(codes)]
+            zdgz_rows.append((account, role_id, i % n_ind + 1, rng.choice(scores)))
+        _insert_chunks(cursor, "INSERT INTO zdgz_score (login_code, role_id, zdgz_id, score) VALUES (%s, %s, %s, %s)",
+                       zdgz_rows)
+
+        myd_rows = []
+        n_dept = spec['departments']
+        for i in range(spec['myd_scores']):
+            role_id, account, _, _ = codes[(i // n_dept) % len(codes)]
+            myd_rows.append((account, role_id, i % n_dept + 1, rng.choice(scores)))
+        _insert_chunks(cursor, "INSERT INTO myd_score (login_code, role_id, dept_id, score) VALUES (%s, %s, %s, %s)",
+                       myd_rows)
+
+        conn.commit()
+
+    db.ref_cache.bump()
+    db.ref_cache.bump('scores')
+
+
+def build_zdgz_workbook(size, seed=42):
+    """
+    生成与导入格式一致的重点工作指标 Excel（内存方式）
+
+    Returns:
+        bytes: xlsx 文件内容
+    """
+    spec = SIZES[size]
+    rng = random.Random(seed)
+
+    wb = Workbook()
+    sheet = wb.active
+    sheet.append(['部门', '绩效指标', '指标含义', '完成情况'])
+
+    per_dept = max(1, spec['indicators'] // spec['departments'])
+    for i in range(spec['indicators']):
+        # 同一部门只在首行填写，模拟合并单元格
+        dept = f'部门{i // per_dept + 1:03d}' if i % per_dept == 0 else None
+        sheet.append([dept, f'指标{i + 1:05d}', _text(rng, 300), _text(rng, 900)])
+
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def sample_texts(count=1_000, seed=42):
+    """
+    生成 clean_text 的输入样本
+    """
+    rng = random.Random(seed)
+    return [_text(rng, rng.randint(50, 1000)) for _ in range(count)]
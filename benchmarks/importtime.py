@@ -0,0 +1,94 @@
+"""
+应用启动导入耗时检查（python -X importtime）
+
+用法（在项目根目录执行）:
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --module jxkh --budget-ms 800 --top 15
+
+说明:
+- 在子进程中以 -X importtime 导入应用模块，汇总各顶层包的累计耗时与进程常驻内存
+- 评价人访问的进程不应加载 pandas / openpyxl 等仅导入导出使用的库，
+  一旦被提前导入或总耗时超过 --budget-ms，返回非零退出码
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+# 只应在导入、导出时按需加载的库
+LAZY_MODULES = ('pandas', 'numpy', 'openpyxl', 'xlsxwriter')
+
+# 子进程导入完成后输出常驻内存（KB），仅 Linux / macOS 可用
+RSS_SNIPPET = """
+import json, sys
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss //= 1024
+except ImportError:
+    rss = None
+print(json.dumps({'rss_kb': rss}))
+"""
+
+
+def measure(module):
+    """
+    以 -X importtime 导入模块
+
+    Returns:
+        tuple: ({模块名: 累计耗时微秒}, 常驻内存 KB 或 None)
+    """
+    code = f'import {module}\n{RSS_SNIPPET}'
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f'导入 {module} 失败')
+
+    # stderr 每行格式：import time: self [us] | cumulative | imported package
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+
+    rss = json.loads(proc.stdout.strip().splitlines()[-1])['rss_kb']
+    return timings, rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='应用启动导入耗时检查')
+    parser.add_argument('--module', default='jxkh', help='要检查的模块')
+    parser.add_argument('--budget-ms', type=float, default=1000, help='导入总耗时上限（毫秒）')
+    parser.add_argument('--top', type=int, default=10, help='列出累计耗时最高的顶层包数量')
+    args = parser.parse_args()
+
+    timings, rss = measure(args.module)
+
+    total_ms = timings.get(args.module, 0) / 1000
+    top_level = {name: us for name, us in timings.items() if '.' not in name and name != args.module}
+
+    print(f'{"顶层包":<32}{"累计(ms)":>10}')
+    for name, us in sorted(top_level.items(), key=lambda x: -x[1])[:args.top]:
+        print(f'{name:<32}{us / 1000:>10.1f}')
+    print(f'\n导入 {args.module} 共 {total_ms:.1f} ms'
+          + (f'，常驻内存 {rss / 1024:.1f} MB' if rss else ''))
+
+    failed = False
+    eager = [m for m in LAZY_MODULES if m in timings]
+    if eager:
+        print(f'启动时不应加载: {", ".join(eager)}')
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f'导入耗时超过上限 {args.budget_ms:.0f} ms')
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+基础数据缓存内存占用测量（重点工作指标、满意度部门）
+
+用法（在项目根目录执行，config.yaml 需指向专用测试库，可使用 sqlite 后端）:
+    python -m benchmarks.memory --size large --populate --yes
+    python -m benchmarks.memory --size xlarge
+
+说明:
+- 每种表示方式在独立子进程中测量，模拟一个工作进程：导入应用、完成预热后的峰值常驻内存
+- dict 为 DictCursor 逐行字典，records 为当前使用的 __slots__ 只读记录
+- 另用 tracemalloc 统计两种表示方式下缓存数据本身占用的内存
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from benchmarks import datasets
+
+# 子进程：按指定表示方式加载基础数据，输出峰值常驻内存与数据占用（KB）
+WORKER_SNIPPET = """
+import json, sys, tracemalloc
+mode = sys.argv[1]
+
+import jxkh
+from database import Database, db
+
+def fetch(sql):
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+if mode == 'dict':
+    # 还原为逐行字典后再预热，其余缓存与 records 模式一致
+    db.ref_cache.sync()
+    db.ref_cache.get(('zdgz',), ('get_zdgz',), lambda: fetch(
+        "SELECT id, department, indicator_name, work_desc, description, evidence_path FROM zdgz ORDER BY department, id"))
+    db.ref_cache.get(('department',), ('get_departments',), lambda: fetch(
+        "SELECT id, dept_name, dept_type, enable, work_desc FROM department WHERE enable = 1 ORDER BY dept_type, id"))
+
+tracemalloc.start()
+zdgz = Database.get_zdgz.__wrapped__(db) if mode == 'records' else fetch(
+    "SELECT id, department, indicator_name, work_desc, description, evidence_path FROM zdgz ORDER BY department, id")
+departments = Database.get_departments.__wrapped__(db) if mode == 'records' else fetch(
+    "SELECT id, dept_name, dept_type, enable, work_desc FROM department WHERE enable = 1 ORDER BY dept_type, id")
+data_kb = tracemalloc.get_traced_memory()[0] // 1024
+tracemalloc.stop()
+del zdgz, departments
+
+if not jxkh.warm_up():
+    raise SystemExit('预热失败')
+
+import resource
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == 'darwin':
+    rss //= 1024
+print(json.dumps({'indicators': len(db.get_zdgz()), 'departments': len(db.get_departments()),
+                  'data_kb': data_kb, 'rss_kb': rss}))
+"""
+
+
+def measure(mode):
+    """
+    在子进程中测量一种表示方式
+
+    Returns:
+        dict: indicators / departments / data_kb / rss_kb
+    """
+    proc = subprocess.run(
+        [sys.executable, '-c', WORKER_SNIPPET, mode],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f'测量 {mode} 失败')
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='基础数据缓存内存占用测量')
+    parser.add_argument('--size', default='large', help='数据规模：' + ','.join(datasets.SIZES))
+    parser.add_argument('--populate', action='store_true', help='运行前按规模重建数据')
+    parser.add_argument('--yes', action='store_true', help='确认清空测试库数据')
+    args = parser.parse_args()
+
+    if args.size not in datasets.SIZES:
+        parser.error(f'未知规模: {args.size}')
+    if args.populate:
+        if not args.yes:
+            parser.error('--populate 会清空测试库数据，请确认后加 --yes 运行')
+        print(f'[{args.size}] 生成数据 ...', flush=True)
+        datasets.populate(args.size)
+
+    results = {mode: measure(mode) for mode in ('dict', 'records')}
+
+    first = results['records']
+    print(f'指标 {first["indicators"]} 条，部门 {first["departments"]} 个\n')
+    print(f'{"表示方式":<12}{"数据占用(KB)":>14}{"峰值常驻(MB)":>14}')
+    for mode, r in results.items():
+        print(f'{mode:<12}{r["data_kb"]:>14}{r["rss_kb"] / 1024:>14.1f}')
+
+    saved = results['dict']['data_kb'] - results['records']['data_kb']
+    print(f'\n每个工作进程节省约 {saved} KB 基础数据内存')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Database 方法与导出构建的微基准测试
+
+用法（在项目根目录执行，config.yaml 需指向专用测试库，可使用 sqlite 后端）:
+    python -m benchmarks.run --sizes small,medium --populate --yes --save baseline
+    python -m benchmarks.run --sizes small,medium --compare baseline
+
+说明:
+- --populate 会按规模清空并重建数据（需 --yes 确认）
+- --save NAME 将结果写入 benchmarks/baselines/NAME.json
+- --compare NAME 与基线对比，任一用例中位数变慢超过 --threshold 倍时返回非零退出码
+- 运行期间关闭汇总查询合并（singleflight），每轮都执行实际查询
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from io import BytesIO
+
+from benchmarks import datasets
+from database import Database, db
+from login_code import export_login_codes
+from zdgz_import import parse_zdgz_workbook
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+
+def _cases(size):
+    """
+    构造某一规模下的用例列表
+
+    Returns:
+        list: [(名称, 无参可调用对象), ...]
+    """
+    texts = datasets.sample_texts()
+    workbook = datasets.build_zdgz_workbook(size)
+
+    def clean_texts():
+        for t in texts:
+            db.clean_text(t)
+
+    # 基础数据读取带进程内缓存，另测不经缓存的查询耗时
+    return [
+        ('get_zdgz', db.get_zdgz),
+        ('get_zdgz_uncached', lambda: Database.get_zdgz.__wrapped__(db)),
+        ('get_departments', db.get_departments),
+        ('get_role_zdgz_permissions', db.get_role_zdgz_permissions),
+        ('get_role_zdgz_permissions_uncached', lambda: Database.get_role_zdgz_permissions.__wrapped__(db)),
+        ('get_myd_permissions', db.get_myd_permissions),
+        ('get_zdgz_score_summary', db.get_zdgz_score_summary),
+        ('get_myd_score_summary', db.get_myd_score_summary),
+        ('get_login_code_stats_by_role', db.get_login_code_stats_by_role),
+        ('export_zdgz_score_excel', db.export_zdgz_score_excel),
+        ('export_myd_score_excel', db.export_myd_score_excel),
+        ('export_login_codes', export_login_codes),
+        ('clean_text_x1000', clean_texts),
+        ('parse_zdgz_workbook', lambda: parse_zdgz_workbook(BytesIO(workbook))),
+    ]
+
+
+def measure(func, rounds, warmup=1):
+    """
+    多轮计时
+
+    Returns:
+        dict: 中位数 / 最小值 / 平均值（秒）与轮数
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'median_s': round(statistics.median(timings), 6),
+        'min_s': round(min(timings), 6),
+        'mean_s': round(statistics.mean(timings), 6),
+        'rounds': rounds
+    }
+
+
+def run(sizes, rounds, populate, only=None):
+    # 汇总查询的合并会在 fresh_seconds 内复用上一轮结果（导出用例同样调用汇总查询），
+    # 基准测试期间关闭，每轮都测量实际查询耗时
+    db.singleflight.enabled = False
+
+    results = {}
+    for size in sizes:
+        if populate:
+            print(f'[{size}] 生成数据 ...', flush=True)
+            start = time.perf_counter()
+            datasets.populate(size)
+            print(f'[{size}] 数据生成耗时 {time.perf_counter() - start:.1f}s')
+
+        results[size] = {}
+        for name, func in _cases(size):
+            if only and name not in only:
+                continue
+            r = measure(func, rounds)
+            results[size][name] = r
+            print(f'[{size}] {name:<32} median {r["median_s"] * 1000:>10.2f} ms   min {r["min_s"] * 1000:>10.2f} ms')
+    return results
+
+
+def compare(current, baseline, threshold):
+    """
+    与基线对比，打印比值
+
+    Returns:
+        list: 超过阈值的 (规模, 用例, 比值)
+    """
+    regressions = []
+    print(f'\n{"规模":<8}{"用例":<34}{"基线(ms)":>12}{"本次(ms)":>12}{"比值":>8}')
+    for size, cases in current.items():
+        for name, r in cases.items():
+            base = baseline.get('results', {}).get(size, {}).get(name)
+            if not base:
+                continue
+            ratio = r['median_s'] / base['median_s'] if base['median_s'] else float('inf')
+            flag = '  <-- 变慢' if ratio > threshold else ''
+            print(f'{size:<8}{name:<34}{base["median_s"] * 1000:>12.2f}{r["median_s"] * 1000:>12.2f}'
+                  f'{ratio:>8.2f}{flag}')
+            if ratio > threshold:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database 方法与导出构建微基准')
+    parser.add_argument('--sizes', default='small', help='逗号分隔：' + ','.join(datasets.SIZES))
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--only', help='逗号分隔，只运行指定用例')
+    parser.add_argument('--populate', action='store_true', help='运行前按规模重建数据')
+    parser.add_argument('--yes', action='store_true', help='确认清空测试库数据')
+    parser.add_argument('--save', metavar='NAME', help='保存为基线 benchmarks/baselines/NAME.json')
+    parser.add_argument('--compare', metavar='NAME', help='与指定基线对比')
+    parser.add_argument('--threshold', type=float, default=1.25, help='判定为回退的中位数比值')
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    unknown = [s for s in sizes if s not in datasets.SIZES]
+    if unknown:
+        parser.error(f'未知规模: {", ".join(unknown)}')
+    if args.populate and not args.yes:
+        parser.error('--populate 会清空测试库数据，请确认后加 --yes 运行')
+
+    only = set(args.only.split(',')) if args.only else None
+    results = run(sizes, args.rounds, args.populate, only)
+
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'results': results
+    }
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f'{args.save}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n结果已保存到 {path}')
+
+    if args.compare:
+        path = os.path.join(BASELINE_DIR, f'{args.compare}.json')
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} 个用例超过 {args.threshold} 倍阈值')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+静态资源构建：压缩、文件名加指纹、预压缩
+
+用法（在项目根目录执行，修改 static 下的文件后需重新构建）:
+    python build_static.py
+    python build_static.py --clean
+
+说明:
+- 读取 static/ 下除 dist/ 外的全部文件，输出到 static/dist/
+- css / js 压缩（已是 .min. 的文件原样保留）；安装了 rcssmin / rjsmin 时使用它们，
+  否则 css 使用内置的保守压缩，js 原样输出（逐行处理会改变多行模板字符串的内容）
+- 输出文件名带内容哈希，如 css/index.3fa2b1c0de.css，可设置永久缓存
+- 文本类文件同时生成 .gz，安装了 brotli 时再生成 .br
+- static/dist/manifest.json 记录 原路径 -> {构建后路径, 源文件哈希}，由 static_assets.py 读取；
+  源文件修改后未重新构建的条目不会被使用
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST = 'manifest.json'
+
+# 需要预压缩的文本类文件
+COMPRESSIBLE = {'.css', '.js', '.svg', '.json', '.txt', '.map', '.html'}
+
+# 小于该字节数的文件压缩收益不大，不生成压缩版本
+MIN_COMPRESS_SIZE = 512
+
+
+def minify_css(text):
+    try:
+        import rcssmin
+        return rcssmin.cssmin(text)
+    except ImportError:
+        pass
+
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    text = re.sub(r':\s+', ':', text)
+    text = text.replace(';}', '}')
+    return text.strip() + '\n'
+
+
+def minify_js(text):
+    try:
+        import rjsmin
+        return rjsmin.jsmin(text)
+    except ImportError:
+        # 不解析语法无法区分注释与模板字符串内容，原样输出，由预压缩减小体积
+        return text
+
+
+def process(rel_path, data):
+    """
+    压缩单个文件
+
+    Returns:
+        bytes: 处理后的内容
+    """
+    name = os.path.basename(rel_path)
+    ext = os.path.splitext(name)[1].lower()
+    if '.min.' in name or ext not in ('.css', '.js'):
+        return data
+
+    text = data.decode('utf-8')
+    text = minify_css(text) if ext == '.css' else minify_js(text)
+    return text.encode('utf-8')
+
+
+def source_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def fingerprint(rel_path, data):
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    root, ext = os.path.splitext(rel_path)
+    return f'{root}.{digest}{ext}'
+
+
+def compress(path, data):
+    """
+    生成预压缩版本
+
+    Returns:
+        list: 生成的编码
+    """
+    encodings = []
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return encodings
+
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gz)
+        encodings.append('gzip')
+
+    try:
+        import brotli
+    except ImportError:
+        return encodings
+
+    br = brotli.compress(data, quality=11)
+    if len(br) < len(data):
+        with open(path + '.br', 'wb') as f:
+            f.write(br)
+        encodings.append('br')
+    return encodings
+
+
+def build(clean=False):
+    if clean and os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    total_in = total_out = total_gz = 0
+
+    for root, dirs, files in os.walk(STATIC_DIR):
+        if os.path.abspath(root) == STATIC_DIR and 'dist' in dirs:
+            dirs.remove('dist')
+
+        for name in sorted(files):
+            src = os.path.join(root, name)
+            rel_path = os.path.relpath(src, STATIC_DIR).replace(os.sep, '/')
+
+            with open(src, 'rb') as f:
+                data = f.read()
+            out = process(rel_path, data)
+            hashed = fingerprint(rel_path, out)
+
+            dest = os.path.join(DIST_DIR, hashed)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest, 'wb') as f:
+                f.write(out)
+            encodings = compress(dest, out)
+
+            manifest[rel_path] = {'file': 'dist/' + hashed, 'source': source_hash(data)}
+            total_in += len(data)
+            total_out += len(out)
+            total_gz += os.path.getsize(dest + '.gz') if 'gzip' in encodings else len(out)
+            print(f'{rel_path:<40} {len(data):>9,} -> {len(out):>9,}  {",".join(encodings)}')
+
+    with open(os.path.join(DIST_DIR, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    print(f'\n共 {len(manifest)} 个文件：原始 {total_in:,} 字节，压缩后 {total_out:,} 字节，gzip 后 {total_gz:,} 字节')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='静态资源构建')
+    parser.add_argument('--clean', action='store_true', help='构建前删除 static/dist')
+    args = parser.parse_args()
+    build(args.clean)
+
+
+if __name__ == '__main__':
+    main()
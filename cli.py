@@ -0,0 +1,292 @@
+"""
+考核轮次命令行工具（直接连接数据库，不经过 Web 服务）
+
+用法（在项目根目录执行，读取 config.yaml 中的数据库配置）:
+    python cli.py db upgrade                        # 已有数据库升级：补建新版本增加的表与索引
+    python cli.py roles
+    python cli.py codes generate 行领导=50 员工代表=20000 --yes
+    python cli.py codes export 登录码.xlsx          # 或 .csv
+    python cli.py zdgz import 重点工作指标.xlsx --yes
+    python cli.py scores export 绩效考核评分汇总.xlsx
+    python cli.py scores report-pack 各部门绩效考核结果.zip --workers 4
+    python cli.py scores clear --yes
+    python cli.py evidence migrate --yes            # 本地佐证材料上传到 config.yaml 配置的存储
+
+说明:
+- 适合大批量操作：不受请求超时与上传大小限制
+- 生成登录码、导入指标按批提交，导出逐批读取、边读边写文件
+- 会清空现有数据的命令需显式传入 --yes
+- 安装了 tqdm 时显示进度条，否则输出单行进度
+"""
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+from ballot_journal import create_journal
+from database import db
+from login_code import generate_login_codes_by_role, export_login_codes_to_file, reset_round
+from zdgz_import import iter_zdgz_rows, replace_zdgz
+
+
+class Progress:
+    """
+    命令行进度显示
+    """
+
+    def __init__(self, desc, total=None, unit='条'):
+        self.desc = desc
+        self.total = total
+        self.done = 0
+        self._printed_at = 0
+        self._printed = None
+        try:
+            from tqdm import tqdm
+            self._bar = tqdm(desc=desc, total=total, unit=unit, file=sys.stderr)
+        except ImportError:
+            self._bar = None
+
+    def update_to(self, done, total=None):
+        if total is not None:
+            self.total = total
+        if self._bar is not None:
+            self._bar.total = self.total
+            self._bar.update(done - self.done)
+            self.done = done
+            return
+
+        self.done = done
+        now = time.monotonic()
+        if now - self._printed_at >= 0.2 or done == self.total:
+            self._printed_at = now
+            self._print()
+
+    def _print(self):
+        if self._printed == (self.done, self.total):
+            return
+        self._printed = (self.done, self.total)
+        if self.total:
+            sys.stderr.write(f'\r{self.desc} {self.done}/{self.total} ({self.done * 100 // self.total}%)')
+        else:
+            sys.stderr.write(f'\r{self.desc} {self.done}')
+        sys.stderr.flush()
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+        else:
+            self._print()
+            sys.stderr.write('\n')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _confirm(args, message):
+    if not args.yes:
+        raise SystemExit(f'{message}，确认执行请加 --yes')
+
+
+def _load_config():
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _journal():
+    """
+    评分日志（journal 模式时），清空评分前先写完其中的记录
+    """
+    return create_journal(_load_config().get('submission') or {}, db.save_ballots)
+
+
+# ==================== 命令 ====================
+
+def cmd_roles(args):
+    for r in db.get_roles():
+        print(f"{r['id']}\t{r['role_name']}\tzdgz_weight={r['zdgz_weight']}")
+
+
+def cmd_db_upgrade(args):
+    applied = db.upgrade_schema()
+    print('已补建：' + '、'.join(applied) if applied else '表结构已是最新')
+
+
+def cmd_codes_generate(args):
+    roles = db.get_roles()
+    by_name = {r['role_name']: r['id'] for r in roles}
+    by_id = {str(r['id']): r['id'] for r in roles}
+
+    role_count_map = {}
+    for spec in args.counts:
+        role, sep, count = spec.rpartition('=')
+        role_id = by_name.get(role, by_id.get(role))
+        if not sep or role_id is None or not count.isdigit():
+            raise ValueError(f'参数格式应为 角色名或角色ID=数量：{spec}')
+        if role_id in role_count_map:
+            raise ValueError(f'角色重复：{spec}')
+        role_count_map[role_id] = int(count)
+
+    _confirm(args, '将删除全部评分、评分草稿及现有登录码并重新生成')
+
+    reset_round(_journal())
+    with Progress('生成登录码', sum(role_count_map.values())) as progress:
+        generate_login_codes_by_role(role_count_map, progress=progress.update_to, batch_size=args.batch_size)
+    print(f'已生成 {sum(role_count_map.values())} 个登录码')
+
+
+def cmd_codes_export(args):
+    with Progress('导出登录码') as progress:
+        count = export_login_codes_to_file(args.output, progress=progress.update_to)
+    print(f'已导出 {count} 个登录码到 {args.output}')
+
+
+def cmd_zdgz_import(args):
+    _confirm(args, '将用文件内容替换全部重点工作指标')
+
+    # 边读边写，单个事务；任一行校验失败时回滚，原有指标不变
+    with Progress('导入重点工作指标') as progress:
+        count = replace_zdgz(iter_zdgz_rows(args.file), progress=progress.update_to, batch_size=args.batch_size)
+    print(f'已导入 {count} 条重点工作指标')
+
+
+def cmd_scores_export(args):
+    with Progress('导出评分汇总', 3, unit='步') as progress:
+        db.export_score_workbook(args.output, progress=lambda done, total, message: progress.update_to(done, total))
+    print(f'已导出到 {args.output}')
+
+
+def cmd_scores_report_pack(args):
+    from report_pack import iter_report_pack
+    from zip_stream import zip_stream
+
+    zdgz_summary = db.get_zdgz_score_summary()
+    myd_summary = db.get_myd_score_summary()
+    departments = {r['dept_name'] for r in zdgz_summary} | {r['dept_name'] for r in myd_summary}
+
+    with Progress('生成各部门结果', len(departments), unit='个') as progress:
+        def entries():
+            for n, entry in enumerate(iter_report_pack(zdgz_summary, myd_summary, args.workers), start=1):
+                yield entry
+                progress.update_to(n)
+
+        with open(args.output, 'wb') as f:
+            for chunk in zip_stream(entries()):
+                f.write(chunk)
+    print(f'已导出 {len(departments)} 个部门的结果到 {args.output}')
+
+
+def cmd_scores_clear(args):
+    _confirm(args, '将删除全部评分记录')
+    journal = _journal()
+    if journal:
+        journal.flush()  # 先写完日志中的评分，避免清空后被重放
+    db.clear_all_scores()
+    print('已清空全部评分记录')
+
+
+def cmd_evidence_migrate(args):
+    from evidence_storage import LocalStorage, create_storage
+
+    storage_config = _load_config().get('evidence_storage') or {}
+    target = create_storage(storage_config, os.path.dirname(os.path.abspath(__file__)))
+    if target.name == 'local':
+        raise ValueError('evidence_storage.backend 为 local，无需迁移')
+
+    source = LocalStorage(args.root or os.path.dirname(os.path.abspath(__file__)))
+    keys = sorted({item['evidence_path'] for item in db.get_zdgz() if item['evidence_path']})
+    _confirm(args, f'将上传 {len(keys)} 个佐证材料到 {target.name} 存储（同名对象覆盖）')
+
+    missing = []
+    with Progress('迁移佐证材料', len(keys), unit='个') as progress:
+        for n, key in enumerate(keys, start=1):
+            try:
+                with source.open(key) as f:
+                    target.save(key, f)
+            except FileNotFoundError:
+                missing.append(key)
+            progress.update_to(n)
+
+    print(f'已迁移 {len(keys) - len(missing)} 个佐证材料')
+    for key in missing:
+        print(f'本地文件不存在：{key}')
+
+
+# ==================== 入口 ====================
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='考核轮次命令行工具')
+    sub = parser.add_subparsers(dest='group', required=True)
+
+    # ===== 数据库 =====
+    database = sub.add_parser('db', help='数据库').add_subparsers(dest='command', required=True)
+
+    p = database.add_parser('upgrade', help='补建新版本增加的表与索引（可重复执行）')
+    p.set_defaults(func=cmd_db_upgrade)
+
+    p = sub.add_parser('roles', help='列出评价角色')
+    p.set_defaults(func=cmd_roles)
+
+    # ===== 登录码 =====
+    codes = sub.add_parser('codes', help='登录码').add_subparsers(dest='command', required=True)
+
+    p = codes.add_parser('generate', help='按角色生成登录码（清空评分、评分草稿及现有登录码）')
+    p.add_argument('counts', nargs='+', metavar='角色=数量', help='角色名或角色ID=数量')
+    p.add_argument('--batch-size', type=int, default=1000, help='每批写入条数')
+    p.add_argument('--yes', action='store_true', help='确认清空评分、评分草稿及现有登录码')
+    p.set_defaults(func=cmd_codes_generate)
+
+    p = codes.add_parser('export', help='导出登录码到 .xlsx / .csv')
+    p.add_argument('output')
+    p.set_defaults(func=cmd_codes_export)
+
+    # ===== 重点工作指标 =====
+    zdgz = sub.add_parser('zdgz', help='重点工作指标').add_subparsers(dest='command', required=True)
+
+    p = zdgz.add_parser('import', help='从 Excel 导入（替换全部指标）')
+    p.add_argument('file')
+    p.add_argument('--batch-size', type=int, default=1000, help='每批写入条数')
+    p.add_argument('--yes', action='store_true', help='确认替换现有指标')
+    p.set_defaults(func=cmd_zdgz_import)
+
+    # ===== 评分 =====
+    scores = sub.add_parser('scores', help='评分结果').add_subparsers(dest='command', required=True)
+
+    p = scores.add_parser('export', help='导出评分汇总 Excel')
+    p.add_argument('output')
+    p.set_defaults(func=cmd_scores_export)
+
+    p = scores.add_parser('report-pack', help='导出各部门结果工作簿（ZIP）')
+    p.add_argument('output')
+    p.add_argument('--workers', type=int, default=None, help='并行进程数，默认 CPU 核数')
+    p.set_defaults(func=cmd_scores_report_pack)
+
+    p = scores.add_parser('clear', help='清空全部评分记录')
+    p.add_argument('--yes', action='store_true', help='确认删除')
+    p.set_defaults(func=cmd_scores_clear)
+
+    # ===== 佐证材料 =====
+    evidence = sub.add_parser('evidence', help='佐证材料').add_subparsers(dest='command', required=True)
+
+    p = evidence.add_parser('migrate', help='本地佐证材料上传到配置的对象存储')
+    p.add_argument('--root', help='本地存储根目录，默认项目目录')
+    p.add_argument('--yes', action='store_true', help='确认上传')
+    p.set_defaults(func=cmd_evidence_migrate)
+
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        args.func(args)
+    except ValueError as e:
+        raise SystemExit(f'错误：{e}')
+
+
+if __name__ == '__main__':
+    main()
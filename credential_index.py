@@ -0,0 +1,65 @@
+import hashlib
+import hmac
+
+# 登录校验结果
+OK = 'ok'
+INVALID = 'invalid'
+USED = 'used'
+WRONG_PASSWORD = 'wrong_password'
+
+
+def _digest(password):
+    return hashlib.sha256(password.encode('utf-8')).digest()
+
+
+class CredentialIndex:
+    """
+    登录码内存索引：账号 -> (角色ID, 密码摘要)，另记已使用的账号
+
+    功能:
+    - 登录校验在内存中完成，无效登录码、错误密码不访问数据库
+    - 只保存密码摘要，比较时使用常量时间比较
+    - 由 Database.get_credential_index() 按 login_code 缓存分组加载，
+      重新生成登录码后各进程自动重建
+    """
+
+    __slots__ = ('_entries', '_used')
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: 可迭代的 {'account', 'role_id', 'password', 'used'}
+        """
+        self._entries = {}
+        self._used = set()
+        for r in rows:
+            self._entries[r['account']] = (r['role_id'], _digest(r['password']))
+            if r['used'] == 1:
+                self._used.add(r['account'])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def check(self, account, password):
+        """
+        校验登录码与密码
+
+        Returns:
+            tuple: (校验结果, 角色ID)，校验结果为 OK / INVALID / USED / WRONG_PASSWORD
+        """
+        entry = self._entries.get(account)
+        if entry is None:
+            return INVALID, None
+
+        role_id, digest = entry
+        if account in self._used:
+            return USED, role_id
+        if not hmac.compare_digest(digest, _digest(password)):
+            return WRONG_PASSWORD, role_id
+        return OK, role_id
+
+    def mark_used(self, accounts):
+        """
+        标记登录码已使用（本进程保存评分后调用）
+        """
+        self._used.update(a for a in accounts if a in self._entries)
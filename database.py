@@ -1,12 +1,19 @@
+import threading
+import time
 import yaml
-import pymysql
 from contextlib import contextmanager
-import pandas as pd
+from backends import create_backend, ReplicaSet
+from slow_query import SlowQueryLog
+from ref_cache import GROUPS, RefCache, cached, invalidates
+from ref_records import ZdgzRecord, DepartmentRecord, build_records
+from singleflight import SingleFlight, coalesced
+from credential_index import CredentialIndex, OK, INVALID, USED, WRONG_PASSWORD
+from permissions import PermissionMatrix
 import re
 
 class Database:
     """
-    数据库操作类，封装所有与 MySQL 交互的逻辑。
+    数据库操作类，封装所有与数据库（MySQL / SQLite）交互的逻辑。
 
     功能包括：
     - 用户登录验证与日志记录
@@ -21,32 +28,117 @@ class Database:
         初始化数据库配置
 
         功能:
-        - 从 config.yaml 加载 MySQL 连接参数
+        - 从 config.yaml 加载存储后端及连接参数（默认 MySQL）
+        - 初始化慢查询记录器
+        - 初始化基础数据缓存（跨进程按版本号失效）
+        - 配置了 MySQL 从库时启用读写分离
         """
         with open('config.yaml', 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)['database']['mysql']
+            db_config = yaml.safe_load(f)['database']
+
+        self.config = db_config.get('mysql')
+
+        slow_config = db_config.get('slow_query') or {}
+        self.slow_query_log = SlowQueryLog(
+            threshold_ms=slow_config.get('threshold_ms', 200),
+            max_entries=slow_config.get('max_entries', 500),
+            explain=slow_config.get('explain', True)
+        )
+
+        self.backend = create_backend(db_config, self.slow_query_log)
+
+        # 读写分离：统计汇总类只读查询走从库，刚写过数据的线程在 sticky_seconds 内仍读主库
+        replication = db_config.get('replication') or {}
+        self.replicas = None
+        if self.backend.name == 'mysql' and self.config.get('replicas'):
+            self.replicas = ReplicaSet(
+                self.config,
+                self.config['replicas'],
+                max_lag=replication.get('max_lag_seconds', 5),
+                check_interval=replication.get('check_interval', 5),
+                slow_query_log=self.slow_query_log
+            )
+        self.sticky_seconds = replication.get('sticky_seconds', 5)
+        self._local = threading.local()
+
+        cache_config = db_config.get('ref_cache') or {}
+        self.ref_cache = RefCache(
+            self,
+            enabled=cache_config.get('enabled', True),
+            max_age=cache_config.get('max_age', 1.0)
+        )
+
+        # 评分汇总等耗时查询：并发的相同调用合并为一次，结果在 fresh_seconds 内复用
+        singleflight_config = db_config.get('singleflight') or {}
+        self.singleflight = SingleFlight(
+            enabled=singleflight_config.get('enabled', True),
+            fresh_seconds=singleflight_config.get('fresh_seconds', 2.0)
+        )
+
+    def pin_primary(self, pinned):
+        """
+        设置当前线程（请求）是否只读主库，每个请求开始时调用
+
+        Args:
+            pinned: 会话最近写过数据时为 True
+        """
+        self._local.pinned = pinned
+
+    def wrote_since(self, since):
+        """
+        当前线程在 since（time.monotonic()）之后是否提交过写操作
+        """
+        return getattr(self._local, 'wrote_at', None) is not None and self._local.wrote_at >= since
+
+    def primary_only(self):
+        """
+        当前线程的只读查询是否必须读主库（会话或线程最近写过数据）
+        """
+        if getattr(self._local, 'pinned', False):
+            return True
+        wrote_at = getattr(self._local, 'wrote_at', None)
+        return wrote_at is not None and time.monotonic() - wrote_at < self.sticky_seconds
+
+    def _read_backend(self):
+        """
+        选择只读查询使用的后端
+
+        Returns:
+            后端对象；需读主库或无可用从库时返回 None
+        """
+        if self.replicas is None or self.primary_only():
+            return None
+        return self.replicas.pick()
 
     @contextmanager
-    def get_connection(self):
+    def get_connection(self, readonly=False):
         """
         数据库连接上下文管理器
 
         功能:
         - 自动建立并关闭数据库连接
         - 使用 DictCursor 返回字典格式结果
+        - 语句耗时统计，超过阈值记入慢查询日志
+        - readonly=True 时优先使用从库，从库不可用时回退主库
+
+        Args:
+            readonly: 是否为可接受复制延迟的只读查询
         """
-        conn = pymysql.connect(
-            host=self.config['host'],
-            port=self.config['port'],
-            user=self.config['user'],
-            password=self.config['password'],
-            database=self.config['database'],
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
-        )
+        conn = None
+        replica = self._read_backend() if readonly else None
+        if replica is not None:
+            try:
+                conn = replica.connect()
+            except Exception:
+                self.replicas.check(force=True)
+        if conn is None:
+            conn = self.backend.connect()
+
         try:
             yield conn
         finally:
+            if conn.committed:
+                self._local.wrote_at = time.monotonic()
             conn.close()
 
     def clean_text(self, value):
@@ -110,6 +202,55 @@ class Database:
                 sql = "UPDATE login_no SET used=1 WHERE account=%s"
                 cursor.execute(sql, (login_code,))
                 conn.commit()
+        self._mark_credentials_used([login_code])
+
+    @cached('login_code')
+    def get_credential_index(self):
+        """
+        获取登录码内存索引（按 login_code 分组缓存，重新生成登录码后重建）
+
+        Returns:
+            CredentialIndex: 登录码索引
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT account, role_id, password, used FROM login_no")
+                return CredentialIndex(cursor)
+
+    def _mark_credentials_used(self, login_codes):
+        if self.ref_cache.active:
+            self.get_credential_index().mark_used(login_codes)
+
+    def verify_login(self, login_code, password):
+        """
+        校验登录码与密码
+
+        功能:
+        - 先查内存索引：登录码不存在、已使用（本进程已知）、密码错误时直接返回，不访问数据库
+        - 通过索引校验后再查询一次数据库确认未使用（其他进程保存的评分只更新了数据库）
+        - 基础数据缓存不可用时直接查询数据库
+
+        Args:
+            login_code: 登录码
+            password: 密码
+
+        Returns:
+            tuple: (校验结果, 角色ID)，校验结果为 'ok' / 'invalid' / 'used' / 'wrong_password'
+        """
+        if self.ref_cache.active:
+            status, role_id = self.get_credential_index().check(login_code, password)
+            if status != OK:
+                return status, role_id
+
+        user = self.yz_user(login_code)
+        if not user:
+            return INVALID, None
+        if user['used'] == 1:
+            self._mark_credentials_used([login_code])
+            return USED, user['role_id']
+        if user['password'] != password:
+            return WRONG_PASSWORD, user['role_id']
+        return OK, user['role_id']
 
     def get_branch(self, login_code):
         """
@@ -153,7 +294,7 @@ class Database:
             dict or None: 包含登录码、角色ID、角色名、权重的字典
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT
                     l.account AS login_code,
@@ -184,6 +325,22 @@ class Database:
                 cursor.execute(sql, (role_id, login_code, password))
             conn.commit()
 
+    def create_login_codes(self, rows):
+        """
+        批量创建登录码
+
+        Args:
+            rows: [(role_id, login_code, password), ...]
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    "INSERT INTO login_no(role_id, account, password) VALUES (%s, %s, %s)",
+                    rows
+                )
+            conn.commit()
+
+    @invalidates('scores')
     def clear_all_scores(self):
         """
         清空所有评分记录（重点工作指标 + 满意度）
@@ -194,14 +351,79 @@ class Database:
                 cursor.execute("DELETE FROM myd_score")
             conn.commit()
 
+    @invalidates('login_code')
     def clear_login_codes(self):
         """
-        清空所有登录码
+        清空所有登录码及其评分草稿
         """
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM login_no")
+                cursor.execute("DELETE FROM score_draft")
+            conn.commit()
+
+    # ==================== 表结构升级 ====================
+
+    def upgrade_schema(self):
+        """
+        补建新版本增加的表与索引（可重复执行，已存在的跳过）
+
+        功能:
+        - jxkh.sql 为完整导出（先 DROP 再建表），已有数据的库需用本方法升级：
+          cache_version（基础数据缓存版本号）、score_draft（评分草稿）、login_no.idx_account
+        - sqlite 后端每次启动按 jxkh_sqlite.sql 建表（均为 IF NOT EXISTS），无需升级
+        - 由 warm_up() 在启动时调用，也可手动执行 python cli.py db upgrade
+
+        Returns:
+            list: 本次补建的表与索引
+        """
+        if self.backend.name != 'mysql':
+            return []
+
+        applied = []
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT table_name AS name FROM information_schema.tables
+                    WHERE table_schema = DATABASE() AND table_name IN ('cache_version', 'score_draft')
+                """)
+                tables = {r['name'] for r in cursor.fetchall()}
+
+                if 'cache_version' not in tables:
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS `cache_version` (
+                          `name` varchar(50) NOT NULL COMMENT '缓存分组',
+                          `version` bigint NOT NULL DEFAULT 0 COMMENT '版本号，修改基础数据或评分后递增',
+                          PRIMARY KEY (`name`)
+                        ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_general_ci COMMENT = '基础数据缓存版本表'
+                    """)
+                    applied.append('cache_version')
+                cursor.executemany(
+                    "INSERT IGNORE INTO cache_version(name, version) VALUES (%s, 0)",
+                    [(name,) for name in GROUPS + ('scores',)]
+                )
+
+                if 'score_draft' not in tables:
+                    cursor.execute("""
+                        CREATE TABLE IF NOT EXISTS `score_draft` (
+                          `login_code` varchar(50) NOT NULL COMMENT '登录码',
+                          `field` varchar(50) NOT NULL COMMENT '评分项（zdgz_指标ID / satisfaction_部门ID）',
+                          `score` decimal(5, 2) NOT NULL COMMENT '评分',
+                          `update_time` datetime NULL DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间',
+                          PRIMARY KEY (`login_code`, `field`)
+                        ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_general_ci COMMENT = '评分草稿表'
+                    """)
+                    applied.append('score_draft')
+
+                cursor.execute("""
+                    SELECT COUNT(*) AS n FROM information_schema.statistics
+                    WHERE table_schema = DATABASE() AND table_name = 'login_no' AND index_name = 'idx_account'
+                """)
+                if not cursor.fetchone()['n']:
+                    cursor.execute("ALTER TABLE login_no ADD INDEX idx_account (account)")
+                    applied.append('login_no.idx_account')
             conn.commit()
+        return applied
 
     # ==================== 管理员相关 ====================
 
@@ -224,37 +446,42 @@ class Database:
 
     # ==================== 部门管理 ====================
 
+    @cached('department')
     def get_departments(self):
         """
         获取所有启用的部门列表
 
         Returns:
-            list: 部门信息列表，按类型和ID排序
+            list: 部门信息列表（DepartmentRecord，只读），按类型和ID排序
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
-                SELECT * FROM department
+                SELECT id, dept_name, dept_type, enable, work_desc
+                FROM department
                 WHERE enable = 1
                 ORDER BY dept_type, id
             """)
-            return cursor.fetchall()
+            return build_records(DepartmentRecord, cursor.fetchall())
 
-    def add_department(self, dept_name):
+    @invalidates('department')
+    def add_department(self, dept_name, dept_type=None):
         """
-        新增部门
+        新增部门（默认启用）
 
         Args:
             dept_name: 部门名称
+            dept_type: 部门类型（front / middle）
         """
         with self.get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
-                    "INSERT INTO department(dept_name) VALUES(%s)",
-                    (dept_name,)
+                    "INSERT INTO department(dept_name, dept_type, enable) VALUES(%s, %s, 1)",
+                    (dept_name, dept_type)
                 )
                 conn.commit()
 
+    @invalidates('department')
     def delete_department(self, dept_id):
         """
         删除部门
@@ -272,6 +499,7 @@ class Database:
 
     # ==================== 角色管理 ====================
 
+    @cached('role')
     def get_roles(self):
         """
         获取所有角色信息
@@ -280,10 +508,11 @@ class Database:
             list: 角色信息列表，按ID排序
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("SELECT * FROM evaluator_role ORDER BY id")
             return cursor.fetchall()
 
+    @invalidates('role')
     def create_role(self, role_name, zdgz_weight=0):
         """
         新增角色
@@ -305,6 +534,7 @@ class Database:
 
     # ==================== 满意度权限管理 ====================
 
+    @cached('permission')
     def get_myd_permissions(self):
         """
         获取满意度 角色-部门-权重 映射关系
@@ -317,7 +547,7 @@ class Database:
             }
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT role_id, dept_id, myd_weight
                 FROM role_dept_permission
@@ -334,6 +564,23 @@ class Database:
 
             return result
 
+    @cached('role', 'department', 'permission')
+    def get_myd_permission_matrix(self):
+        """
+        获取满意度 角色 × 部门 权限矩阵
+
+        Returns:
+            PermissionMatrix: 部门键为部门ID，单元格带满意度权重（默认 1.00）
+        """
+        return PermissionMatrix(
+            self.get_roles(),
+            self.get_departments(),
+            'id',
+            self.get_myd_permissions(),
+            default_weight=1.00
+        )
+
+    @invalidates('permission')
     def save_myd_permissions(self, data):
         """
         保存满意度配置：
@@ -382,15 +629,16 @@ class Database:
 
     # ==================== 重点工作指标管理 ====================
 
+    @cached('zdgz')
     def get_zdgz(self):
         """
         获取所有重点工作指标
 
         Returns:
-            list: 重点工作指标列表，按部门和ID排序
+            list: 重点工作指标列表（ZdgzRecord，只读），按部门和ID排序
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT id,
                        department,
@@ -401,8 +649,9 @@ class Database:
                 FROM zdgz
                 ORDER BY department, id
             """)
-            return cursor.fetchall()
+            return build_records(ZdgzRecord, cursor.fetchall())
 
+    @invalidates('zdgz')
     def clear_zdgz(self):
         """
         删除所有重点工作指标
@@ -423,13 +672,14 @@ class Database:
             dict or None: 包含 indicator_name 的字典
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute(
                 "SELECT indicator_name FROM zdgz WHERE id=%s",
                 (zdgz_id,)
             )
             return cursor.fetchone()
 
+    @invalidates('zdgz')
     def update_zdgz_evidence(self, zdgz_id, evidence_path):
         """
         更新佐证材料文件路径
@@ -458,7 +708,7 @@ class Database:
             str or None: 文件相对路径或 None
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT evidence_path
                 FROM zdgz
@@ -471,6 +721,7 @@ class Database:
 
         return row.get('evidence_path')
 
+    @cached('permission')
     def get_role_zdgz_permissions(self):
         """
         获取角色-部门权限映射（用于重点工作指标）
@@ -479,7 +730,7 @@ class Database:
             dict: {role_id: [department_name, ...]}
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("SELECT role_id, department FROM role_zdgz_permission ORDER BY role_id")
             rows = cursor.fetchall()
 
@@ -491,6 +742,7 @@ class Database:
 
         return result
 
+    @cached('zdgz')
     def get_zdgz_departments(self):
         """
         获取所有不同的重点工作指标部门名称
@@ -499,7 +751,7 @@ class Database:
             list: 部门名称列表，去重并排序
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT DISTINCT department
                 FROM zdgz
@@ -509,6 +761,22 @@ class Database:
             """)
             return cursor.fetchall()
 
+    @cached('role', 'zdgz', 'permission')
+    def get_zdgz_permission_matrix(self):
+        """
+        获取重点工作指标 角色 × 部门 权限矩阵
+
+        Returns:
+            PermissionMatrix: 部门键为部门名称
+        """
+        return PermissionMatrix(
+            self.get_roles(),
+            self.get_zdgz_departments(),
+            'department',
+            self.get_role_zdgz_permissions()
+        )
+
+    @invalidates('permission')
     def save_role_zdgz_permissions(self, data):
         """
         保存角色-部门权限关系（重点工作指标）
@@ -546,6 +814,7 @@ class Database:
                 conn.rollback()
                 raise
 
+    @invalidates('role')
     def update_role_zdgz_weights(self, data):
         """
         更新 evaluator_role 中的 zdgz_weight
@@ -577,6 +846,7 @@ class Database:
 
     # ==================== 评分保存 ====================
 
+    @invalidates('scores')
     def save_zdgz_score(self, login_code, role_id, zdgz_id, score):
         """
         保存重点工作指标评分
@@ -589,15 +859,16 @@ class Database:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO zdgz_score(login_code, role_id, zdgz_id, score)
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    score = VALUES(score),
-                    create_time = CURRENT_TIMESTAMP
-            """, (login_code, role_id, zdgz_id, score))
+            cursor.execute(self.backend.upsert_sql(
+                'zdgz_score',
+                ['login_code', 'role_id', 'zdgz_id', 'score'],
+                keys=['login_code', 'role_id', 'zdgz_id'],
+                updates=['score'],
+                touch='create_time'
+            ), (login_code, role_id, zdgz_id, score))
             conn.commit()
 
+    @invalidates('scores')
     def save_myd_score(self, login_code, role_id, dept_id, score):
         """
         保存满意度评分
@@ -610,23 +881,167 @@ class Database:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO myd_score(login_code, role_id, dept_id, score)
-                VALUES (%s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    score = VALUES(score),
-                    create_time = CURRENT_TIMESTAMP
-            """, (login_code, role_id, dept_id, score))
+            cursor.execute(self.backend.upsert_sql(
+                'myd_score',
+                ['login_code', 'role_id', 'dept_id', 'score'],
+                keys=['login_code', 'role_id', 'dept_id'],
+                updates=['score'],
+                touch='create_time'
+            ), (login_code, role_id, dept_id, score))
+            conn.commit()
+
+    def save_ballots(self, ballots):
+        """
+        批量保存整份评分表（单个事务）
+
+        - 重点工作指标评分、满意度评分按唯一键插入或覆盖
+        - 同时标记登录码为已使用
+        - 重复执行结果不变，可用于日志重放
+        - 在同一事务最后递增 scores 版本号（使缓存的导出文件失效），不另开连接、不清空合并查询结果
+
+        Args:
+            ballots: [
+                {
+                    'login_code': str,
+                    'role_id': int,
+                    'zdgz': {zdgz_id: score},
+                    'myd': {dept_id: score}
+                }
+            ]
+        """
+        zdgz_rows = []
+        myd_rows = []
+        for b in ballots:
+            for zdgz_id, score in b['zdgz'].items():
+                zdgz_rows.append((b['login_code'], b['role_id'], int(zdgz_id), score))
+            for dept_id, score in b['myd'].items():
+                myd_rows.append((b['login_code'], b['role_id'], int(dept_id), score))
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if zdgz_rows:
+                    cursor.executemany(self.backend.upsert_sql(
+                        'zdgz_score',
+                        ['login_code', 'role_id', 'zdgz_id', 'score'],
+                        keys=['login_code', 'role_id', 'zdgz_id'],
+                        updates=['score'],
+                        touch='create_time'
+                    ), zdgz_rows)
+
+                if myd_rows:
+                    cursor.executemany(self.backend.upsert_sql(
+                        'myd_score',
+                        ['login_code', 'role_id', 'dept_id', 'score'],
+                        keys=['login_code', 'role_id', 'dept_id'],
+                        updates=['score'],
+                        touch='create_time'
+                    ), myd_rows)
+
+                cursor.executemany(
+                    "UPDATE login_no SET used=1 WHERE account=%s",
+                    [(b['login_code'],) for b in ballots]
+                )
+
+                # 最后更新版本号行，缩短其行锁持有时间
+                cursor.execute("UPDATE cache_version SET version = version + 1 WHERE name = 'scores'")
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        self._mark_credentials_used([b['login_code'] for b in ballots])
+
+    def save_ballot(self, login_code, role_id, zdgz_scores, myd_scores):
+        """
+        保存单份评分表（单个事务）
+
+        Args:
+            login_code: 登录码
+            role_id: 角色ID
+            zdgz_scores: {zdgz_id: score}
+            myd_scores: {dept_id: score}
+        """
+        self.save_ballots([{
+            'login_code': login_code,
+            'role_id': role_id,
+            'zdgz': zdgz_scores,
+            'myd': myd_scores
+        }])
+
+    # ==================== 评分草稿 ====================
+
+    def save_drafts(self, rows):
+        """
+        批量保存评分草稿（逐项插入或更新）
+
+        Args:
+            rows: [(login_code, field, score), ...]
+        """
+        sql = self.backend.upsert_sql(
+            'score_draft',
+            ['login_code', 'field', 'score'],
+            keys=['login_code', 'field'],
+            updates=['score'],
+            touch='update_time'
+        )
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(sql, rows)
+            conn.commit()
+
+    def get_draft(self, login_code):
+        """
+        获取登录码的评分草稿
+
+        Returns:
+            dict: {评分项字段名: 分数}
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT field, score FROM score_draft WHERE login_code = %s",
+                    (login_code,)
+                )
+                return {r['field']: float(r['score']) for r in cursor.fetchall()}
+
+    def delete_drafts(self, login_codes):
+        """
+        批量删除登录码的评分草稿
+
+        Args:
+            login_codes: 登录码列表
+        """
+        with self.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.executemany(
+                    "DELETE FROM score_draft WHERE login_code = %s",
+                    [(code,) for code in login_codes]
+                )
             conn.commit()
 
     # ==================== 统计与汇总 ====================
 
-    def get_login_code_stats_by_role(self):
+    def get_data_versions(self):
         """
-        获取登录账号统计信息（按角色）
+        读取各数据分组的版本号（cache_version 表，含评分数据 scores）
+
+        Returns:
+            dict: {分组: 版本号}
         """
         with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT name, version FROM cache_version")
+                return {r['name']: int(r['version']) for r in cursor.fetchall()}
+
+    @coalesced
+    def get_login_code_stats_by_role(self):
+        """
+        获取登录账号统计信息（按角色，并发调用合并执行）
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
 
             # 全局统计
             cursor.execute("""
@@ -697,8 +1112,8 @@ class Database:
         Returns:
             list: 评分详情列表
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT l.account AS login_code,
                        z.department AS dept_name,
@@ -718,8 +1133,8 @@ class Database:
         Returns:
             list: 评分详情列表
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT l.account AS login_code,
                        d.dept_name,
@@ -731,13 +1146,97 @@ class Database:
             """)
             return cursor.fetchall()
 
+    def iter_query(self, sql, args=None, batch_size=2000):
+        """
+        分批读取大结果集（只读，优先从库）
+
+        功能:
+        - MySQL 使用服务端游标，结果逐批从服务器读取，内存占用与总行数无关
+        - 调用方中途停止迭代（如客户端断开）时直接关闭连接，不再读完剩余结果
+
+        Yields:
+            list: 每批最多 batch_size 行
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor(self.backend.streaming_cursor)
+            if self.backend.name == 'mysql':
+                # 下载方读取较慢时服务端游标需等待写出，放宽写超时避免被服务器断开
+                cursor.execute("SET SESSION net_write_timeout = 600")
+            cursor.execute(sql, args)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+            cursor.close()
+
+    def iter_raw_scores(self, kind, department=None, role=None, start=None, end=None, batch_size=2000):
+        """
+        逐批读取原始评分记录（附指标、部门、角色名称）
+
+        Args:
+            kind: 'zdgz' 重点工作指标评分 / 'myd' 满意度评分
+            department: 部门名
+            role: 角色名
+            start: 评分时间下限（含），'YYYY-MM-DD HH:MM:SS'
+            end: 评分时间上限（不含）
+            batch_size: 每批行数
+
+        Yields:
+            list: 评分记录，按评分ID排序
+        """
+        if kind == 'zdgz':
+            sql = """
+                SELECT s.id, s.login_code, s.role_id, r.role_name,
+                       z.department AS dept_name, s.zdgz_id, z.indicator_name,
+                       s.score, s.create_time
+                FROM zdgz_score s
+                JOIN zdgz z ON s.zdgz_id = z.id
+                JOIN evaluator_role r ON s.role_id = r.id
+            """
+            dept_column = 'z.department'
+        elif kind == 'myd':
+            sql = """
+                SELECT s.id, s.login_code, s.role_id, r.role_name,
+                       s.dept_id, d.dept_name,
+                       s.score, s.create_time
+                FROM myd_score s
+                JOIN department d ON s.dept_id = d.id
+                JOIN evaluator_role r ON s.role_id = r.id
+            """
+            dept_column = 'd.dept_name'
+        else:
+            raise ValueError(f'不支持的评分类型：{kind}')
+
+        conditions = []
+        args = []
+        if department:
+            conditions.append(f"{dept_column} = %s")
+            args.append(department)
+        if role:
+            conditions.append("r.role_name = %s")
+            args.append(role)
+        if start:
+            conditions.append("s.create_time >= %s")
+            args.append(start)
+        if end:
+            conditions.append("s.create_time < %s")
+            args.append(end)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY s.id"
+
+        return self.iter_query(sql, args, batch_size)
+
+    @coalesced
     def get_zdgz_score_summary(self):
         """
         获取重点工作指标评分汇总
         - 使用 evaluator_role.zdgz_weight
+        - 并发调用合并执行，结果为共享对象
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT
                     z.department AS dept_name,
@@ -766,12 +1265,14 @@ class Database:
             """)
             return cursor.fetchall()
 
+    @coalesced
     def get_myd_score_summary(self):
         """
         获取满意度评分汇总（按 角色-部门 权重）
+        - 并发调用合并执行，结果为共享对象
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor(pymysql.cursors.DictCursor)
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.cursor()
             cursor.execute("""
                 SELECT
                     d.id           AS dept_id,
@@ -808,6 +1309,8 @@ class Database:
         Returns:
             pd.DataFrame: 适合导出到 Excel 的数据框
         """
+        import pandas as pd  # 仅导出时加载
+
         summary = self.get_zdgz_score_summary()
 
         role_columns = sorted({
@@ -832,10 +1335,9 @@ class Database:
             col_name = f"{row['role_name']}评价得分系数"
             rows[key][col_name] = row['weighted_score']
 
-        df = pd.DataFrame(rows.values())
-
+        # 指定列名，无评分数据时也能导出表头
         columns = ["部门", "绩效指标", "指标含义/具体任务"] + role_columns
-        df = df[columns]
+        df = pd.DataFrame(list(rows.values()), columns=columns)
 
         return df
 
@@ -846,6 +1348,8 @@ class Database:
         Returns:
             pd.DataFrame: 适合导出到 Excel 的数据框
         """
+        import pandas as pd  # 仅导出时加载
+
         summary = self.get_myd_score_summary()
 
         role_columns = sorted({
@@ -868,13 +1372,35 @@ class Database:
             col_name = f"{row['role_name']}评价得分系数"
             rows[dept][col_name] = row['weighted_score']
 
-        df = pd.DataFrame(rows.values())
-
+        # 指定列名，无评分数据时也能导出表头
         columns = ["部门"] + role_columns
-        df = df[columns]
+        df = pd.DataFrame(list(rows.values()), columns=columns)
 
         return df
 
+    def export_score_workbook(self, output, progress=None):
+        """
+        导出评分汇总工作簿（重点工作指标、满意度评价两个工作表）
+
+        Args:
+            output: 文件路径或可写的文件对象
+            progress: 进度回调 progress(已完成步骤, 总步骤, 说明)
+        """
+        import pandas as pd  # 仅导出时加载
+
+        progress = progress or (lambda done, total, message: None)
+
+        progress(0, 3, '正在汇总重点工作指标评分')
+        zdgz_df = self.export_zdgz_score_excel()
+        progress(1, 3, '正在汇总满意度评分')
+        myd_df = self.export_myd_score_excel()
+
+        progress(2, 3, '正在生成 Excel')
+        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+            zdgz_df.to_excel(writer, index=False, sheet_name='重点工作指标')
+            myd_df.to_excel(writer, index=False, sheet_name='满意度评价')
+        progress(3, 3, '导出完成')
+
 
 # 全局数据库实例
 db = Database()
\ No newline at end of file
@@ -0,0 +1,180 @@
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DraftBuffer:
+    """
+    评分草稿合并写入缓冲
+
+    功能:
+    - 前端每次修改只上报变化的评分项，按登录码在内存中合并
+    - 后台线程每隔 flush_interval 秒将合并后的变化批量写入 score_draft 表
+    - 草稿按（登录码, 评分项）逐项保存，多进程各自写入互不覆盖
+    - 读取时以数据库中的草稿为底，叠加本进程尚未写入的变化
+    - 评分提交后删除草稿同样由后台线程批量执行，提交路径不访问数据库
+    - 某个登录码的草稿写入失败时不影响其他登录码，连续失败 MAX_FAILURES 次后丢弃
+    """
+
+    MAX_FAILURES = 5
+
+    def __init__(self, db, flush_interval=3.0):
+        self.db = db
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._discarded = set()
+        self._failures = {}
+        self._pid = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def update(self, login_code, changes):
+        """
+        合并一批评分变化（只写内存）
+
+        Args:
+            login_code: 登录码
+            changes: {评分项字段名: 分数}，如 {'zdgz_12': 130.0}
+        """
+        self.ensure_started()
+        with self._lock:
+            self._pending.setdefault(login_code, {}).update(changes)
+
+    def get(self, login_code):
+        """
+        读取草稿
+
+        Returns:
+            dict: {评分项字段名: 分数}
+        """
+        draft = self.db.get_draft(login_code)
+        draft.update(self.pending(login_code))
+        return draft
+
+    def pending(self, login_code):
+        """
+        本进程尚未写库的草稿变化（不访问数据库）
+
+        Returns:
+            dict: {评分项字段名: 分数}
+        """
+        with self._lock:
+            return dict(self._pending.get(login_code, {}))
+
+    def discard(self, login_code):
+        """
+        删除草稿（评分正式提交后调用，由后台线程写库）
+        """
+        self.ensure_started()
+        with self._lock:
+            self._pending.pop(login_code, None)
+            self._discarded.add(login_code)
+
+    @staticmethod
+    def _rows(pending):
+        return [
+            (login_code, field, score)
+            for login_code, changes in pending.items()
+            for field, score in changes.items()
+        ]
+
+    def flush(self):
+        """
+        将内存中的变化写入数据库，并删除已提交评分的草稿
+
+        Returns:
+            int: 写入的评分项数量
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            discarded, self._discarded = self._discarded, set()
+
+        rows = self._rows(pending)
+        if rows:
+            try:
+                self.db.save_drafts(rows)
+            except Exception:
+                # 整批失败时逐个登录码重写，个别无法写入的数据不阻塞其他评价人的草稿
+                logger.exception('评分草稿批量写入失败，改为逐个登录码写入')
+                failed = {}
+                for login_code, changes in pending.items():
+                    try:
+                        self.db.save_drafts(self._rows({login_code: changes}))
+                    except Exception:
+                        failed[login_code] = changes
+                self._requeue(failed)
+                if len(failed) == len(pending):
+                    self._requeue_discarded(discarded)
+                    raise
+            else:
+                with self._lock:
+                    for login_code in pending:
+                        self._failures.pop(login_code, None)
+
+        if discarded:
+            try:
+                self.db.delete_drafts(list(discarded))
+            except Exception:
+                self._requeue_discarded(discarded)
+                raise
+        return len(rows)
+
+    def _requeue(self, failed):
+        """
+        写入失败的草稿放回缓冲（期间的新变化优先），连续失败过多的丢弃
+        """
+        with self._lock:
+            for login_code, changes in failed.items():
+                count = self._failures.get(login_code, 0) + 1
+                if count >= self.MAX_FAILURES:
+                    self._failures.pop(login_code, None)
+                    logger.error('登录码 %s 的评分草稿连续 %s 次写入失败，已丢弃: %r', login_code, count, changes)
+                    continue
+                self._failures[login_code] = count
+                merged = dict(changes)
+                merged.update(self._pending.get(login_code, {}))
+                self._pending[login_code] = merged
+
+    def _requeue_discarded(self, discarded):
+        with self._lock:
+            self._discarded.update(discarded)
+
+    # ==================== 后台线程 ====================
+
+    def ensure_started(self):
+        """
+        启动后台写入线程；fork 后的子进程会重新启动自己的线程
+        """
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='score-draft', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('评分草稿写入失败')
+
+    def stop(self, timeout=5):
+        """
+        停止后台线程并写入剩余变化
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('评分草稿停止前写入失败')
@@ -0,0 +1,243 @@
+import mimetypes
+import os
+import shutil
+import threading
+from urllib.parse import quote
+
+from werkzeug.security import safe_join
+
+
+def _content_type(key):
+    return mimetypes.guess_type(key)[0] or 'application/octet-stream'
+
+
+class LocalStorage:
+    """
+    佐证材料本地存储
+
+    功能:
+    - 文件保存在 root 下，键即相对路径（如 uploads/zdgz/1/xx佐证材料.pdf），与原有数据一致
+    - 下载由应用直接发送文件
+    """
+
+    name = 'local'
+
+    def __init__(self, root):
+        """
+        Args:
+            root: 存储根目录（应用根目录）
+        """
+        self.root = os.path.abspath(root)
+
+    def local_path(self, key):
+        """
+        键对应的本地绝对路径
+
+        Raises:
+            FileNotFoundError: 键越出存储根目录
+        """
+        path = safe_join(self.root, key)
+        if path is None:
+            raise FileNotFoundError(key)
+        return path
+
+    def save(self, key, fileobj, content_type=None):
+        """
+        保存文件（先写临时文件再原子替换）
+
+        Args:
+            key: 存储键
+            fileobj: 可读文件对象
+            content_type: 内容类型（本地存储不使用）
+        """
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            shutil.copyfileobj(fileobj, f)
+        os.replace(tmp, path)
+
+    def open(self, key):
+        """
+        打开文件读取
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        return open(self.local_path(key), 'rb')
+
+    def exists(self, key):
+        try:
+            return os.path.isfile(self.local_path(key))
+        except FileNotFoundError:
+            return False
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def download_url(self, key, download_name):
+        """
+        直接下载地址；本地存储由应用发送文件，返回 None
+        """
+        return None
+
+
+class S3Storage:
+    """
+    佐证材料 S3 兼容对象存储（AWS S3、MinIO 等，需安装 boto3）
+
+    功能:
+    - 多台应用服务器共用同一存储桶
+    - 上传超过 multipart_threshold 时自动分片上传，分片并行发送
+    - 下载返回预签名地址，由浏览器直接从对象存储下载，不占用应用进程
+    - 对象键为 prefix + 存储键，与本地存储的相对路径一致，便于迁移
+    """
+
+    name = 's3'
+
+    def __init__(self, bucket, prefix='', endpoint_url=None, region=None, access_key=None, secret_key=None,
+                 addressing_style=None, presign_expires=300, multipart_threshold_mb=8, multipart_chunksize_mb=8,
+                 max_concurrency=4):
+        """
+        Args:
+            bucket: 存储桶
+            prefix: 对象键前缀
+            endpoint_url: S3 兼容服务地址（如本地 MinIO http://127.0.0.1:9000），不填为 AWS S3
+            region: 区域
+            access_key / secret_key: 访问密钥，不填时使用 boto3 默认凭证链（环境变量、实例角色等）
+            addressing_style: 'path' / 'virtual'，MinIO 等通常需要 path
+            presign_expires: 预签名下载地址有效期（秒）
+            multipart_threshold_mb: 超过该大小使用分片上传（MB）
+            multipart_chunksize_mb: 分片大小（MB）
+            max_concurrency: 分片并行上传数
+        """
+        try:
+            import boto3  # 仅使用对象存储时需要
+            from botocore.config import Config
+            from boto3.s3.transfer import TransferConfig
+        except ImportError:
+            raise RuntimeError('佐证材料使用 S3 存储需安装 boto3：pip install boto3')
+
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix and prefix.strip('/') else ''
+        self.presign_expires = presign_expires
+
+        self._session_args = {
+            'service_name': 's3',
+            'endpoint_url': endpoint_url,
+            'region_name': region,
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key,
+            'config': Config(signature_version='s3v4', s3={'addressing_style': addressing_style or 'auto'})
+        }
+        self._boto3 = boto3
+        self._transfer_config = TransferConfig(
+            multipart_threshold=int(multipart_threshold_mb * 1024 * 1024),
+            multipart_chunksize=int(multipart_chunksize_mb * 1024 * 1024),
+            max_concurrency=max_concurrency
+        )
+        self._client_obj = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def _client(self):
+        # 客户端在各工作进程中首次使用时创建，不跨 fork 共用连接池
+        with self._lock:
+            if self._client_obj is None or self._client_pid != os.getpid():
+                self._client_obj = self._boto3.session.Session().client(**self._session_args)
+                self._client_pid = os.getpid()
+            return self._client_obj
+
+    def _object_key(self, key):
+        return self.prefix + key
+
+    @staticmethod
+    def _not_found(error):
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def save(self, key, fileobj, content_type=None):
+        """
+        上传文件（大文件分片上传）
+        """
+        self._client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            self._object_key(key),
+            ExtraArgs={'ContentType': content_type or _content_type(key)},
+            Config=self._transfer_config
+        )
+
+    def open(self, key):
+        """
+        打开对象读取（流式，不整体读入内存）
+
+        Raises:
+            FileNotFoundError: 对象不存在
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))['Body']
+        except ClientError as e:
+            if self._not_found(e):
+                raise FileNotFoundError(key)
+            raise
+
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if self._not_found(e):
+                return False
+            raise
+
+    def delete(self, key):
+        self._client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def download_url(self, key, download_name):
+        """
+        生成预签名下载地址，响应头中带下载文件名
+
+        Returns:
+            str: 预签名 URL
+        """
+        return self._client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket,
+                'Key': self._object_key(key),
+                'ResponseContentDisposition': f"attachment; filename*=UTF-8''{quote(download_name)}",
+                'ResponseContentType': _content_type(key)
+            },
+            ExpiresIn=self.presign_expires
+        )
+
+
+def create_storage(storage_config, root_path):
+    """
+    按配置创建佐证材料存储
+
+    Args:
+        storage_config: config.yaml 中 evidence_storage 配置
+        root_path: 应用根目录（本地存储默认根目录）
+    """
+    backend = storage_config.get('backend', 'local')
+
+    if backend == 'local':
+        local = storage_config.get('local') or {}
+        return LocalStorage(local.get('root') or root_path)
+
+    if backend == 's3':
+        s3 = dict(storage_config.get('s3') or {})
+        if not s3.get('bucket'):
+            raise ValueError('evidence_storage.s3.bucket 未配置')
+        return S3Storage(**s3)
+
+    raise ValueError(f'不支持的佐证材料存储：{backend}')
@@ -0,0 +1,126 @@
+import glob
+import hashlib
+import os
+import threading
+import time
+
+
+class ExportCache:
+    """
+    导出文件磁盘缓存
+
+    功能:
+    - 导出结果按 (类型, 数据版本) 保存，数据未变化时重复下载直接发送文件
+    - 文件名包含内容摘要，作为 ETag 支持 304
+    - 超过保留时间的文件删除；总大小超过上限时按最近使用时间淘汰
+
+    文件:
+    - {cache_dir}/{kind}-{version}-{digest}{ext}
+    多进程部署时 cache_dir 可共享，写入先写临时文件再原子替换
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024, max_age_hours=24):
+        """
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存总大小上限（字节）
+            max_age_hours: 文件保留时间（小时）
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _valid(part):
+        return bool(part) and all(c.isalnum() or c in '._' for c in part) and '..' not in part
+
+    def get(self, kind, version):
+        """
+        查找缓存文件
+
+        Returns:
+            tuple or None: (文件路径, ETag)，未缓存时返回 None
+        """
+        if not self._valid(kind) or not self._valid(version):
+            return None
+
+        for path in glob.glob(os.path.join(self.cache_dir, f'{kind}-{version}-*')):
+            if path.endswith('.tmp'):
+                continue
+            try:
+                # 更新访问时间，供按最近使用淘汰
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            digest = os.path.splitext(os.path.basename(path))[0].rsplit('-', 1)[1]
+            return path, digest
+        return None
+
+    def put(self, kind, version, data, ext):
+        """
+        保存导出文件并按大小、时间清理
+
+        Args:
+            kind: 导出类型，如 'scores'
+            version: 数据版本
+            data: 文件内容（bytes 或 BytesIO）
+            ext: 扩展名，如 '.xlsx'
+
+        Returns:
+            tuple: (文件路径, ETag)
+        """
+        if hasattr(data, 'getvalue'):
+            data = data.getvalue()
+
+        digest = hashlib.sha1(data).hexdigest()[:16]
+        path = os.path.join(self.cache_dir, f'{kind}-{version}-{digest}{ext}')
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        self.evict(keep=path)
+        return path, digest
+
+    def evict(self, keep=None):
+        """
+        删除过期文件，总大小超过上限时删除最久未使用的文件
+
+        Args:
+            keep: 不删除的文件（刚写入的文件）
+        """
+        with self._lock:
+            now = time.time()
+            files = []
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if now - st.st_mtime > self.max_age and path != keep:
+                    self._remove(path)
+                    continue
+                if name.endswith('.tmp'):
+                    # 其他进程正在写入
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """
+    任务执行失败，消息直接展示给管理员
+    """
+
+
+class Job:
+    """
+    任务执行上下文，传给任务函数
+
+    功能:
+    - progress(): 上报进度
+    - set_result(): 保存可下载的结果文件
+    """
+
+    # 进度写盘的最小间隔（秒）
+    PROGRESS_INTERVAL = 0.2
+
+    def __init__(self, runner, job_id):
+        self.runner = runner
+        self.id = job_id
+        self._last_progress = 0
+
+    def progress(self, done, total=None, message=None):
+        """
+        上报进度
+
+        Args:
+            done: 已完成数量
+            total: 总数量（未知时为 None）
+            message: 当前阶段说明
+        """
+        now = time.monotonic()
+        if total is not None and done < total and now - self._last_progress < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self.runner._update(self.id, progress={'done': done, 'total': total, 'message': message})
+
+    def set_result(self, data, filename, mimetype):
+        """
+        保存结果文件，任务完成后可通过下载接口获取
+
+        Args:
+            data: 文件内容（bytes 或 BytesIO）
+            filename: 下载文件名
+            mimetype: MIME 类型
+        """
+        if hasattr(data, 'getvalue'):
+            data = data.getvalue()
+
+        path = self.runner.result_path(self.id)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        self.runner._update(self.id, result={'filename': filename, 'mimetype': mimetype, 'size': len(data)})
+
+    def set_download_url(self, url, filename):
+        """
+        结果文件已保存在别处（如导出缓存）时，记录其下载地址
+        """
+        self.runner._update(self.id, result={'filename': filename, 'url': url})
+
+
+class JobRunner:
+    """
+    后台任务执行器
+
+    功能:
+    - 线程池执行耗时的管理操作（生成登录码、导入、导出等），请求只负责提交
+    - 任务状态与结果保存在 job_dir 下的文件中，多进程部署时任一进程都能响应轮询
+    - 定期清理超过保留时间的任务
+
+    文件:
+    - {job_dir}/{id}.json     任务状态
+    - {job_dir}/{id}.result   结果文件
+    """
+
+    def __init__(self, job_dir, max_workers=2, keep_hours=24):
+        self.job_dir = os.path.abspath(job_dir)
+        self.max_workers = max_workers
+        self.keep_seconds = keep_hours * 3600
+
+        os.makedirs(self.job_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    # ==================== 文件 ====================
+
+    def _status_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.json')
+
+    def result_path(self, job_id):
+        return os.path.join(self.job_dir, f'{job_id}.result')
+
+    @staticmethod
+    def _valid_id(job_id):
+        return len(job_id) == 32 and all(c in '0123456789abcdef' for c in job_id)
+
+    def _write(self, status):
+        path = self._status_path(status['id'])
+        tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _read(self, job_id):
+        try:
+            with open(self._status_path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _update(self, job_id, **fields):
+        # 同一任务的状态只由执行它的线程写入，读改写无需跨进程加锁
+        with self._lock:
+            status = self._read(job_id)
+            if status is None:
+                return
+            status.update(fields)
+            self._write(status)
+
+    # ==================== 提交与执行 ====================
+
+    def _get_executor(self):
+        # fork 出的子进程不能复用父进程的线程池
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, kind, title, func, *args, **kwargs):
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型
+            title: 任务名称（页面展示）
+            func: 任务函数，第一个参数为 Job，返回值作为完成提示
+            *args, **kwargs: 传给任务函数的其余参数
+
+        Returns:
+            str: 任务ID
+        """
+        self.cleanup()
+
+        job_id = uuid.uuid4().hex
+        self._write({
+            'id': job_id,
+            'kind': kind,
+            'title': title,
+            'state': 'queued',
+            'pid': os.getpid(),
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': None,
+            'message': None,
+            'error': None,
+            'result': None
+        })
+        self._get_executor().submit(self._execute, job_id, func, args, kwargs)
+        return job_id
+
+    def _execute(self, job_id, func, args, kwargs):
+        job = Job(self, job_id)
+        self._update(job_id, state='running', started_at=time.time())
+        try:
+            message = func(job, *args, **kwargs)
+        except JobFailed as e:
+            self._update(job_id, state='failed', error=str(e), finished_at=time.time())
+        except Exception as e:
+            logger.exception('任务 %s 执行失败', job_id)
+            self._update(job_id, state='failed', error=f'任务执行出错：{e}', finished_at=time.time())
+        else:
+            self._update(job_id, state='done', message=message, finished_at=time.time())
+
+    # ==================== 查询 ====================
+
+    @staticmethod
+    def _process_alive(pid):
+        if os.name != 'posix':
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+
+    def status(self, job_id):
+        """
+        查询任务状态
+
+        Returns:
+            dict: 任务状态；任务不存在时返回 None
+        """
+        if not self._valid_id(job_id):
+            return None
+
+        status = self._read(job_id)
+        if status is None:
+            return None
+
+        # 执行任务的进程已退出（重启、崩溃），任务不会再完成
+        if status['state'] in ('queued', 'running') and not self._process_alive(status['pid']):
+            status.update(state='failed', error='任务所在进程已退出，请重新提交', finished_at=time.time())
+            self._write(status)
+        return status
+
+    def cleanup(self):
+        """
+        删除超过保留时间的任务状态与结果文件
+        """
+        deadline = time.time() - self.keep_seconds
+        try:
+            names = os.listdir(self.job_dir)
+        except FileNotFoundError:
+            return
+
+        for name in names:
+            path = os.path.join(self.job_dir, name)
+            try:
+                if os.path.getmtime(path) < deadline:
+                    os.remove(path)
+            except OSError:
+                pass
@@ -1,21 +1,35 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, send_file, abort, \
-    make_response, send_from_directory
-from login_code import generate_login_codes_by_role, export_login_codes
+    make_response, send_from_directory, Response, stream_with_context
+from login_code import generate_login_codes_by_role, export_login_codes, reset_round
 from werkzeug.utils import secure_filename
-from openpyxl import load_workbook
+from zdgz_import import parse_zdgz_workbook, replace_zdgz
 from datetime import datetime
+from profiling import RequestProfiler
+from ballot_journal import create_journal
+from jobs import JobRunner, JobFailed
+from drafts import DraftBuffer
+from static_assets import StaticAssets
+from admission import AdmissionController
+from zip_stream import zip_stream
+from evidence_storage import create_storage
+from report_pack import iter_report_pack
+from export_cache import ExportCache
+from score_views import SummaryCache, pivot_zdgz, flatten_myd, keyset_page
+from raw_export import FORMATS, iter_raw_export, parse_time
+from urllib.parse import quote
 from database import db
 from io import BytesIO
-import pandas as pd
 import yaml
+import atexit
+import functools
 import os
 import re
+import time
 
 # 初始化Flask应用
 app = Flask(__name__)
 
 # 上传配置
-UPLOAD_ROOT = os.path.join(app.root_path, 'uploads', 'zdgz')
 ALLOWED_EXT = {'pdf', 'zip', 'xls', 'xlsx'}
 
 
@@ -37,26 +51,162 @@ with open('config.yaml', 'r') as f:
     config = yaml.safe_load(f)
     app.config['SECRET_KEY'] = config['app']['secret_key']
 
+# 佐证材料存储：本地目录或 S3 兼容对象存储
+evidence_storage = create_storage(config.get('evidence_storage') or {}, app.root_path)
+
+# 静态资源：使用 build_static.py 构建的带指纹、预压缩文件（未构建时使用原文件）
+static_config = config.get('static') or {}
+static_assets = StaticAssets(
+    app,
+    enabled=static_config.get('use_build', True),
+    max_age=static_config.get('max_age', 31536000)
+)
+
+# 请求性能分析（默认关闭，由管理后台按需开启）
+profiling_config = config.get('profiling') or {}
+profiler = RequestProfiler(
+    dump_dir=os.path.join(app.root_path, profiling_config.get('dump_dir', 'profiles')),
+    enabled=profiling_config.get('enabled', False),
+    endpoints=profiling_config.get('endpoints', []),
+    sample_rate=profiling_config.get('sample_rate', 0.0),
+    max_files=profiling_config.get('max_files', 50)
+)
+profiler.init_app(app)
+
+# 提交准入控制：限制同时写库的评分提交数，超出部分短暂排队，队列满时返回 503 由前端自动重试
+admission_config = config.get('admission') or {}
+admission = AdmissionController(
+    enabled=admission_config.get('enabled', True),
+    endpoints=admission_config.get('endpoints', ['save_score']),
+    max_inflight=admission_config.get('max_inflight', 6),
+    max_queue=admission_config.get('max_queue', 32),
+    queue_timeout=admission_config.get('queue_timeout', 2.0),
+    retry_after=admission_config.get('retry_after', 2)
+)
+admission.init_app(app)
+
+# 后台任务：生成登录码、导入、导出等耗时操作提交为任务，页面轮询进度
+jobs_config = config.get('jobs') or {}
+job_runner = JobRunner(
+    job_dir=jobs_config.get('job_dir', 'data/jobs'),
+    max_workers=jobs_config.get('max_workers', 2),
+    keep_hours=jobs_config.get('keep_hours', 24)
+)
+
+# 评分提交方式：direct 同步写库；journal 先写本地日志立即返回，由后台线程批量写库
+journal = create_journal(config.get('submission') or {}, db.save_ballots)
+if journal:
+    # 退出前写完剩余记录
+    atexit.register(journal.stop)
+
+# 导出文件缓存：按评分与基础数据版本号保存，数据未变化时重复下载直接发送文件
+export_cache_config = config.get('export_cache') or {}
+export_cache = ExportCache(
+    cache_dir=export_cache_config.get('cache_dir', 'data/exports'),
+    max_bytes=export_cache_config.get('max_mb', 200) * 1024 * 1024,
+    max_age_hours=export_cache_config.get('max_age_hours', 24)
+)
+
+# 评分结果页面接口：汇总按数据版本缓存在进程内，筛选、排序、分页在内存中完成
+score_api_config = config.get('score_api') or {}
+summary_cache = SummaryCache(
+    max_age=score_api_config.get('max_age', 30),
+    check_interval=score_api_config.get('check_interval', 2.0)
+)
+
+# 按部门导出结果包：各部门工作簿的生成进程数（默认 CPU 核数）
+report_pack_config = config.get('report_pack') or {}
+
+# 评分草稿：前端自动保存的变化在内存中合并，定期批量写库
+drafts_config = config.get('drafts') or {}
+drafts = DraftBuffer(db, flush_interval=drafts_config.get('flush_interval', 3.0))
+atexit.register(drafts.stop)
+
+
+
+def start_background_tasks():
+    """
+    启动本进程的后台线程（评分日志重放与写库）
 
-# ==================== 前台用户路由 ====================
+    不在导入时启动：多进程预加载时主进程 fork 前不应持有线程，
+    由每个工作进程在首个请求或 post_fork 时启动
+    """
+    if journal:
+        journal.ensure_started()
 
-@app.route('/')
-def index():
+
+def warm_up():
     """
-    首页路由 - 显示重点工作指标和满意度部门信息
+    预热：检查数据库连接、补建新版本增加的表与索引，并加载基础数据缓存
 
-    功能:
-    - 检查用户登录状态
-    - 获取当前用户角色权限下的重点工作指标
-    - 获取当前用户角色权限下的满意度部门
-    - 渲染首页模板
+    预加载模式下在 fork 前调用，缓存由各工作进程以写时复制方式共享
+
+    Returns:
+        bool: 是否预热成功
     """
-    # 检查用户是否已登录
-    if 'login_code' not in session:
-        return redirect(url_for('login'))
+    try:
+        applied = db.upgrade_schema()
+        if applied:
+            app.logger.info('已补建表结构: %s', ', '.join(applied))
+        db.ref_cache.sync()
+        db.get_zdgz()
+        db.get_zdgz_departments()
+        db.get_departments()
+        db.get_roles()
+        db.get_myd_permissions()
+        db.get_role_zdgz_permissions()
+        db.get_myd_permission_matrix()
+        db.get_zdgz_permission_matrix()
+        db.get_credential_index()
+    except Exception:
+        app.logger.exception('预热失败')
+        return False
+
+    app.config['WARMED_UP'] = True
+    return True
+
+
+@app.before_request
+def ensure_background_tasks():
+    """
+    每个请求开始时确认本进程的后台线程已启动
 
-    role_id = session.get('role_id')
+    基础数据版本号不在这里检查：读取缓存时按 ref_cache.max_age 检查，
+    不读取基础数据的请求不查询数据库
+    """
+    start_background_tasks()
 
+
+@app.before_request
+def pin_primary():
+    """
+    读写分离：会话最近写过数据时，本次请求的只读查询也走主库（读己之写）
+    """
+    if db.replicas is None:
+        return
+    request.started_at = time.monotonic()
+    db.pin_primary(session.get('primary_until', 0) > time.time())
+
+
+@app.after_request
+def remember_write(response):
+    """
+    本次请求写过数据时，记录会话在 sticky_seconds 内读主库
+    """
+    if db.replicas is not None and hasattr(request, 'started_at') and db.wrote_since(request.started_at):
+        session['primary_until'] = time.time() + db.sticky_seconds
+    return response
+
+
+# ==================== 前台用户路由 ====================
+
+def get_ballot_items(role_id):
+    """
+    获取角色可评价的重点工作指标与满意度部门
+
+    Returns:
+        tuple: ({部门名: [指标, ...]}, [部门, ...])
+    """
     # ===== 重点工作指标 =====
     zdgz_list = db.get_zdgz()
 
@@ -82,13 +232,90 @@ def index():
         if d['id'] in allowed_depts
     ]
 
+    return zdgz_by_dept, departments
+
+
+@app.route('/')
+def index():
+    """
+    首页路由 - 显示重点工作指标和满意度部门信息
+
+    功能:
+    - 检查用户登录状态
+    - 获取当前用户角色权限下的重点工作指标
+    - 获取当前用户角色权限下的满意度部门
+    - 恢复自动保存的评分草稿
+    - 渲染首页模板
+    """
+    # 检查用户是否已登录
+    if 'login_code' not in session:
+        return redirect(url_for('login'))
+
+    zdgz_by_dept, departments = get_ballot_items(session.get('role_id'))
+
+    # 草稿分数转为与下拉框选项一致的字符串，如 130.0 -> '130'
+    draft = {field: f'{score:g}' for field, score in drafts.get(session['login_code']).items()}
+
     return render_template(
         'index.html',
         zdgz_by_dept=zdgz_by_dept,
-        departments=departments
+        departments=departments,
+        draft=draft
     )
 
 
+DRAFT_FIELD_RE = re.compile(r'^(zdgz|satisfaction)_\d+$')
+
+# 评分页下拉框可选分数，草稿与提交只接受其中的值
+SCORE_OPTIONS = {
+    'zdgz': frozenset([130.0, 110.0, 90.0, 70.0]),
+    'satisfaction': frozenset([130.0, 120.0, 110.0, 100.0, 90.0, 80.0, 70.0, 60.0]),
+}
+
+
+def parse_score(field, value):
+    """
+    解析评分项分数
+
+    Raises:
+        ValueError: 不是该评分项的可选分数
+    """
+    score = float(value)
+    if score not in SCORE_OPTIONS[field.split('_', 1)[0]]:
+        raise ValueError(f'无效的分数：{value}')
+    return score
+
+
+@app.route('/score/draft', methods=['POST'])
+def save_draft():
+    """
+    评分草稿自动保存路由
+
+    功能:
+    - 接收前端变化的评分项 {"changes": {"zdgz_12": 130, ...}}
+    - 按登录码在内存中合并，由后台线程定期写库
+    """
+    login_code = session.get('login_code')
+    if not login_code:
+        return jsonify({'error': '登录已失效'}), 401
+
+    changes = (request.get_json(silent=True) or {}).get('changes')
+    if not isinstance(changes, dict) or len(changes) > 1000:
+        return jsonify({'error': '数据格式错误'}), 400
+
+    try:
+        changes = {
+            field: parse_score(field, score)
+            for field, score in changes.items()
+            if DRAFT_FIELD_RE.match(field)
+        }
+    except (TypeError, ValueError):
+        return jsonify({'error': '数据格式错误'}), 400
+
+    drafts.update(login_code, changes)
+    return jsonify({'status': 'ok'})
+
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     """
@@ -103,17 +330,21 @@ def login():
         password = request.form['password']
         ip = request.remote_addr
 
-        user = db.yz_user(login_code)
+        # 先查日志中未写库的评分（任一进程提交的）：若在查询后才写库，下面的校验会读到已使用
+        pending = bool(journal) and journal.is_pending(login_code)
+
+        # 无效登录码、错误密码由内存索引直接判断，不访问数据库
+        status, role_id = db.verify_login(login_code, password)
 
-        if not user:
+        if status == 'invalid':
             return render_template('login.html', error="无效的登录码")
 
-        if user['used'] == 1:
+        if status == 'used' or pending:
             return render_template('login.html', error="该登录码已使用过")
 
-        if user['password'] == password:
+        if status == 'ok':
             session['login_code'] = login_code
-            session['role_id'] = user['role_id']
+            session['role_id'] = role_id
             db.login_rec(ip, login_code)
             return redirect(url_for('index'))
 
@@ -127,6 +358,7 @@ def save_score():
 
     功能:
     - 验证用户登录状态
+    - 合并自动保存的草稿与本次提交的表单，校验评分完整
     - 后端校验重点工作指标优秀率（≤60%）
     - 保存重点工作指标评分
     - 保存满意度评分
@@ -138,21 +370,37 @@ def save_score():
     if not role_id or not login_code:
         return redirect(url_for('login'))
 
-    # ========= 后端兜底校验（重点工作指标优秀率 ≤ 60%）=========
-    zdgz_scores = []
+    # ========= 解析评分（草稿为底，本次提交的表单优先）=========
+    zdgz_by_dept, departments = get_ballot_items(role_id)
+    names = [f"zdgz_{item['id']}" for items in zdgz_by_dept.values() for item in items]
+    names += [f"satisfaction_{d['id']}" for d in departments]
+
+    # 表单通常已包含全部评分项；有缺项时才读取数据库中的草稿（可能由其他进程保存）
+    fields = drafts.pending(login_code)
+    fields.update(request.form.items())
+    if any(name not in fields for name in names):
+        fields = drafts.get(login_code)
+        fields.update(request.form.items())
 
-    for key, value in request.form.items():
-        if key.startswith('zdgz_'):
-            try:
-                score = float(value)
-            except ValueError:
-                score = 0
-            zdgz_scores.append(score)
+    try:
+        scores = {name: parse_score(name, fields[name]) for name in names}
+    except KeyError:
+        return "评分不完整，请返回补充评分。", 400
+    except ValueError:
+        return "评分数据格式错误，请返回重新评分。", 400
+
+    zdgz_scores = {
+        item['id']: scores[f"zdgz_{item['id']}"]
+        for items in zdgz_by_dept.values()
+        for item in items
+    }
+    myd_scores = {d['id']: scores[f"satisfaction_{d['id']}"] for d in departments}
 
+    # ========= 后端兜底校验（重点工作指标优秀率 ≤ 60%）=========
     total_cnt = len(zdgz_scores)
     if total_cnt > 0:
         max_excellent = int(total_cnt * 0.6)
-        excellent_cnt = sum(1 for s in zdgz_scores if s >= 120)
+        excellent_cnt = sum(1 for s in zdgz_scores.values() if s >= 120)
 
         if excellent_cnt > max_excellent:
             return (
@@ -162,34 +410,19 @@ def save_score():
             )
     # ========= 校验结束 =========
 
-    # 重点工作指标评分
-    for key, value in request.form.items():
-        if key.startswith('zdgz_'):
-            zdgz_id = int(key.replace('zdgz_', ''))
-            score = float(value)
-
-            db.save_zdgz_score(
-                login_code=login_code,
-                role_id=role_id,
-                zdgz_id=zdgz_id,
-                score=score
-            )
-
-    # 满意度评分
-    for key, value in request.form.items():
-        if key.startswith('satisfaction_'):
-            dept_id = int(key.replace('satisfaction_', ''))
-            score = float(value)
-
-            db.save_myd_score(
-                login_code=login_code,
-                role_id=role_id,
-                dept_id=dept_id,
-                score=score
-            )
+    if journal:
+        # 写入本地日志后立即返回，由后台线程批量写库并标记登录码已使用
+        journal.submit({
+            'login_code': login_code,
+            'role_id': role_id,
+            'zdgz': zdgz_scores,
+            'myd': myd_scores
+        })
+    else:
+        # 评分与登录码状态在同一事务中保存
+        db.save_ballot(login_code, role_id, zdgz_scores, myd_scores)
 
-    # 标记登录码已使用
-    db.set_used(login_code)
+    drafts.discard(login_code)
     session.clear()
 
     return render_template('score_success.html')
@@ -280,15 +513,12 @@ def satisfaction_manage():
             db.add_department(dept_name, dept_type)
 
     departments = db.get_departments()
-    roles = db.get_roles()
-
-    myd_permissions = db.get_myd_permissions()
+    myd_matrix = db.get_myd_permission_matrix()
 
     return render_template(
         '/admin/myd.html',
         departments=departments,
-        roles=roles,
-        myd_permissions=myd_permissions
+        myd_matrix=myd_matrix
     )
 
 
@@ -304,6 +534,14 @@ def save_myd_permission():
         if not isinstance(data, list):
             return jsonify({'error': '数据格式错误'}), 400
 
+        # 校验角色、部门存在且权重有效
+        matrix = db.get_myd_permission_matrix()
+        try:
+            for item in data:
+                matrix.validate(int(item['role_id']), int(item['dept_id']), item.get('weight', 1.0))
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': str(e) if isinstance(e, ValueError) else '数据格式错误'}), 400
+
         db.save_myd_permissions(data)
 
         return jsonify({'msg': '满意度权限与权重保存成功'})
@@ -361,6 +599,8 @@ def delete_role():
 
         conn.commit()
 
+    db.ref_cache.bump('role', 'permission')
+
     return jsonify({'status': 'ok'})
 
 
@@ -402,6 +642,8 @@ def update_dept_desc():
         )
         conn.commit()
 
+    db.ref_cache.bump('department')
+
     return redirect('/admin/myd?saved=1')
 
 
@@ -419,27 +661,40 @@ def zdgz_page():
     - 获取重点工作指标项目
     - 渲染重点工作指标管理页面
     """
-    roles = db.get_roles()
-    zdgz_departments = db.get_zdgz_departments()
-    zdgz_permissions = db.get_role_zdgz_permissions()
+    zdgz_matrix = db.get_zdgz_permission_matrix()
     zdgz_items = db.get_zdgz()
 
     return render_template(
         '/admin/zdgz.html',
-        roles=roles,
-        zdgz_departments=zdgz_departments,
-        zdgz_permissions=zdgz_permissions,
+        zdgz_matrix=zdgz_matrix,
         zdgz_items=zdgz_items
     )
 
 
+def _import_zdgz_job(job, data):
+    """
+    导入重点工作指标任务
+    """
+    job.progress(0, None, '正在解析 Excel')
+    try:
+        rows = parse_zdgz_workbook(BytesIO(data))
+    except ValueError as e:
+        raise JobFailed(str(e))
+
+    job.progress(0, len(rows), '正在写入数据库')
+    insert_count = replace_zdgz(rows, progress=lambda n: job.progress(n, len(rows), '正在写入数据库'))
+    job.progress(insert_count, len(rows), '导入完成')
+    return f'导入成功，已更新 {insert_count} 条重点工作指标'
+
+
 @app.route('/admin/zdgz/import', methods=['POST'])
+@admin_required
 def import_zdgz():
     """
     上传重点工作指标信息路由
 
     功能:
-    - 从Excel文件导入重点工作指标数据
+    - 从Excel文件导入重点工作指标数据（后台任务，返回任务ID供页面轮询）
     - Excel 第一行是表头，数据从 A2 开始
     - A: 部门
     - B: 绩效指标
@@ -450,93 +705,8 @@ def import_zdgz():
     if not file:
         return jsonify({'error': '未选择文件'}), 400
 
-    try:
-        wb = load_workbook(file)
-        sheet = wb.active
-
-        departments = []
-        indicators = []
-        descriptions = []
-        work_descs = []
-
-        current_department = None
-
-        # 从第 2 行开始读取（跳过表头）
-        for row in range(2, sheet.max_row + 1):
-            department = sheet[f'A{row}'].value
-            if department:
-                current_department = str(department).strip()
-            else:
-                department = current_department
-
-            indicator_name = sheet[f'B{row}'].value
-            description = sheet[f'C{row}'].value
-            work_desc = sheet[f'D{row}'].value
-
-            # B、C、D 都为空，认为到末尾
-            if not indicator_name and not description and not work_desc:
-                break
-
-            # 基础清洗
-            indicator_name = db.clean_text(indicator_name) if indicator_name else None
-            description = db.clean_text(description) if description else "无指标含义"
-            work_desc = db.clean_text(work_desc)
-
-            # 完成情况字数校验
-            if work_desc:
-                length = len(work_desc)
-                if length < 1 or length > 1000:
-                    return jsonify({
-                        'error': f'第 {row} 行完成情况字数为 {length}，需在 1–1000 字之间'
-                    }), 400
-
-            departments.append(department)
-            indicators.append(indicator_name)
-            descriptions.append(description)
-            work_descs.append(work_desc)
-
-        data = pd.DataFrame({
-            'department': departments,
-            'indicator_name': indicators,
-            'description': descriptions,
-            'work_desc': work_descs
-        })
-
-        if data.empty:
-            return jsonify({'error': 'Excel 中未读取到任何指标数据'}), 400
-
-        insert_count = 0
-
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # 清空旧数据
-            cursor.execute("DELETE FROM zdgz")
-
-            # 插入新数据
-            for _, row in data.iterrows():
-                cursor.execute("""
-                    INSERT INTO zdgz (
-                        department,
-                        indicator_name,
-                        description,
-                        work_desc
-                    )
-                    VALUES (%s, %s, %s, %s)
-                """, (
-                    row['department'],
-                    row['indicator_name'],
-                    row['description'],
-                    row['work_desc']
-                ))
-                insert_count += 1
-
-            conn.commit()
-
-        return jsonify({'msg': f'导入成功，已更新 {insert_count} 条重点工作指标'})
-
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    job_id = job_runner.submit('import_zdgz', '导入重点工作指标', _import_zdgz_job, file.read())
+    return jsonify({'job_id': job_id}), 202
 
 
 @app.route('/admin/zdgz/evidence/upload', methods=['POST'])
@@ -549,7 +719,7 @@ def upload_zdgz_evidence():
     - 需要管理员权限
     - 处理重点工作指标佐证文件上传
     - 安全处理文件名
-    - 删除旧文件并保存新文件
+    - 保存新文件（本地目录或对象存储）后删除旧文件
     - 更新数据库中的文件路径
     """
     zdgz_id = request.form.get('zdgz_id')
@@ -571,27 +741,21 @@ def upload_zdgz_evidence():
     # 文件名安全处理
     indicator_name = re.sub(r'[\\/:*?"<>|]', '_', indicator_name)
 
-    # ===== 删除旧文件 =====
-    old_path = db.get_zdgz_evidence_path(zdgz_id)
-    if old_path:
-        abs_old = os.path.join(app.root_path, old_path)
-        if os.path.exists(abs_old):
-            os.remove(abs_old)
-
     # ===== 保存新文件 =====
     ext = file.filename.rsplit('.', 1)[1].lower()
-    save_dir = os.path.join(UPLOAD_ROOT, str(zdgz_id))
-    os.makedirs(save_dir, exist_ok=True)
-
     filename = f"{indicator_name}佐证材料.{ext}"
-    abs_path = os.path.join(save_dir, filename)
-    file.save(abs_path)
-
     rel_path = f"uploads/zdgz/{zdgz_id}/{filename}"
 
+    old_path = db.get_zdgz_evidence_path(zdgz_id)
+    evidence_storage.save(rel_path, file.stream, file.mimetype)
+
     # ===== 更新数据库 =====
     db.update_zdgz_evidence(zdgz_id, rel_path)
 
+    # ===== 删除旧文件（新文件保存成功后）=====
+    if old_path and old_path != rel_path:
+        evidence_storage.delete(old_path)
+
     return jsonify({'msg': '上传成功'})
 
 
@@ -602,20 +766,83 @@ def download_zdgz_evidence(zdgz_id):
 
     功能:
     - 根据指标ID下载对应的佐证材料
+    - 对象存储时重定向到预签名地址，由浏览器直接从存储下载
     """
     path = db.get_zdgz_evidence_path(zdgz_id)
     if not path:
         abort(404)
 
-    # 拆目录和文件名
-    directory = os.path.dirname(path)
     filename = os.path.basename(path)
 
-    return send_from_directory(
-        directory,
-        filename,
-        as_attachment=True
-    )
+    url = evidence_storage.download_url(path, filename)
+    if url:
+        response = redirect(url)
+        # 预签名地址有有效期，不缓存重定向
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    try:
+        local_path = evidence_storage.local_path(path)
+    except FileNotFoundError:
+        abort(404)
+    if not os.path.isfile(local_path):
+        abort(404)
+    return send_file(local_path, as_attachment=True, download_name=filename)
+
+
+@app.route('/zdgz/evidence/bundle')
+def download_evidence_bundle():
+    """
+    打包下载佐证材料路由
+
+    功能:
+    - 边读文件边输出 ZIP，不在内存或磁盘上生成完整压缩包，下载立即开始
+    - ?department= 只打包该部门，否则打包全部
+    - 压缩包内按 部门/文件名 组织
+    - 评价人只能下载其角色有权评价的部门，管理员不受限制
+    """
+    if 'admin_user' in session:
+        allowed_depts = None
+    elif session.get('role_id'):
+        allowed_depts = set(db.get_role_zdgz_permissions().get(session['role_id'], []))
+    else:
+        return redirect(url_for('login'))
+
+    department = request.args.get('department')
+    if department and allowed_depts is not None and department not in allowed_depts:
+        abort(403)
+
+    entries = []
+    used_names = set()
+    for item in db.get_zdgz():
+        if not item['evidence_path']:
+            continue
+        if department and item['department'] != department:
+            continue
+        if allowed_depts is not None and item['department'] not in allowed_depts:
+            continue
+
+        # 同一部门内文件名重复时加序号
+        dept_dir = re.sub(r'[\\/:*?"<>|]', '_', item['department'])
+        root, ext = os.path.splitext(os.path.basename(item['evidence_path']))
+        arcname = f"{dept_dir}/{root}{ext}"
+        n = 2
+        while arcname in used_names:
+            arcname = f"{dept_dir}/{root}({n}){ext}"
+            n += 1
+        used_names.add(arcname)
+
+        entries.append((arcname, functools.partial(evidence_storage.open, item['evidence_path'])))
+
+    if not entries:
+        abort(404)
+
+    filename = f"{department or '全部部门'}佐证材料.zip"
+    response = Response(stream_with_context(zip_stream(entries)), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    # 反向代理不缓冲，数据块直接发往客户端
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @app.route('/admin/zdgz/permission/save', methods=['POST'])
@@ -630,6 +857,17 @@ def save_zdgz_permission():
         if not isinstance(data, list):
             return jsonify({'error': '数据格式错误'}), 400
 
+        # 校验角色、部门存在且权重有效
+        matrix = db.get_zdgz_permission_matrix()
+        try:
+            for item in data:
+                role_id = int(item['role_id'])
+                matrix.validate(role_id, weight=item.get('zdgz_weight', 0))
+                for dept in item.get('departments', []):
+                    matrix.validate(role_id, dept)
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': str(e) if isinstance(e, ValueError) else '数据格式错误'}), 400
+
         # 保存角色-部门权限
         db.save_role_zdgz_permissions(data)
 
@@ -642,6 +880,28 @@ def save_zdgz_permission():
 
 
 
+def _login_codes_job(job, role_count_map):
+    """
+    重新生成登录码任务：清空评分与旧登录码、生成新登录码并导出 Excel
+    """
+    job.progress(0, None, '正在清空历史数据')
+    reset_round(journal)
+
+    total = sum(role_count_map.values())
+    generate_login_codes_by_role(
+        role_count_map,
+        progress=lambda done, count: job.progress(done, count, '正在生成登录码')
+    )
+
+    job.progress(total, total, '正在导出 Excel')
+    job.set_result(
+        export_login_codes(),
+        f"登录码_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    return f'已生成 {total} 个登录码'
+
+
 @app.route('/admin/login_codes', methods=['GET', 'POST'])
 @admin_required
 def admin_login_codes():
@@ -650,90 +910,508 @@ def admin_login_codes():
 
     功能:
     - GET: 显示登录码管理页面
-    - POST: 生成新的登录码并导出Excel
+    - POST: 提交后台任务（清空评分、生成新的登录码并导出Excel），返回任务ID
     """
     roles = db.get_roles()
 
     if request.method == 'POST':
-
-        # ===== 清空历史数据 =====
-        db.clear_all_scores()  # 清空 zdgz_score / myd_score
-        db.clear_login_codes()  # 清空旧登录码
-
-        # ===== 生成新的登录码 =====
         role_count_map = {}
         for r in roles:
-            count = int(request.form.get(f'role_{r["id"]}', 0))
+            count = int(request.form.get(f'role_{r["id"]}', 0) or 0)
             if count > 0:
                 role_count_map[r['id']] = count
 
-        generate_login_codes_by_role(role_count_map)
-
-        # ===== 导出 Excel =====
-        excel_io = export_login_codes()
-
-        return send_file(
-            excel_io,
-            as_attachment=True,
-            download_name=f"登录码_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        job_id = job_runner.submit('login_codes', '生成登录码', _login_codes_job, role_count_map)
+        return jsonify({'job_id': job_id}), 202
 
     return render_template('/admin/login_codes.html', roles=roles)
 
 
 @app.route('/admin/scores')
+@admin_required
 def admin_scores():
     """
     管理员查看评分结果页面路由
 
     功能:
     - 获取登录码统计信息
-    - 获取重点工作指标评分汇总
-    - 获取满意度评分汇总
-    - 渲染评分结果页面
+    - 渲染评分结果页面，评分表由页面通过 /admin/api/scores/* 分页加载
     """
     stats = db.get_login_code_stats_by_role()
 
-    zdgz_scores = db.get_zdgz_score_summary()
-    myd_scores = db.get_myd_score_summary()
-
     return render_template(
         'admin/scores.html',
         total_count=stats['total_count'],
         used_count=stats['used_count'],
         role_stats=stats['roles'],
-        zdgz_scores=zdgz_scores,
-        myd_scores=myd_scores
+        zdgz_departments=db.get_zdgz_departments(),
+        myd_departments=db.get_departments(),
+        roles=db.get_roles()
+    )
+
+
+# 评分接口排序字段：排序键末项为唯一ID，保证键集分页的全序
+ZDGZ_SORTS = {
+    'department': lambda r: [r['dept_name'], r['zdgz_id']],
+    'indicator': lambda r: [r['indicator_name'], r['zdgz_id']],
+    'total': lambda r: [r['total'], r['zdgz_id']],
+}
+MYD_SORTS = {
+    'department': lambda r: [r['dept_id'], r['role_id']],
+    'role': lambda r: [r['role_id'], r['dept_id']],
+    'weighted': lambda r: [r['weighted_score'] or 0, r['dept_id'], r['role_id']],
+}
+
+
+def _score_page(rows, sorts):
+    """
+    按请求参数 sort / order / after / limit 分页
+
+    Returns:
+        tuple: (本页行, 下一页游标)
+
+    Raises:
+        ValueError: 参数无效
+    """
+    sort = request.args.get('sort', 'department')
+    if sort not in sorts:
+        raise ValueError(f'不支持的排序字段：{sort}')
+    try:
+        limit = min(max(int(request.args.get('limit', 100)), 1), 500)
+    except ValueError:
+        raise ValueError('limit 格式错误')
+
+    return keyset_page(
+        rows,
+        sorts[sort],
+        descending=request.args.get('order') == 'desc',
+        after=request.args.get('after'),
+        limit=limit
+    )
+
+
+@app.route('/admin/api/scores/zdgz')
+@admin_required
+def api_zdgz_scores():
+    """
+    重点工作指标评分接口（每个指标一行）
+
+    参数:
+    - department: 部门名；role: 角色名（只返回该角色的得分列）；indicator: 指标名关键字
+    - sort: department / indicator / total；order: asc / desc
+    - after: 上一页返回的 next 游标；limit: 每页行数（≤500）
+    """
+    rows, roles = summary_cache.get(
+        'zdgz', scores_export_version, lambda: pivot_zdgz(db.get_zdgz_score_summary())
     )
 
+    department = request.args.get('department')
+    role = request.args.get('role')
+    keyword = request.args.get('indicator', '').strip()
+    if department:
+        rows = [r for r in rows if r['dept_name'] == department]
+    if role:
+        rows = [r for r in rows if role in r['scores']]
+    if keyword:
+        rows = [r for r in rows if keyword in r['indicator_name']]
+
+    present = set()
+    for r in rows:
+        present.update(r['scores'])
+    roles = [x for x in roles if x in present and (not role or x == role)]
+
+    try:
+        page, next_cursor = _score_page(rows, ZDGZ_SORTS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'rows': page, 'next': next_cursor, 'count': len(rows), 'roles': roles})
+
 
-@app.route('/admin/scores/export')
+@app.route('/admin/api/scores/myd')
+@admin_required
+def api_myd_scores():
+    """
+    满意度评分接口（每个 部门 × 角色 一行）
+
+    参数:
+    - department: 部门名；role: 角色名
+    - sort: department / role / weighted；order: asc / desc
+    - after、limit 同重点工作指标接口
+
+    返回的 dept_totals 为筛选后各部门加权得分合计
+    """
+    rows, totals = summary_cache.get(
+        'myd', scores_export_version, lambda: flatten_myd(db.get_myd_score_summary())
+    )
+
+    department = request.args.get('department')
+    role = request.args.get('role')
+    if department:
+        rows = [r for r in rows if r['dept_name'] == department]
+    if role:
+        rows = [r for r in rows if r['role_name'] == role]
+
+    try:
+        page, next_cursor = _score_page(rows, MYD_SORTS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if role:
+        # 只按该角色筛选时，合计也只计该角色
+        totals = {}
+        for r in rows:
+            totals[r['dept_name']] = round(totals.get(r['dept_name'], 0) + (r['weighted_score'] or 0), 4)
+    dept_totals = {r['dept_name']: totals.get(r['dept_name'], 0) for r in rows}
+
+    return jsonify({'rows': page, 'next': next_cursor, 'count': len(rows), 'dept_totals': dept_totals})
+
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+SCORES_EXPORT_NAME = '绩效考核评分汇总.xlsx'
+
+
+def scores_export_version():
+    """
+    评分导出的数据版本：评分、指标、角色、部门、权限任一变化即改变
+
+    每次保存评分（含覆盖已有评分）都在同一事务中递增 scores 版本号
+    """
+    versions = db.get_data_versions()
+    return '.'.join(
+        str(versions.get(name, 0))
+        for name in ('scores', 'zdgz', 'role', 'department', 'permission')
+    )
+
+
+def _export_scores_job(job, version, download_url):
+    """
+    导出评分结果任务（结果保存到导出缓存）
+    """
+    output = BytesIO()
+    db.export_score_workbook(output, progress=job.progress)
+
+    # 版本号在汇总前读取，导出期间有新提交时下次导出会重新生成
+    export_cache.put('scores', version, output, '.xlsx')
+    job.set_download_url(download_url, SCORES_EXPORT_NAME)
+    return '导出完成'
+
+
+@app.route('/admin/scores/export', methods=['POST'])
+@admin_required
 def export_scores():
     """
     导出评分结果路由
 
     功能:
-    - 导出重点工作指标评分Excel
-    - 导出满意度评分Excel
-    - 合并为一个Excel文件下载
+    - 数据未变化且已有导出文件时直接返回下载地址
+    - 否则提交导出任务，返回任务ID供页面轮询
+    - 导出重点工作指标评分与满意度评分，合并为一个Excel文件
     """
-    zdgz_df = db.export_zdgz_score_excel()
-    myd_df = db.export_myd_score_excel()
+    version = scores_export_version()
+    download_url = url_for('download_scores_export', version=version)
+    if export_cache.get('scores', version):
+        return jsonify({'download_url': download_url})
 
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        zdgz_df.to_excel(writer, index=False, sheet_name='重点工作指标')
-        myd_df.to_excel(writer, index=False, sheet_name='满意度评价')
+    job_id = job_runner.submit('export_scores', '导出评分结果', _export_scores_job, version, download_url)
+    return jsonify({'job_id': job_id}), 202
+
+
+@app.route('/admin/scores/export/<version>')
+@admin_required
+def download_scores_export(version):
+    """
+    下载缓存的评分导出文件路由
+
+    功能:
+    - 按数据版本发送已生成的文件，ETag 为文件内容摘要，未变化时返回 304
+    """
+    cached = export_cache.get('scores', version)
+    if not cached:
+        return "导出文件已过期，请返回重新导出。", 404
+
+    path, digest = cached
+    try:
+        response = send_file(
+            path,
+            mimetype=XLSX_MIMETYPE,
+            as_attachment=True,
+            download_name=SCORES_EXPORT_NAME,
+            etag=digest,
+            conditional=True
+        )
+    except FileNotFoundError:
+        # 查找后文件被其他请求淘汰
+        return "导出文件已过期，请返回重新导出。", 404
+    # 浏览器可缓存，但每次使用前需用 ETag 验证
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@app.route('/admin/scores/report_pack')
+@admin_required
+def export_report_pack():
+    """
+    按部门导出结果包路由
+
+    功能:
+    - 每个部门生成一个工作簿（本部门指标的各角色评分与满意度结果）
+    - 各部门工作簿在进程池中并行生成，边生成边以 ZIP 流式下载
+    """
+    zdgz_summary = db.get_zdgz_score_summary()
+    myd_summary = db.get_myd_score_summary()
+    if not zdgz_summary and not myd_summary:
+        abort(404)
+
+    entries = iter_report_pack(zdgz_summary, myd_summary, report_pack_config.get('max_workers'))
+    response = Response(zip_stream(entries), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote('各部门绩效考核结果.zip')}"
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+RAW_EXPORT_NAMES = {'zdgz': '重点工作指标评分', 'myd': '满意度评分'}
+
+
+@app.route('/admin/scores/raw/<kind>.<fmt>')
+@admin_required
+def export_raw_scores(kind, fmt):
+    """
+    原始评分导出路由（供数据分析使用）
+
+    功能:
+    - kind: zdgz / myd；fmt: csv / ndjson，输出 gzip 压缩
+    - 每条评分一行，附指标、部门、角色名称
+    - 从数据库逐批读取、边读边压缩发送，数据量大时内存占用不变
+
+    参数:
+    - department: 部门名；role: 角色名
+    - start / end: 评分时间范围 [start, end)，如 2024-01-01 或 2024-01-01 08:00
+    """
+    if kind not in RAW_EXPORT_NAMES or fmt not in FORMATS:
+        abort(404)
+
+    try:
+        batches = db.iter_raw_scores(
+            kind,
+            department=request.args.get('department') or None,
+            role=request.args.get('role') or None,
+            start=parse_time(request.args.get('start'), 'start'),
+            end=parse_time(request.args.get('end'), 'end')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filename = f'{RAW_EXPORT_NAMES[kind]}.{fmt}.gz'
+    response = Response(iter_raw_export(kind, fmt, batches), mimetype='application/gzip')
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/admin/jobs/<job_id>')
+@admin_required
+def job_status(job_id):
+    """
+    后台任务状态路由（供页面轮询）
+
+    功能:
+    - 返回任务状态、进度、完成提示或错误信息
+    - 任务完成且有结果文件时附带下载地址
+    """
+    status = job_runner.status(job_id)
+    if status is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+
+    if status['state'] == 'done' and status['result']:
+        status['download_url'] = status['result'].get('url') or url_for('download_job_result', job_id=job_id)
+    return jsonify(status)
+
+
+@app.route('/admin/jobs/<job_id>/download')
+@admin_required
+def download_job_result(job_id):
+    """
+    下载后台任务结果文件
+    """
+    status = job_runner.status(job_id)
+    if status is None or status['state'] != 'done' or not status['result']:
+        abort(404)
 
-    output.seek(0)
     return send_file(
-        output,
+        job_runner.result_path(job_id),
         as_attachment=True,
-        download_name='绩效考核评分汇总.xlsx',
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        download_name=status['result']['filename'],
+        mimetype=status['result']['mimetype']
     )
 
 
+@app.route('/admin/slow_queries', methods=['GET', 'POST'])
+@admin_required
+def admin_slow_queries():
+    """
+    慢查询查看路由
+
+    功能:
+    - GET: 按语句指纹汇总展示慢查询及其执行计划
+    - POST: 清空慢查询记录
+    """
+    if request.method == 'POST':
+        db.slow_query_log.clear()
+        return redirect(url_for('admin_slow_queries'))
+
+    return render_template(
+        'admin/slow_queries.html',
+        threshold_ms=int(db.slow_query_log.threshold * 1000),
+        queries=db.slow_query_log.summary()
+    )
+
+
+@app.route('/admin/profiling', methods=['GET', 'POST'])
+@admin_required
+def admin_profiling():
+    """
+    请求性能分析管理路由
+
+    功能:
+    - GET: 显示分析开关、目标路由、抽样比例及已保存的分析文件
+    - POST: 更新分析配置（保存到共享文件，所有工作进程生效）
+    """
+    if request.method == 'POST':
+        try:
+            sample_rate = float(request.form.get('sample_rate') or 0)
+        except ValueError:
+            sample_rate = 0.0
+
+        profiler.configure(
+            enabled=request.form.get('enabled') == '1',
+            endpoints=request.form.getlist('endpoints'),
+            sample_rate=sample_rate
+        )
+        return redirect(url_for('admin_profiling'))
+
+    endpoints = sorted(e for e in app.view_functions if e != 'static')
+    profiler.refresh(force=True)
+
+    return render_template(
+        'admin/profiling.html',
+        profiler=profiler,
+        endpoints=endpoints,
+        dumps=profiler.list_dumps()
+    )
+
+
+@app.route('/admin/profiling/<name>')
+@admin_required
+def view_profile(name):
+    """
+    查看分析结果路由
+
+    功能:
+    - 按指定字段排序展示调用统计表
+    """
+    path = profiler.dump_path(name)
+    if not path:
+        abort(404)
+
+    sort = request.args.get('sort', 'cumulative')
+    try:
+        limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+    except ValueError:
+        return "limit 格式错误", 400
+    total_time, rows = profiler.load_table(path, sort=sort, limit=limit)
+
+    return render_template(
+        'admin/profile_view.html',
+        name=name,
+        sort=sort,
+        total_time=total_time,
+        rows=rows
+    )
+
+
+@app.route('/admin/profiling/<name>/download')
+@admin_required
+def download_profile(name):
+    """
+    下载分析文件路由（可用 snakeviz 等工具离线查看）
+    """
+    if not profiler.dump_path(name):
+        abort(404)
+
+    return send_from_directory(profiler.dump_dir, name, as_attachment=True)
+
+
+@app.route('/admin/journal/status')
+@admin_required
+def journal_status():
+    """
+    评分日志积压情况路由
+
+    功能:
+    - 返回待写库评分表数量、最近写库时间及错误
+    """
+    if not journal:
+        return jsonify({'mode': 'direct'})
+
+    return jsonify({'mode': 'journal', **journal.backlog()})
+
+
+@app.route('/admin/admission')
+@admin_required
+def admission_status():
+    """
+    提交准入控制状态路由
+
+    功能:
+    - 返回当前进程处理中、排队的提交数及累计拒绝次数
+    """
+    return jsonify(admission.stats())
+
+
+@app.route('/admin/replicas')
+@admin_required
+def replica_status():
+    """
+    从库状态路由
+
+    功能:
+    - 返回各从库的复制延迟与是否参与只读查询
+    """
+    if db.replicas is None:
+        return jsonify({'replicas': []})
+
+    db.replicas.check()
+    return jsonify({'max_lag': db.replicas.max_lag, 'replicas': db.replicas.status()})
+
+
+@app.route('/readyz')
+def readyz():
+    """
+    就绪检查路由（供负载均衡 / 进程管理器探测）
+
+    功能:
+    - 本进程未完成预热时先预热
+    - 数据库可连接且基础数据缓存已加载时返回 200，否则返回 503
+    """
+    if not app.config.get('WARMED_UP') and not warm_up():
+        return jsonify({'status': 'warming'}), 503
+
+    try:
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+
+    return jsonify({
+        'status': 'ready',
+        'pid': os.getpid(),
+        'cache': db.ref_cache.stats(),
+        'singleflight': db.singleflight.stats()
+    })
+
+
 if __name__ == '__main__':
-    app.run(debug=True, host=config['app']['host'], port=config['app']['port'])
\ No newline at end of file
+    # 开发调试用；生产环境请使用 python serve.py
+    app.run(debug=config['app'].get('debug', False), host=config['app']['host'], port=config['app']['port'])
\ No newline at end of file
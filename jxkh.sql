@@ -34,6 +34,26 @@ CREATE TABLE `admin_user`  (
 -- ----------------------------
 INSERT INTO `admin_user` VALUES (1, 'admin', 'admin123');
 
+-- ----------------------------
+-- Table structure for cache_version
+-- ----------------------------
+DROP TABLE IF EXISTS `cache_version`;
+CREATE TABLE `cache_version`  (
+  `name` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci NOT NULL COMMENT '缓存分组',
+  `version` bigint NOT NULL DEFAULT 0 COMMENT '版本号，修改基础数据或评分后递增',
+  PRIMARY KEY (`name`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_general_ci COMMENT = '基础数据缓存版本表' ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Records of cache_version
+-- ----------------------------
+INSERT INTO `cache_version` VALUES ('department', 0);
+INSERT INTO `cache_version` VALUES ('login_code', 0);
+INSERT INTO `cache_version` VALUES ('permission', 0);
+INSERT INTO `cache_version` VALUES ('role', 0);
+INSERT INTO `cache_version` VALUES ('scores', 0);
+INSERT INTO `cache_version` VALUES ('zdgz', 0);
+
 -- ----------------------------
 -- Table structure for department
 -- ----------------------------
@@ -86,7 +106,8 @@ CREATE TABLE `login_no`  (
   `role_id` int NOT NULL COMMENT '角色ID',
   `account` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci NOT NULL COMMENT '账号',
   `password` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci NOT NULL COMMENT '密码',
-  `used` int NULL DEFAULT 0 COMMENT '是否已使用'
+  `used` int NULL DEFAULT 0 COMMENT '是否已使用',
+  INDEX `idx_account`(`account` ASC) USING BTREE
 ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_general_ci COMMENT = '匿名账号信息表' ROW_FORMAT = Dynamic;
 
 -- ----------------------------
@@ -162,6 +183,18 @@ CREATE TABLE `role_zdgz_permission`  (
 -- Records of role_zdgz_permission
 -- ----------------------------
 
+-- ----------------------------
+-- Table structure for score_draft
+-- ----------------------------
+DROP TABLE IF EXISTS `score_draft`;
+CREATE TABLE `score_draft`  (
+  `login_code` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci NOT NULL COMMENT '登录码',
+  `field` varchar(50) CHARACTER SET utf8mb4 COLLATE utf8mb4_general_ci NOT NULL COMMENT '评分项（zdgz_指标ID / satisfaction_部门ID）',
+  `score` decimal(5, 2) NOT NULL COMMENT '评分',
+  `update_time` datetime NULL DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间',
+  PRIMARY KEY (`login_code`, `field`) USING BTREE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_general_ci COMMENT = '评分草稿表' ROW_FORMAT = Dynamic;
+
 -- ----------------------------
 -- Table structure for zdgz
 -- ----------------------------
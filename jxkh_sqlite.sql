@@ -0,0 +1,123 @@
+-- ----------------------------
+-- SQLite 建表脚本（与 jxkh.sql 结构、索引保持一致）
+-- 由 SQLiteBackend 首次连接时自动执行，可重复执行
+-- ----------------------------
+
+-- 管理员表
+CREATE TABLE IF NOT EXISTS admin_user (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username VARCHAR(50) NOT NULL UNIQUE,
+  password VARCHAR(100) NOT NULL
+);
+
+INSERT OR IGNORE INTO admin_user (id, username, password) VALUES (1, 'admin', 'admin123');
+
+-- 基础数据缓存版本表
+CREATE TABLE IF NOT EXISTS cache_version (
+  name VARCHAR(50) NOT NULL PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO cache_version (name, version) VALUES
+  ('department', 0), ('login_code', 0), ('permission', 0), ('role', 0), ('scores', 0), ('zdgz', 0);
+
+-- 部门表
+CREATE TABLE IF NOT EXISTS department (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  dept_name VARCHAR(100) NOT NULL,
+  dept_type TEXT CHECK (dept_type IN ('front', 'middle')),
+  enable INTEGER NOT NULL,
+  work_desc VARCHAR(1000)
+);
+
+-- 打分角色表
+CREATE TABLE IF NOT EXISTS evaluator_role (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  role_name VARCHAR(50) NOT NULL,
+  myd_weight DECIMAL(5, 2) NOT NULL DEFAULT 1.00,
+  zdgz_weight DECIMAL(5, 2) NOT NULL DEFAULT 1.00
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_role_name ON evaluator_role (role_name);
+
+-- 匿名账号信息表
+CREATE TABLE IF NOT EXISTS login_no (
+  role_id INTEGER NOT NULL,
+  account VARCHAR(100) NOT NULL,
+  password VARCHAR(100) NOT NULL,
+  used INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_login_no_account ON login_no (account);
+
+-- 登录日志
+CREATE TABLE IF NOT EXISTS login_rec (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  ip VARCHAR(50) NOT NULL,
+  account VARCHAR(50) NOT NULL,
+  login_time DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+
+-- 部门满意度评分表
+CREATE TABLE IF NOT EXISTS myd_score (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  role_id INTEGER NOT NULL,
+  login_code VARCHAR(50) NOT NULL,
+  dept_id INTEGER NOT NULL,
+  score DECIMAL(5, 2) NOT NULL,
+  create_time DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_login_role_dept ON myd_score (login_code, role_id, dept_id);
+CREATE INDEX IF NOT EXISTS idx_myd_score_role ON myd_score (role_id);
+CREATE INDEX IF NOT EXISTS idx_myd_score_dept ON myd_score (dept_id);
+
+-- 角色-部门关系表（满意度）
+CREATE TABLE IF NOT EXISTS role_dept_permission (
+  role_id INTEGER NOT NULL,
+  dept_id INTEGER NOT NULL,
+  myd_weight DECIMAL(5, 2) NOT NULL DEFAULT 1.00,
+  PRIMARY KEY (role_id, dept_id)
+);
+
+-- 角色-重点工作指标关系表
+CREATE TABLE IF NOT EXISTS role_zdgz_permission (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  role_id INTEGER NOT NULL,
+  department VARCHAR(100) NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_role_department ON role_zdgz_permission (role_id, department);
+CREATE INDEX IF NOT EXISTS idx_role_zdgz_permission_role ON role_zdgz_permission (role_id);
+CREATE INDEX IF NOT EXISTS idx_role_zdgz_permission_department ON role_zdgz_permission (department);
+
+-- 评分草稿表
+CREATE TABLE IF NOT EXISTS score_draft (
+  login_code VARCHAR(50) NOT NULL,
+  field VARCHAR(50) NOT NULL,
+  score DECIMAL(5, 2) NOT NULL,
+  update_time DATETIME DEFAULT (datetime('now', 'localtime')),
+  PRIMARY KEY (login_code, field)
+);
+
+-- 重点工作指标信息表
+CREATE TABLE IF NOT EXISTS zdgz (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  department VARCHAR(100) NOT NULL,
+  indicator_name VARCHAR(100) NOT NULL,
+  description TEXT NOT NULL,
+  work_desc TEXT,
+  is_enabled INTEGER DEFAULT 1,
+  sort_order INTEGER DEFAULT 0,
+  created_at DATETIME DEFAULT (datetime('now', 'localtime')),
+  evidence_path VARCHAR(255)
+);
+
+-- 重点工作指标评分表
+CREATE TABLE IF NOT EXISTS zdgz_score (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  role_id INTEGER NOT NULL,
+  login_code VARCHAR(50) NOT NULL,
+  zdgz_id INTEGER NOT NULL,
+  score DECIMAL(5, 2) NOT NULL,
+  create_time DATETIME DEFAULT (datetime('now', 'localtime'))
+);
+CREATE UNIQUE INDEX IF NOT EXISTS uk_login_role_zdgz ON zdgz_score (login_code, role_id, zdgz_id);
+CREATE INDEX IF NOT EXISTS idx_zdgz_score_role ON zdgz_score (role_id);
+CREATE INDEX IF NOT EXISTS idx_zdgz_score_zdgz ON zdgz_score (zdgz_id);
@@ -0,0 +1,364 @@
+"""
+登录 → 首页 → 提交评分 并发压测工具
+
+用法:
+    python loadtest.py loadtest.example.yaml --yes
+    python loadtest.py loadtest.example.yaml --yes --url http://127.0.0.1:5000
+
+说明:
+- 按配置文件创建角色、部门、重点工作指标及权限，并生成登录码
+  （会清空现有评分、登录码及全部重点工作指标，需显式传入 --yes；只应对专用测试库运行）
+- 每个登录码模拟一名评价人，通过真实 Flask 路由完成整个流程
+- 默认在进程内使用 Flask test client，传入 --url 时走 HTTP
+- 输出吞吐量、各路由 p50/p95/p99 延迟与错误率
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from ballot_journal import create_journal
+from database import db
+from login_code import generate_login_codes_by_role, reset_round
+
+ZDGZ_FIELD = re.compile(r'name="zdgz_(\d+)"')
+MYD_FIELD = re.compile(r'name="satisfaction_(\d+)"')
+
+ZDGZ_OPTIONS = [110, 90, 70]
+MYD_OPTIONS = [130, 120, 110, 100, 90, 80, 70, 60]
+
+# 提交返回 503（准入控制拒绝）时的最多尝试次数与重试间隔（秒，另加随机抖动）
+SUBMIT_ATTEMPTS = 10
+SUBMIT_RETRY_DELAY = 0.5
+
+
+# ==================== 客户端 ====================
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class HttpClient:
+    """
+    基于 urllib 的 HTTP 客户端（保持 Cookie，不自动跟随重定向）
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _NoRedirect()
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode('utf-8') if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                return resp.status, resp.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace')
+
+
+class FlaskClient:
+    """
+    进程内 Flask test client（每个评价人一个实例，各自保存会话）
+    """
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        resp = self.client.open(path, method=method, data=data)
+        return resp.status_code, resp.get_data(as_text=True)
+
+
+# ==================== 统计 ====================
+
+class Recorder:
+    """
+    按路由记录延迟与错误
+    """
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, route, elapsed, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, wall_time, ballots):
+        result = {
+            'wall_time_s': round(wall_time, 3),
+            'ballots': ballots,
+            'ballots_per_s': round(ballots / wall_time, 2) if wall_time else 0,
+            'routes': {}
+        }
+        total = 0
+        for route, values in self.latencies.items():
+            values = sorted(values)
+            total += len(values)
+            errors = self.errors.get(route, 0)
+            result['routes'][route] = {
+                'count': len(values),
+                'errors': errors,
+                'error_rate': round(errors / len(values), 4),
+                'p50_ms': round(percentile(values, 50) * 1000, 1),
+                'p95_ms': round(percentile(values, 95) * 1000, 1),
+                'p99_ms': round(percentile(values, 99) * 1000, 1),
+                'max_ms': round(values[-1] * 1000, 1)
+            }
+        result['requests'] = total
+        result['requests_per_s'] = round(total / wall_time, 2) if wall_time else 0
+        return result
+
+
+def percentile(sorted_values, pct):
+    """
+    最近秩法计算百分位
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+# ==================== 数据准备 ====================
+
+def setup_round(conf):
+    """
+    按配置准备一轮测评数据并生成登录码
+
+    会清空所有评分、登录码，并删除全部重点工作指标后按配置重建；
+    journal 模式下先写完日志中上一次运行未写库的评分，避免重放到本轮
+
+    Returns:
+        list: [(account, password), ...]
+    """
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        submission_config = (yaml.safe_load(f) or {}).get('submission') or {}
+    reset_round(create_journal(submission_config, db.save_ballots))
+
+    # ===== 部门 =====
+    existing_depts = {d['dept_name']: d['id'] for d in db.get_departments()}
+    for d in conf.get('departments', []):
+        if d['name'] not in existing_depts:
+            db.add_department(d['name'], d.get('type'))
+    dept_ids = {d['dept_name']: d['id'] for d in db.get_departments()}
+
+    # ===== 重点工作指标 =====
+    per_dept = conf.get('indicators', {}).get('per_department', 5)
+    text_len = conf.get('indicators', {}).get('text_length', 300)
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM zdgz")
+        for d in conf.get('departments', []):
+            for i in range(per_dept):
+                cursor.execute("""
+                    INSERT INTO zdgz (department, indicator_name, description, work_desc)
+                    VALUES (%s, %s, %s, %s)
+                """, (d['name'], f"{d['name']}指标{i + 1}", '指标含义' * (text_len // 4), '完成情况' * (text_len // 4)))
+        conn.commit()
+    db.ref_cache.bump('zdgz')
+
+    # ===== 角色与权限 =====
+    existing_roles = {r['role_name'] for r in db.get_roles()}
+    for r in conf.get('roles', []):
+        if r['name'] not in existing_roles:
+            db.create_role(r['name'])
+    role_ids = {r['role_name']: r['id'] for r in db.get_roles()}
+
+    zdgz_perm = []
+    myd_perm = []
+    role_count_map = {}
+    for r in conf.get('roles', []):
+        role_id = role_ids[r['name']]
+        zdgz_perm.append({
+            'role_id': role_id,
+            'zdgz_weight': r.get('zdgz_weight', 1.0),
+            'departments': r.get('zdgz_departments', [])
+        })
+        for dept_name, weight in (r.get('myd_departments') or {}).items():
+            myd_perm.append({'role_id': role_id, 'dept_id': dept_ids[dept_name], 'weight': weight})
+        role_count_map[role_id] = r.get('evaluators', 0)
+
+    db.save_role_zdgz_permissions(zdgz_perm)
+    db.update_role_zdgz_weights(zdgz_perm)
+    db.save_myd_permissions(myd_perm)
+
+    generate_login_codes_by_role(role_count_map)
+    return load_unused_codes()
+
+
+def load_unused_codes():
+    """
+    读取所有未使用的登录码
+    """
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT account, password FROM login_no WHERE used = 0")
+        return [(row['account'], row['password']) for row in cursor.fetchall()]
+
+
+# ==================== 评价人流程 ====================
+
+def build_ballot(zdgz_ids, myd_ids, over_limit):
+    """
+    生成一份评分表单
+
+    - 正常评价人：“优秀”恰好取到 60% 上限
+    - 超限评价人：全部选“优秀”，应被 save_score 拒绝
+    """
+    max_excellent = int(len(zdgz_ids) * 0.6)
+    excellent = len(zdgz_ids) if over_limit else max_excellent
+    chosen = set(random.sample(zdgz_ids, excellent))
+
+    form = {}
+    for zdgz_id in zdgz_ids:
+        form[f'zdgz_{zdgz_id}'] = str(130 if zdgz_id in chosen else random.choice(ZDGZ_OPTIONS))
+    for dept_id in myd_ids:
+        form[f'satisfaction_{dept_id}'] = str(random.choice(MYD_OPTIONS))
+    return form
+
+
+def run_evaluator(client, account, password, recorder, over_limit, think_time):
+    """
+    模拟一名评价人完成 登录 → 首页 → 提交
+
+    Returns:
+        bool: 是否成功提交
+    """
+
+    def call(route, method, path, data=None, expect=(200,)):
+        start = time.perf_counter()
+        try:
+            status, body = client.request(method, path, data)
+        except Exception:
+            recorder.record(route, time.perf_counter() - start, False)
+            return None, ''
+        recorder.record(route, time.perf_counter() - start, status in expect)
+        return status, body
+
+    call('GET /login', 'GET', '/login')
+
+    status, _ = call('POST /login', 'POST', '/login',
+                     {'login_code': account, 'password': password}, expect=(302,))
+    if status != 302:
+        return False
+
+    status, body = call('GET /', 'GET', '/')
+    if status != 200:
+        return False
+
+    zdgz_ids = [int(i) for i in ZDGZ_FIELD.findall(body)]
+    myd_ids = [int(i) for i in MYD_FIELD.findall(body)]
+
+    if think_time:
+        time.sleep(random.uniform(0, think_time))
+
+    if over_limit and len(zdgz_ids) >= 2:
+        # 超过 60% 的提交应返回 400，随后按规则重新提交
+        call('POST /score/save (rejected)', 'POST', '/score/save',
+             build_ballot(zdgz_ids, myd_ids, True), expect=(400, 503))
+
+    # 与评分页面一致：服务器繁忙返回 503 时稍后重试
+    ballot = build_ballot(zdgz_ids, myd_ids, False)
+    for _ in range(SUBMIT_ATTEMPTS - 1):
+        status, _ = call('POST /score/save', 'POST', '/score/save', ballot, expect=(200, 503))
+        if status != 503:
+            return status == 200
+        time.sleep(random.uniform(1, 2) * SUBMIT_RETRY_DELAY)
+
+    status, _ = call('POST /score/save', 'POST', '/score/save', ballot)
+    return status == 200
+
+
+# ==================== 入口 ====================
+
+def print_report(result):
+    print(f"\n总耗时 {result['wall_time_s']} s，提交 {result['ballots']} 份"
+          f"（{result['ballots_per_s']} 份/s），请求 {result['requests']} 次"
+          f"（{result['requests_per_s']} 次/s）")
+    print(f"{'路由':<30}{'次数':>8}{'错误率':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for route, r in result['routes'].items():
+        print(f"{route:<30}{r['count']:>8}{r['error_rate']:>10.2%}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='登录到提交评分的并发压测')
+    parser.add_argument('config', help='压测配置文件（YAML）')
+    parser.add_argument('--url', help='被测服务地址；不传则进程内调用 Flask 应用')
+    parser.add_argument('--concurrency', type=int, help='并发评价人数，覆盖配置文件')
+    parser.add_argument('--skip-setup', action='store_true', help='不重建数据，直接使用库中未使用的登录码')
+    parser.add_argument('--yes', action='store_true', help='确认清空现有评分、登录码及重点工作指标')
+    parser.add_argument('--json', help='将结果另存为 JSON 文件')
+    args = parser.parse_args()
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        conf = yaml.safe_load(f)
+
+    if args.skip_setup:
+        codes = load_unused_codes()
+    else:
+        if not args.yes:
+            parser.error(f'准备数据会清空 {db.backend.name} 数据库中的所有评分、登录码，'
+                         f'并删除全部重点工作指标后按配置重建；请确认 config.yaml 指向专用测试库后加 --yes 运行')
+        codes = setup_round(conf)
+
+    if not codes:
+        parser.error('没有可用的登录码')
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        from jxkh import app
+        make_client = lambda: FlaskClient(app)
+
+    concurrency = args.concurrency or conf.get('concurrency', 50)
+    over_limit_ratio = conf.get('over_limit_ratio', 0.05)
+    ramp = conf.get('ramp_seconds', 0)
+    think_time = conf.get('think_time_seconds', 0)
+
+    recorder = Recorder()
+
+    def task(code):
+        if ramp:
+            time.sleep(random.uniform(0, ramp))
+        return run_evaluator(
+            make_client(), code[0], code[1], recorder,
+            over_limit=random.random() < over_limit_ratio,
+            think_time=think_time
+        )
+
+    print(f"评价人 {len(codes)} 名，并发 {concurrency}")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ballots = sum(1 for ok in pool.map(task, codes) if ok)
+    wall_time = time.perf_counter() - start
+
+    result = recorder.report(wall_time, ballots)
+    print_report(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,8 @@
+import csv
 import random
 import string
 import secrets
 from io import BytesIO
-import pandas as pd
 from database import db
 
 
@@ -19,10 +19,27 @@ def generate_random_code(length=10):
     return ''.join(code)
 
 
-def generate_login_codes_by_role(role_count_map):
+def reset_round(journal=None):
+    """
+    清空本轮测评数据（重新生成登录码前调用，Web 与命令行共用）
+
+    - 先写完评分日志中的记录，避免清空后被重放
+    - 清空评分（zdgz_score / myd_score）、登录码及评分草稿
+
+    Args:
+        journal: 评分日志（BallotJournal），direct 模式为 None
+    """
+    if journal:
+        journal.flush()
+    db.clear_all_scores()
+    db.clear_login_codes()
+
+
+def generate_login_codes_by_role(role_count_map, progress=None, batch_size=1000):
     """
     按角色生成登录码并写入数据库
     role_count_map: { role_id: 数量 }
+    progress: 进度回调 progress(已生成数量, 总数量)
     """
     # 清空旧登录码
     with db.get_connection() as conn:
@@ -30,17 +47,36 @@ def generate_login_codes_by_role(role_count_map):
         cursor.execute("DELETE FROM login_no")
         conn.commit()
 
+    total = sum(role_count_map.values())
+    done = 0
+    batch = []
     for role_id, count in role_count_map.items():
         for _ in range(count):
-            account = generate_random_code()
-            password = generate_random_code()
-            db.create_login_code(role_id, account, password)
+            batch.append((role_id, generate_random_code(), generate_random_code()))
+            if len(batch) >= batch_size:
+                db.create_login_codes(batch)
+                done += len(batch)
+                batch = []
+                if progress:
+                    progress(done, total)
+
+    if batch:
+        db.create_login_codes(batch)
+        done += len(batch)
+    if progress:
+        progress(done, total)
+
+    # 各进程重建登录码索引；本进程立即重建
+    db.ref_cache.bump('login_code')
+    db.get_credential_index()
 
 
 def export_login_codes():
     """
     从数据库读取登录码并生成 Excel（内存方式）
     """
+    import pandas as pd  # 仅导出时加载
+
     with db.get_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute("""
@@ -67,3 +103,71 @@ def export_login_codes():
     output.seek(0)
     return output
 
+
+LOGIN_CODE_HEADER = ['角色', '账号', '密码']
+
+
+def export_login_codes_to_file(path, progress=None, batch_size=5000):
+    """
+    将登录码逐批写入文件（.xlsx 或 .csv），不在内存中保存全部数据
+
+    - xlsx 使用 xlsxwriter 的 constant_memory 模式，逐行写盘
+    - csv 使用 UTF-8 BOM，Excel 可直接打开
+
+    Args:
+        path: 输出文件路径
+        progress: 进度回调 progress(已写入数量, 总数量)
+        batch_size: 每次从数据库读取的行数
+
+    Returns:
+        int: 写入条数
+    """
+    ext = path.rsplit('.', 1)[-1].lower()
+    if ext not in ('xlsx', 'csv'):
+        raise ValueError('仅支持导出为 .xlsx 或 .csv')
+
+    count = 0
+    with db.get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) AS total FROM login_no")
+            total = cursor.fetchone()['total']
+
+            cursor.execute("""
+                SELECT r.role_name, l.account, l.password
+                FROM login_no l
+                LEFT JOIN evaluator_role r ON l.role_id = r.id
+                ORDER BY r.id
+            """)
+
+            if ext == 'csv':
+                with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(LOGIN_CODE_HEADER)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        writer.writerows((r['role_name'], r['account'], r['password']) for r in rows)
+                        count += len(rows)
+                        if progress:
+                            progress(count, total)
+            else:
+                import xlsxwriter  # 仅导出时加载
+
+                wb = xlsxwriter.Workbook(path, {'constant_memory': True})
+                try:
+                    ws = wb.add_worksheet('登录码')
+                    ws.write_row(0, 0, LOGIN_CODE_HEADER)
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for r in rows:
+                            count += 1
+                            ws.write_row(count, 0, (r['role_name'], r['account'], r['password']))
+                        if progress:
+                            progress(count, total)
+                finally:
+                    wb.close()
+
+    return count
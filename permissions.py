@@ -0,0 +1,81 @@
+from collections import namedtuple
+
+# 矩阵单元格：列（部门）、是否有权限、权重
+Cell = namedtuple('Cell', ['column', 'allowed', 'weight'])
+
+
+class PermissionMatrix:
+    """
+    角色 × 部门 权限矩阵
+
+    功能:
+    - 权限以 (角色ID, 部门键) 为键保存在字典中，单次查询 O(1)
+    - rows 预先按 角色 × 部门 展开，模板直接遍历，无需在循环中反复查找
+    - validate() 复用同一份角色、部门索引校验管理员提交的权限与权重
+    """
+
+    def __init__(self, roles, columns, key, permissions, default_weight=None):
+        """
+        Args:
+            roles: 角色列表
+            columns: 列（部门）列表
+            key: 列的键字段，如 'id'（满意度）或 'department'（重点工作指标）
+            permissions: {role_id: {部门键: 权重}} 或 {role_id: [部门键, ...]}
+            default_weight: 无权限或未设置权重时的默认权重
+        """
+        self.roles = roles
+        self.columns = columns
+        self.key = key
+        self.default_weight = default_weight
+
+        self.role_ids = frozenset(r['id'] for r in roles)
+        self.column_keys = frozenset(c[key] for c in columns)
+
+        self._cells = {}
+        for role_id, granted in permissions.items():
+            items = granted.items() if isinstance(granted, dict) else ((k, None) for k in granted)
+            for column_key, weight in items:
+                self._cells[(role_id, column_key)] = weight
+
+        self.rows = [
+            (role, [self._cell(role['id'], column) for column in columns])
+            for role in roles
+        ]
+
+    def _cell(self, role_id, column):
+        cell_key = (role_id, column[self.key])
+        allowed = cell_key in self._cells
+        weight = self._cells.get(cell_key) if allowed else None
+        return Cell(column, allowed, self.default_weight if weight is None else weight)
+
+    def allowed(self, role_id, column_key):
+        """
+        角色是否有该部门的权限
+        """
+        return (role_id, column_key) in self._cells
+
+    def weight(self, role_id, column_key):
+        """
+        角色对该部门的权重（未设置时为默认权重）
+        """
+        weight = self._cells.get((role_id, column_key))
+        return self.default_weight if weight is None else weight
+
+    def validate(self, role_id, column_key=None, weight=None):
+        """
+        校验一条权限配置
+
+        Raises:
+            ValueError: 角色或部门不存在、权重无效，异常信息可直接展示给管理员
+        """
+        if role_id not in self.role_ids:
+            raise ValueError(f'角色不存在：{role_id}')
+        if column_key is not None and column_key not in self.column_keys:
+            raise ValueError(f'部门不存在：{column_key}')
+        if weight is not None:
+            try:
+                value = float(weight)
+            except (TypeError, ValueError):
+                raise ValueError(f'权重格式错误：{weight}')
+            if value < 0:
+                raise ValueError(f'权重不能为负数：{weight}')
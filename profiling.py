@@ -0,0 +1,209 @@
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+from flask import g, request
+
+
+class RequestProfiler:
+    """
+    按需请求性能分析
+
+    功能:
+    - 管理员可在运行时开启/关闭；开关保存在 dump_dir/settings.json，
+      所有工作进程每 CHECK_INTERVAL 秒检查一次文件是否变化并重新读取
+    - 对指定路由（endpoint）或按比例抽样的请求使用 cProfile 采集
+    - 采集结果以 pstats 文件保存，按数量上限滚动清理
+    - 关闭时每个请求只多一次时间比较与布尔判断
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, dump_dir, enabled=False, endpoints=None, sample_rate=0.0, max_files=50):
+        self.dump_dir = dump_dir
+        self.settings_path = os.path.join(dump_dir, 'settings.json')
+        self.enabled = enabled
+        self.endpoints = set(endpoints or [])
+        self.sample_rate = float(sample_rate)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._settings_mtime = None
+        self._checked_at = 0.0
+
+    def init_app(self, app):
+        """
+        注册请求钩子
+        """
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+    def configure(self, enabled, endpoints, sample_rate):
+        """
+        更新分析配置并写入 settings.json，其他工作进程在 CHECK_INTERVAL 秒内生效
+        """
+        self._apply({'enabled': enabled, 'endpoints': list(endpoints), 'sample_rate': sample_rate})
+
+        os.makedirs(self.dump_dir, exist_ok=True)
+        tmp = f'{self.settings_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'enabled': self.enabled,
+                'endpoints': sorted(self.endpoints),
+                'sample_rate': self.sample_rate
+            }, f, ensure_ascii=False)
+        os.replace(tmp, self.settings_path)
+        self._checked_at = 0.0
+
+    def _apply(self, settings):
+        self.endpoints = set(settings.get('endpoints') or [])
+        self.sample_rate = min(max(float(settings.get('sample_rate') or 0), 0.0), 1.0)
+        self.enabled = bool(settings.get('enabled'))
+
+    def refresh(self, force=False):
+        """
+        settings.json 有变化时重新读取（未保存过时沿用 config.yaml 中的配置）
+
+        Args:
+            force: 不等待 CHECK_INTERVAL，立即检查（管理页面显示前调用）
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.CHECK_INTERVAL:
+            return
+        self._checked_at = now
+
+        try:
+            mtime = os.stat(self.settings_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._settings_mtime:
+            return
+
+        try:
+            with open(self.settings_path, 'r', encoding='utf-8') as f:
+                settings = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._settings_mtime = mtime
+        self._apply(settings)
+
+    def _should_profile(self):
+        if request.endpoint in self.endpoints:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        self.refresh()
+        if not self.enabled or not self._should_profile():
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 同一时刻已有其他分析器在运行，本次请求跳过
+            return
+        g._profiler = (profiler, time.perf_counter())
+
+    def _teardown_request(self, exc=None):
+        entry = g.pop('_profiler', None)
+        if entry is None:
+            return
+
+        profiler, start = entry
+        profiler.disable()
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+        os.makedirs(self.dump_dir, exist_ok=True)
+        filename = '{}_{}_{}_{}ms.prof'.format(
+            time.strftime('%Y%m%d_%H%M%S'),
+            os.getpid(),
+            request.endpoint or 'unknown',
+            elapsed_ms
+        )
+        profiler.dump_stats(os.path.join(self.dump_dir, filename))
+        self._prune()
+
+    def _prune(self):
+        """
+        超出数量上限时删除最早的分析文件
+        """
+        with self._lock:
+            files = self.list_dumps()
+            for item in files[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.dump_dir, item['name']))
+                except FileNotFoundError:
+                    pass
+
+    def list_dumps(self):
+        """
+        列出已保存的分析文件
+
+        Returns:
+            list: 按时间倒序的文件信息
+        """
+        if not os.path.isdir(self.dump_dir):
+            return []
+
+        result = []
+        for entry in os.scandir(self.dump_dir):
+            if not entry.name.endswith('.prof'):
+                continue
+            parts = entry.name[:-len('.prof')].split('_')
+            stat = entry.stat()
+            result.append({
+                'name': entry.name,
+                'endpoint': '_'.join(parts[3:-1]) if len(parts) > 4 else '',
+                'elapsed': parts[-1],
+                'size': stat.st_size,
+                'mtime': stat.st_mtime
+            })
+
+        result.sort(key=lambda item: item['mtime'], reverse=True)
+        return result
+
+    def dump_path(self, name):
+        """
+        获取分析文件绝对路径，文件名不合法或不存在时返回 None
+        """
+        if os.path.basename(name) != name or not name.endswith('.prof'):
+            return None
+        path = os.path.join(self.dump_dir, name)
+        return path if os.path.isfile(path) else None
+
+    @staticmethod
+    def load_table(path, sort='cumulative', limit=50):
+        """
+        读取 pstats 文件并转为调用统计表
+
+        Args:
+            path: 分析文件路径
+            sort: 排序字段（cumulative / tottime / calls）
+            limit: 返回行数
+
+        Returns:
+            tuple: (总耗时秒数, 行列表)
+        """
+        stats = pstats.Stats(path)
+
+        rows = []
+        for (filename, lineno, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({
+                'function': f"{os.path.basename(filename)}:{lineno}({func})",
+                'calls': nc if nc == cc else f"{nc}/{cc}",
+                'ncalls': nc,
+                'tottime': round(tt, 6),
+                'cumtime': round(ct, 6),
+                'percall': round(ct / nc, 6) if nc else 0
+            })
+
+        key = {
+            'tottime': 'tottime',
+            'calls': 'ncalls'
+        }.get(sort, 'cumtime')
+        rows.sort(key=lambda row: row[key], reverse=True)
+
+        return round(stats.total_tt, 6), rows[:limit]
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+
+# 原始评分导出列（与 Database.iter_raw_scores 查询结果一致）
+RAW_COLUMNS = {
+    'zdgz': ['id', 'login_code', 'role_id', 'role_name', 'dept_name', 'zdgz_id', 'indicator_name', 'score',
+             'create_time'],
+    'myd': ['id', 'login_code', 'role_id', 'role_name', 'dept_id', 'dept_name', 'score', 'create_time'],
+}
+
+FORMATS = ('csv', 'ndjson')
+
+
+def parse_time(value, name):
+    """
+    解析时间筛选参数
+
+    Args:
+        value: 'YYYY-MM-DD' 或 'YYYY-MM-DD HH:MM[:SS]'（也接受 T 分隔）
+        name: 参数名，用于错误提示
+
+    Returns:
+        str or None: 'YYYY-MM-DD HH:MM:SS'，未提供时返回 None
+
+    Raises:
+        ValueError: 格式错误
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip()).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        raise ValueError(f'{name} 时间格式错误：{value}')
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _encode_csv(batches, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    writer.writerow(columns)
+    for rows in batches:
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(batches, columns):
+    for rows in batches:
+        yield ''.join(
+            json.dumps({c: row[c] for c in columns}, ensure_ascii=False, default=_json_default) + '\n'
+            for row in rows
+        ).encode('utf-8')
+
+
+def iter_raw_export(kind, fmt, batches, level=6):
+    """
+    原始评分流式编码为 gzip 压缩的 CSV / NDJSON
+
+    功能:
+    - 每批行编码后立即压缩输出，内存占用只与批大小有关
+    - CSV 首行为列名；NDJSON 每行一个 JSON 对象，评分为数值
+    - 输出为完整的 gzip 文件，可直接保存为 .csv.gz / .ndjson.gz
+
+    Args:
+        kind: 'zdgz' / 'myd'
+        fmt: 'csv' / 'ndjson'
+        batches: Database.iter_raw_scores() 返回的分批结果
+        level: 压缩级别（1-9）
+
+    Yields:
+        bytes: gzip 数据块
+    """
+    columns = RAW_COLUMNS[kind]
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+
+    # wbits=31 输出带 gzip 文件头与校验的格式
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for data in encode(batches, columns):
+        block = compressor.compress(data)
+        if block:
+            yield block
+    yield compressor.flush()
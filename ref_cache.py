@@ -0,0 +1,221 @@
+import functools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 缓存分组：同一分组的数据一起失效
+GROUPS = ('zdgz', 'department', 'role', 'permission', 'login_code')
+
+
+class RefCache:
+    """
+    基础数据进程内缓存（重点工作指标、部门、角色、权限、登录码索引）
+
+    功能:
+    - 读多写少的基础数据缓存在进程内，避免每个请求重复查询
+    - 跨进程一致性：cache_version 表中每个分组一行版本号，管理员修改后递增；
+      各进程读取缓存时若距上次检查超过 max_age 秒，用一条查询读取全部版本号，只重新加载版本变化的分组
+    - 不读取基础数据的请求（自动保存草稿、提交评分等）不查询版本号
+    - 缓存的数据为共享对象，调用方不应修改
+    """
+
+    def __init__(self, db, enabled=True, max_age=1.0):
+        """
+        Args:
+            db: Database 实例
+            enabled: 是否启用缓存
+            max_age: 距上次检查版本超过该秒数则重新检查（其他进程的修改最多延迟该时间可见）
+        """
+        self.db = db
+        self.enabled = enabled
+        self.max_age = max_age
+
+        self._lock = threading.RLock()
+        self._versions = {}
+        self._entries = {}
+        self._loading = {}
+        # 每次丢弃缓存时递增：加载期间有丢弃则不保存加载结果
+        self._epoch = 0
+        self._synced_at = None
+        self._disabled_until = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    RETRY_SECONDS = 30
+
+    def _available(self):
+        return self.enabled and time.monotonic() >= self._disabled_until
+
+    @property
+    def active(self):
+        """
+        缓存当前是否可用（未关闭，且最近读取版本号未失败）
+        """
+        return self._available()
+
+    def sync(self):
+        """
+        读取版本号，丢弃版本已变化的分组（读取缓存时按 max_age 自动调用）
+        """
+        if not self._available():
+            return
+
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT name, version FROM cache_version")
+                    versions = {r['name']: int(r['version']) for r in cursor.fetchall()}
+        except Exception:
+            # 读取失败（如旧库缺少 cache_version 表）时暂停缓存，直接查库
+            logger.exception('读取 cache_version 失败，基础数据缓存暂停 %s 秒', self.RETRY_SECONDS)
+            self._disabled_until = time.monotonic() + self.RETRY_SECONDS
+            self.clear()
+            return
+
+        with self._lock:
+            for group in GROUPS:
+                version = versions.get(group, 0)
+                if self._versions.get(group) != version:
+                    self._versions[group] = version
+                    self._drop(group)
+            self._synced_at = time.monotonic()
+
+    def _drop(self, group):
+        self._epoch += 1
+        for key in [k for k in self._entries if group in k[0]]:
+            del self._entries[key]
+
+    def get(self, groups, key, loader):
+        """
+        读取缓存，不存在时调用 loader 加载
+
+        Args:
+            groups: 依赖的缓存分组（元组），任一分组版本变化即失效
+            key: 分组内的键
+            loader: 无参加载函数
+        """
+        if not self._available():
+            return loader()
+
+        if self._synced_at is None or time.monotonic() - self._synced_at > self.max_age:
+            self.sync()
+            if not self._available():
+                return loader()
+
+        entry_key = (groups, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self.hits += 1
+                return self._entries[entry_key]
+            key_lock = self._loading.setdefault(entry_key, threading.Lock())
+
+        # 按键加锁：同一键的并发请求只查询一次，不同键的加载互不等待
+        with key_lock:
+            with self._lock:
+                if entry_key in self._entries:
+                    self.hits += 1
+                    return self._entries[entry_key]
+                epoch = self._epoch
+
+            try:
+                value = loader()
+            finally:
+                with self._lock:
+                    if self._loading.get(entry_key) is key_lock:
+                        del self._loading[entry_key]
+
+            with self._lock:
+                self.misses += 1
+                if self._epoch == epoch:
+                    self._entries[entry_key] = value
+            return value
+
+    def bump(self, *groups):
+        """
+        递增版本号，通知所有进程重新加载（修改基础数据后调用）
+
+        Args:
+            groups: 缓存分组；不传则全部分组
+        """
+        groups = groups or GROUPS
+
+        with self._lock:
+            for group in groups:
+                self._drop(group)
+
+        # 汇总查询复用的结果同样作废
+        self.db.singleflight.clear()
+
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    for group in groups:
+                        cursor.execute(
+                            "UPDATE cache_version SET version = version + 1 WHERE name = %s",
+                            (group,)
+                        )
+                        if cursor.rowcount == 0:
+                            cursor.execute(
+                                "INSERT INTO cache_version(name, version) VALUES (%s, 1)",
+                                (group,)
+                            )
+                conn.commit()
+        except Exception:
+            logger.exception('更新 cache_version 失败')
+
+        # 下次读取时重新同步版本号
+        self._synced_at = None
+
+    def clear(self):
+        """
+        清空本进程缓存
+        """
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._versions.clear()
+            self._synced_at = None
+
+    def stats(self):
+        return {
+            'enabled': self._available(),
+            'versions': dict(self._versions),
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def cached(*groups):
+    """
+    Database 读取方法装饰器：结果按分组缓存（方法参数作为键），依赖多个分组时任一变化即失效
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args):
+            return self.ref_cache.get(groups, (func.__name__,) + args, lambda: func(self, *args))
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(*groups):
+    """
+    Database 写入方法装饰器：执行成功后递增对应分组的版本号
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            result = func(self, *args, **kwargs)
+            self.ref_cache.bump(*groups)
+            return result
+
+        return wrapper
+
+    return decorator
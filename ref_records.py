@@ -0,0 +1,95 @@
+import sys
+
+
+class Record:
+    """
+    只读基础数据记录（__slots__，无逐行字典）
+
+    功能:
+    - 与 DictCursor 返回的行用法一致：row['department']、row.get('work_desc')，
+      模板中 item.department 直接读取属性
+    - 缓存在每个工作进程中供所有请求共享，创建后不可修改
+    """
+
+    __slots__ = ()
+
+    # 使用 sys.intern 的字段
+    INTERNED = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} 为只读记录')
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class ZdgzRecord(Record):
+    """
+    重点工作指标
+    """
+
+    __slots__ = ('id', 'department', 'indicator_name', 'work_desc', 'description', 'evidence_path')
+
+    # 部门名在各指标间重复，且用作权限、分组的字典键
+    INTERNED = ('department',)
+
+
+class DepartmentRecord(Record):
+    """
+    满意度部门
+    """
+
+    __slots__ = ('id', 'dept_name', 'dept_type', 'enable', 'work_desc')
+
+    INTERNED = ('dept_name', 'dept_type')
+
+
+def build_records(cls, rows):
+    """
+    查询结果转为紧凑的只读记录
+
+    功能:
+    - 部门名等短字段使用 sys.intern，与其他缓存中的同名字符串共用一个对象
+    - 其余文本（指标含义、工作描述等长文本）在本次加载内相同内容只保留一份；
+      不使用 sys.intern，避免数据更新后旧文本一直留在驻留表中
+
+    Args:
+        cls: Record 子类
+        rows: 字典行（DictCursor 结果）
+
+    Returns:
+        list: 记录列表
+    """
+    interned = cls.INTERNED
+    texts = {}
+    records = []
+    for row in rows:
+        values = []
+        for name in cls.__slots__:
+            value = row[name]
+            if isinstance(value, str):
+                value = sys.intern(value) if name in interned else texts.setdefault(value, value)
+            values.append(value)
+        records.append(cls(*values))
+    return records
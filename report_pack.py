@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+
+def group_by_department(zdgz_summary, myd_summary):
+    """
+    按部门拆分评分汇总
+
+    Args:
+        zdgz_summary: get_zdgz_score_summary() 结果
+        myd_summary: get_myd_score_summary() 结果
+
+    Returns:
+        dict: {部门名: (重点工作指标行, 满意度行)}，按首次出现顺序
+    """
+    packs = {}
+    for row in zdgz_summary:
+        packs.setdefault(row['dept_name'], ([], []))[0].append(row)
+    for row in myd_summary:
+        packs.setdefault(row['dept_name'], ([], []))[1].append(row)
+    return packs
+
+
+def render_workbook(dept_name, zdgz_rows, myd_rows):
+    """
+    生成单个部门的结果工作簿（在进程池中执行，参数与返回值需可 pickle）
+
+    工作表:
+    - 重点工作指标：每个指标一行，各评价角色的平均分与评价得分系数
+    - 满意度评价：每个评价角色一行，权重、平均分与评价得分系数
+
+    Returns:
+        bytes: xlsx 文件内容
+    """
+    from openpyxl import Workbook  # 仅生成报表时加载
+
+    wb = Workbook(write_only=True)
+
+    # ===== 重点工作指标 =====
+    roles = []
+    indicators = {}
+    for row in zdgz_rows:
+        if row['role_name'] not in roles:
+            roles.append(row['role_name'])
+        indicator = indicators.setdefault(row['zdgz_id'], {
+            'name': row['indicator_name'],
+            'description': row['description'],
+            'scores': {}
+        })
+        indicator['scores'][row['role_name']] = (row['avg_score'], row['weighted_score'])
+
+    ws = wb.create_sheet('重点工作指标')
+    ws.column_dimensions['A'].width = 30
+    ws.column_dimensions['B'].width = 50
+    header = ['绩效指标', '指标含义/具体任务']
+    for role in roles:
+        header += [f'{role}平均分', f'{role}评价得分系数']
+    ws.append(header)
+    for indicator in indicators.values():
+        line = [indicator['name'], indicator['description']]
+        for role in roles:
+            line += list(indicator['scores'].get(role, (None, None)))
+        ws.append(line)
+
+    # ===== 满意度评价 =====
+    ws = wb.create_sheet('满意度评价')
+    ws.column_dimensions['A'].width = 20
+    ws.append(['评价角色', '权重', '平均分', '评价得分系数'])
+    for row in myd_rows:
+        ws.append([row['role_name'], row['myd_weight'], row['avg_score'], row['weighted_score']])
+
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def workbook_name(dept_name):
+    return re.sub(r'[\\/:*?"<>|]', '_', dept_name) + '绩效考核结果.xlsx'
+
+
+def iter_report_pack(zdgz_summary, myd_summary, max_workers=None):
+    """
+    并行生成各部门结果工作簿
+
+    功能:
+    - 所有部门一次性提交到进程池，耗时随 CPU 核数而非部门数增长
+    - 按部门顺序逐个产出，前面的部门完成即可开始发送
+    - 进程池按本次部门数创建（不超过 max_workers），生成结束或调用方中途停止迭代
+      （如客户端断开）时取消尚未开始的任务并关闭，Web 进程不常驻空闲的报表进程
+
+    Args:
+        zdgz_summary: get_zdgz_score_summary() 结果
+        myd_summary: get_myd_score_summary() 结果
+        max_workers: 进程数，默认 CPU 核数；为 1 时在当前进程中生成
+
+    Yields:
+        tuple: (文件名, xlsx 内容)
+    """
+    packs = group_by_department(zdgz_summary, myd_summary)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if max_workers <= 1 or len(packs) <= 1:
+        for dept_name, (zdgz_rows, myd_rows) in packs.items():
+            yield workbook_name(dept_name), render_workbook(dept_name, zdgz_rows, myd_rows)
+        return
+
+    # 使用 spawn 方式启动工作进程，避免在多线程的 Web 进程中 fork
+    executor = ProcessPoolExecutor(
+        max_workers=min(max_workers, len(packs)),
+        mp_context=multiprocessing.get_context('spawn')
+    )
+    try:
+        futures = [
+            (dept_name, executor.submit(render_workbook, dept_name, zdgz_rows, myd_rows))
+            for dept_name, (zdgz_rows, myd_rows) in packs.items()
+        ]
+        for dept_name, future in futures:
+            yield workbook_name(dept_name), future.result()
+    finally:
+        # 不等待：客户端断开时尽快释放请求线程，工作进程完成当前任务后退出
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,159 @@
+import base64
+import bisect
+import json
+import threading
+import time
+
+
+def _number(value):
+    return None if value is None else float(value)
+
+
+def pivot_zdgz(summary):
+    """
+    重点工作指标评分汇总转为 每个指标一行
+
+    Returns:
+        tuple: (行列表, 角色名列表)
+        行: {'zdgz_id', 'dept_name', 'indicator_name', 'scores': {角色名: 评价得分系数}, 'total'}
+    """
+    roles = []
+    rows = {}
+    for r in summary:
+        if r['role_name'] not in roles:
+            roles.append(r['role_name'])
+        row = rows.setdefault(r['zdgz_id'], {
+            'zdgz_id': r['zdgz_id'],
+            'dept_name': r['dept_name'],
+            'indicator_name': r['indicator_name'],
+            'scores': {},
+            'total': 0.0
+        })
+        score = _number(r['weighted_score'])
+        row['scores'][r['role_name']] = score
+        row['total'] = round(row['total'] + (score or 0), 4)
+    return list(rows.values()), roles
+
+
+def flatten_myd(summary):
+    """
+    满意度评分汇总转为可序列化的行，并计算各部门合计
+
+    Returns:
+        tuple: (行列表, {部门名: 加权得分合计})
+    """
+    rows = []
+    totals = {}
+    for r in summary:
+        row = {
+            'dept_id': r['dept_id'],
+            'dept_name': r['dept_name'],
+            'role_id': r['role_id'],
+            'role_name': r['role_name'],
+            'avg_score': _number(r['avg_score']),
+            'myd_weight': _number(r['myd_weight']),
+            'weighted_score': _number(r['weighted_score'])
+        }
+        rows.append(row)
+        totals[row['dept_name']] = round(totals.get(row['dept_name'], 0) + (row['weighted_score'] or 0), 4)
+    return rows, totals
+
+
+class SummaryCache:
+    """
+    评分汇总进程内缓存
+
+    功能:
+    - 按数据版本号（评分、指标、角色、部门、权限）缓存整理后的汇总，
+      分页、筛选、排序请求只在内存中处理，不重复执行汇总查询
+    - 汇总可能读自从库，另设 max_age 秒过期，避免复制延迟导致旧数据一直被缓存
+    - 版本号距上次检查超过 check_interval 秒才重新读取，连续翻页不逐页查询
+    """
+
+    def __init__(self, max_age=30, check_interval=2.0):
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, kind, version, loader):
+        """
+        Args:
+            kind: 'zdgz' / 'myd'
+            version: 无参函数，返回当前数据版本
+            loader: 无参加载函数
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(kind)
+            if entry and now - entry['loaded_at'] < self.max_age:
+                if now - entry['checked_at'] < self.check_interval:
+                    return entry['value']
+                current = version()
+                if current == entry['version']:
+                    entry['checked_at'] = now
+                    return entry['value']
+            else:
+                current = version()
+
+            value = loader()
+            now = time.monotonic()
+            self._entries[kind] = {'version': current, 'loaded_at': now, 'checked_at': now, 'value': value}
+            return value
+
+
+# ==================== 键集分页 ====================
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, ensure_ascii=False).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Raises:
+        ValueError: 游标格式错误
+    """
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except Exception:
+        raise ValueError('分页游标无效')
+    if not isinstance(key, list):
+        raise ValueError('分页游标无效')
+    return key
+
+
+def keyset_page(rows, sort_key, descending=False, after=None, limit=100):
+    """
+    按排序键分页
+
+    与偏移量分页不同，游标记录上一页最后一行的排序键，翻页时二分定位，
+    页间有数据插入或删除也不会重复或遗漏
+
+    Args:
+        rows: 行列表
+        sort_key: 行 -> 排序键（列表，末项为唯一ID保证全序）
+        descending: 是否降序
+        after: 上一页返回的游标
+        limit: 每页行数
+
+    Returns:
+        tuple: (本页行, 下一页游标或 None)
+    """
+    ordered = sorted(rows, key=sort_key)
+    keys = [sort_key(r) for r in ordered]
+
+    try:
+        if descending:
+            end = bisect.bisect_left(keys, decode_cursor(after)) if after else len(ordered)
+            page = ordered[max(end - limit, 0):end][::-1]
+            has_more = end - limit > 0
+        else:
+            start = bisect.bisect_right(keys, decode_cursor(after)) if after else 0
+            page = ordered[start:start + limit]
+            has_more = start + limit < len(ordered)
+    except TypeError:
+        # 游标与当前排序字段类型不一致
+        raise ValueError('分页游标无效')
+
+    next_cursor = encode_cursor(sort_key(page[-1])) if page and has_more else None
+    return page, next_cursor
@@ -0,0 +1,141 @@
+"""
+生产环境启动入口（gunicorn 多进程 + 多线程）
+
+用法（在项目根目录执行）:
+    pip install gunicorn
+    python serve.py
+
+配置见 config.yaml 的 server 节，监听地址沿用 app.host / app.port。
+
+说明:
+- preload 开启时在主进程中导入应用并预热基础数据缓存，再 fork 工作进程，
+  缓存与已导入的模块以写时复制方式共享
+- 平滑重启（更新代码后）：preload 开启时应用代码在主进程中导入，kill -HUP 只会用旧代码重新 fork
+  工作进程，需改为启动新的主进程：
+      kill -USR2 $(cat <pidfile>)          # 启动新主进程，旧主进程的 pid 移至 <pidfile>.oldbin
+      kill -QUIT $(cat <pidfile>.oldbin)   # 新工作进程就绪后，旧主进程处理完当前请求再退出
+  preload 关闭时每个工作进程各自导入应用，kill -HUP 即可加载新代码（但不共享预热缓存）
+- 启动预热时自动补建新版本增加的表与索引（已有数据库升级），也可先手动执行 python cli.py db upgrade
+- 就绪检查：GET /readyz，数据库可连接且缓存已加载时返回 200
+- 未安装 gunicorn（如 Windows）时退回单进程多线程的 Werkzeug 服务器
+"""
+import importlib.util
+import logging
+import os
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+def load_options():
+    """
+    读取 config.yaml 中的服务配置
+
+    Returns:
+        dict: gunicorn 配置项
+    """
+    with open('config.yaml', 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    app_config = config['app']
+    server = config.get('server') or {}
+
+    options = {
+        'bind': f"{app_config['host']}:{app_config['port']}",
+        'workers': server.get('workers', (os.cpu_count() or 1) * 2 + 1),
+        'threads': server.get('threads', 4),
+        'preload_app': server.get('preload', True),
+        'timeout': server.get('timeout', 60),
+        'graceful_timeout': server.get('graceful_timeout', 30),
+        'keepalive': server.get('keepalive', 5),
+        'max_requests': server.get('max_requests', 0),
+        'max_requests_jitter': server.get('max_requests_jitter', 0),
+        'accesslog': server.get('accesslog'),
+        'errorlog': server.get('errorlog', '-'),
+        'loglevel': server.get('loglevel', 'info'),
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+    }
+    if server.get('pidfile'):
+        os.makedirs(os.path.dirname(os.path.abspath(server['pidfile'])), exist_ok=True)
+        options['pidfile'] = server['pidfile']
+    if options['threads'] > 1:
+        options['worker_class'] = 'gthread'
+    return options
+
+
+def load_app():
+    """
+    导入应用并预热
+    """
+    import jxkh
+
+    if not jxkh.warm_up():
+        logger.warning('预热失败，工作进程将在首个就绪检查时重试')
+    return jxkh.app
+
+
+# ==================== gunicorn 钩子 ====================
+
+def post_fork(server, worker):
+    # fork 后启动本进程的后台线程（评分日志写库）
+    import jxkh
+    jxkh.start_background_tasks()
+
+
+def worker_exit(server, worker):
+    # 退出前写完评分日志与草稿
+    import jxkh
+    if jxkh.journal:
+        jxkh.journal.stop()
+    jxkh.drafts.stop()
+
+
+def run_gunicorn(options):
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+
+        def __init__(self, options):
+            self.options = options
+            self.application = None
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            if self.application is None:
+                self.application = load_app()
+            return self.application
+
+    # preload_app 开启时 gunicorn 在主进程中调用 load()，否则每个工作进程各自调用
+    Application(options).run()
+
+
+def run_fallback(options):
+    from werkzeug.serving import run_simple
+
+    logger.warning('未安装 gunicorn，使用单进程多线程服务器')
+    host, port = options['bind'].rsplit(':', 1)
+    app = load_app()
+    import jxkh
+    jxkh.start_background_tasks()
+    run_simple(host, int(port), app, threaded=True, use_reloader=False, use_debugger=False)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    options = load_options()
+
+    if importlib.util.find_spec('gunicorn') is None:
+        run_fallback(options)
+    else:
+        run_gunicorn(options)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import functools
+import threading
+import time
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'finished_at', 'stale')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        # 执行期间有写入：完成后不再复用
+        self.stale = False
+
+
+class SingleFlight:
+    """
+    相同查询的并发合并（single-flight）
+
+    功能:
+    - 同一键的调用正在执行时，后到的线程等待并共用其结果（或异常），不重复查询
+    - 执行完成后 fresh_seconds 秒内的相同调用直接返回该结果
+    - 本进程修改基础数据、清空评分后调用 clear()，之后的调用重新查询；
+      评分提交不调用，汇总结果最多延迟 fresh_seconds 秒
+    - 返回的结果为共享对象，调用方不应修改
+    """
+
+    def __init__(self, enabled=True, fresh_seconds=2.0):
+        """
+        Args:
+            enabled: 是否启用
+            fresh_seconds: 结果复用时间（秒），为 0 时只合并同时进行的调用
+        """
+        self.enabled = enabled
+        self.fresh_seconds = fresh_seconds
+
+        self._lock = threading.Lock()
+        self._calls = {}
+
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, func):
+        """
+        执行或加入同一键的调用
+
+        Args:
+            key: 调用键（可哈希）
+            func: 无参函数
+
+        Returns:
+            func 的返回值
+        """
+        if not self.enabled:
+            return func()
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set() and (
+                    call.error is not None or call.stale
+                    or time.monotonic() - call.finished_at >= self.fresh_seconds):
+                call = None
+
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                self._prune()
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.finished_at = time.monotonic()
+            call.done.set()
+            if call.error is not None or call.stale or self.fresh_seconds <= 0:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+        return call.result
+
+    def _prune(self):
+        # 持锁调用：删除已过期的结果
+        now = time.monotonic()
+        for key in [k for k, c in self._calls.items()
+                    if c.done.is_set() and now - c.finished_at >= self.fresh_seconds]:
+            del self._calls[key]
+
+    def clear(self):
+        """
+        丢弃已完成的结果（本进程写入数据后调用）
+
+        正在执行的调用仍可加入，完成后不再复用
+        """
+        with self._lock:
+            for key, call in list(self._calls.items()):
+                if call.done.is_set():
+                    del self._calls[key]
+                else:
+                    call.stale = True
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'fresh_seconds': self.fresh_seconds,
+            'keys': len(self._calls),
+            'executions': self.executions,
+            'shared': self.shared
+        }
+
+
+def coalesced(func):
+    """
+    Database 读取方法装饰器：相同参数的并发调用合并为一次查询
+
+    需读主库（读己之写）的调用与可读从库的调用分开合并
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args):
+        key = (func.__name__, self.primary_only()) + args
+        return self.singleflight.do(key, lambda: func(self, *args))
+
+    return wrapper
@@ -0,0 +1,167 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+# 允许做执行计划分析的语句类型
+EXPLAINABLE = ('select', 'insert', 'update', 'delete', 'replace')
+
+
+def fingerprint(sql):
+    """
+    将 SQL 归一化为指纹，便于按语句模板聚合
+
+    - 去掉注释、合并空白（含运算符两侧空白）
+    - 字符串 / 数字字面量与占位符统一替换为 ?
+    - IN (?, ?, ...) 折叠为 in(?+)
+    """
+    text = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.S)
+    text = re.sub(r'--[^\n]*', ' ', text)
+    text = re.sub(r"'(?:[^'\\]|\\.|'')*'", '?', text)
+    text = re.sub(r'"(?:[^"\\]|\\.)*"', '?', text)
+    text = text.replace('%s', '?')
+    text = re.sub(r'\b\d+(?:\.\d+)?\b', '?', text)
+    text = re.sub(r'\s+', ' ', text).strip().lower()
+    text = re.sub(r'\s*([=<>(),])\s*', r'\1', text)
+    text = re.sub(r'\bin\((?:\?,)+\?\)', 'in(?+)', text)
+    return text
+
+
+def _format_params(sql, args, limit=200):
+    """
+    参数转为可展示的字符串，涉及密码的语句不记录参数
+    """
+    if args is None:
+        return ''
+    if 'password' in sql.lower():
+        return '***'
+    text = repr(args)
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+def _is_full_scan(plan):
+    """
+    根据执行计划判断是否存在全表扫描
+
+    - MySQL: EXPLAIN 结果中 type = ALL
+    - SQLite: EXPLAIN QUERY PLAN 中出现 SCAN 且未使用索引
+    """
+    for row in plan or []:
+        if str(row.get('type', '')).upper() == 'ALL':
+            return True
+        detail = str(row.get('detail', ''))
+        if detail.startswith('SCAN ') and 'INDEX' not in detail:
+            return True
+    return False
+
+
+class SlowQueryLog:
+    """
+    慢查询记录器
+
+    功能:
+    - 使用有界环形缓冲区保存超过阈值的语句、参数与耗时
+    - 同一指纹首次出现时抓取一次执行计划（EXPLAIN）
+    - 按指纹汇总，供管理后台展示
+    """
+
+    def __init__(self, threshold_ms=200, max_entries=500, explain=True):
+        self.threshold = threshold_ms / 1000.0
+        self.max_entries = max_entries
+        self.explain_enabled = explain
+        self._entries = deque(maxlen=max_entries)
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, sql, args, elapsed, explain=None):
+        """
+        记录一次语句执行
+
+        Args:
+            sql: 原始 SQL
+            args: 执行参数
+            elapsed: 耗时（秒）
+            explain: 无参可调用对象，返回执行计划行列表；仅首次出现时调用
+        """
+        if elapsed < self.threshold:
+            return
+
+        fp = fingerprint(sql)
+
+        need_plan = False
+        with self._lock:
+            if fp not in self._plans:
+                self._plans[fp] = None
+                need_plan = True
+                while len(self._plans) > self.max_entries:
+                    self._plans.popitem(last=False)
+
+        if need_plan and self.explain_enabled and explain is not None \
+                and fp.startswith(EXPLAINABLE):
+            try:
+                plan = [dict(row) for row in explain()]
+            except Exception as e:
+                plan = [{'error': str(e)}]
+            with self._lock:
+                self._plans[fp] = plan
+
+        entry = {
+            'fingerprint': fp,
+            'sql': sql.strip(),
+            'params': _format_params(sql, args),
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'time': time.time()
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def clear(self):
+        """
+        清空已记录的慢查询
+        """
+        with self._lock:
+            self._entries.clear()
+            self._plans.clear()
+
+    def summary(self):
+        """
+        按指纹汇总慢查询
+
+        Returns:
+            list: 按累计耗时倒序排列的汇总信息
+        """
+        with self._lock:
+            entries = list(self._entries)
+            plans = dict(self._plans)
+
+        groups = {}
+        for e in entries:
+            g = groups.get(e['fingerprint'])
+            if g is None:
+                g = groups[e['fingerprint']] = {
+                    'fingerprint': e['fingerprint'],
+                    'sample_sql': e['sql'],
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'slowest_params': e['params'],
+                    'last_seen': e['time'],
+                }
+            g['count'] += 1
+            g['total_ms'] += e['elapsed_ms']
+            if e['elapsed_ms'] >= g['max_ms']:
+                g['max_ms'] = e['elapsed_ms']
+                g['slowest_params'] = e['params']
+            g['last_seen'] = max(g['last_seen'], e['time'])
+
+        result = []
+        for g in groups.values():
+            plan = plans.get(g['fingerprint'])
+            g['avg_ms'] = round(g['total_ms'] / g['count'], 2)
+            g['total_ms'] = round(g['total_ms'], 2)
+            g['plan'] = plan or []
+            g['full_scan'] = _is_full_scan(plan)
+            result.append(g)
+
+        result.sort(key=lambda g: g['total_ms'], reverse=True)
+        return result
@@ -0,0 +1,95 @@
+let editing = false;
+let dirty = false;
+
+function enableEdit(){
+    editing = true;
+    document.getElementById('permTable').classList.remove('readonly');
+    document.querySelectorAll('.permCheck, .weightInput').forEach(c => c.disabled = false);
+}
+
+function markDirty(){
+    dirty = true;
+    document.getElementById('saveBtn').disabled = false;
+}
+
+function save(){
+    const payload = [];
+
+    document.querySelectorAll('#permTable tbody tr').forEach(row => {
+        const roleId = parseInt(row.dataset.roleId);
+
+        row.querySelectorAll('.permCheck').forEach(cb => {
+            const weightInput = row.querySelector(`.weightInput[data-dept-id='${cb.dataset.deptId}']`);
+            if(cb.checked && weightInput){
+                payload.push({
+                    role_id: roleId,
+                    dept_id: parseInt(cb.dataset.deptId),
+                    weight: parseFloat(weightInput.value || 1)
+                });
+            }
+        });
+    });
+
+    fetch('/admin/myd/permission/save', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(payload)
+    })
+    .then(r => r.json())
+    .then(res => {
+        if(res.error){
+            alert(res.error);
+            return;
+        }
+        alert('保存成功');
+        location.reload();
+    })
+    .catch(() => alert('保存失败，请重试'));
+}
+
+function addRole(){
+    const name = prompt('请输入角色名称（中文）');
+    if(!name) return;
+
+    fetch('/admin/role/add',{
+        method:'POST',
+        headers:{'Content-Type':'application/json'},
+        body:JSON.stringify({role_name:name})
+    }).then(r=>{
+        if(!r.ok){
+            return r.json().then(d=>alert(d.error));
+        }
+        location.reload();
+    });
+}
+
+function deleteRole(roleId, roleName){
+    if(!confirm(`确定要删除角色「${roleName}」吗？\n\n该角色的部门权限将一并清除！`)){
+        return;
+    }
+
+    fetch('/admin/role/delete', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({ role_id: roleId })
+    })
+    .then(r => r.json())
+    .then(res => {
+        if(res.error){
+            alert(res.error);
+            return;
+        }
+        alert('删除成功');
+        location.reload();
+    });
+}
+
+// 保存成功提示
+(function () {
+    const params = new URLSearchParams(window.location.search);
+    if (params.get('saved') === '1') {
+        alert('工作完成情况说明已保存成功');
+        // 清掉参数，防止刷新再次弹
+        window.history.replaceState({}, '', window.location.pathname);
+    }
+})();
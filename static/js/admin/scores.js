@@ -0,0 +1,178 @@
+/* ================= 评分结果表：分页加载 + 虚拟滚动 ================= */
+
+// 行高需与 .score-viewport tbody tr.score-row 的 height 一致
+const SCORE_ROW_HEIGHT = 36;
+// 可见区域上下额外渲染的行数
+const SCORE_OVERSCAN = 10;
+const SCORE_PAGE_SIZE = 200;
+
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, c => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[c]);
+}
+
+function formatScore(value) {
+    return value === null || value === undefined ? '—' : value;
+}
+
+/**
+ * 虚拟滚动评分表
+ * @param {object} options
+ *   viewport: 滚动容器（含 data-url），filters: 筛选表单容器，info: 统计信息容器
+ *   columns(data): 根据接口首页返回的数据生成列定义 [{title, render(row), className}]
+ *   summary(data): 统计信息文本
+ */
+function createScoreTable(options) {
+    const viewport = options.viewport;
+    const thead = viewport.querySelector('thead');
+    const tbody = viewport.querySelector('tbody');
+    const url = viewport.dataset.url;
+
+    const state = {rows: [], next: null, done: false, loading: false, seq: 0, columns: []};
+    let frame = null;
+
+    function params() {
+        const query = new URLSearchParams();
+        options.filters.querySelectorAll('[name]').forEach(el => {
+            if (el.value) query.set(el.name, el.value);
+        });
+        query.set('limit', SCORE_PAGE_SIZE);
+        return query;
+    }
+
+    function reload() {
+        state.seq++;
+        state.rows = [];
+        state.next = null;
+        state.done = false;
+        state.loading = false;
+        viewport.scrollTop = 0;
+        tbody.innerHTML = '';
+        options.info.textContent = '加载中…';
+        loadMore();
+    }
+
+    function loadMore() {
+        if (state.loading || state.done) return;
+        state.loading = true;
+
+        const seq = state.seq;
+        const query = params();
+        if (state.next) query.set('after', state.next);
+
+        fetch(`${url}?${query}`, {cache: 'no-store'})
+            .then(res => res.json())
+            .then(data => {
+                // 筛选条件已变化，丢弃旧请求的结果
+                if (seq !== state.seq) return;
+                if (data.error) {
+                    options.info.textContent = data.error;
+                    state.done = true;
+                    return;
+                }
+
+                if (state.rows.length === 0) {
+                    state.columns = options.columns(data);
+                    thead.innerHTML = '<tr>' + state.columns.map(c => `<th>${escapeHtml(c.title)}</th>`).join('') + '</tr>';
+                }
+                state.rows.push(...data.rows);
+                state.next = data.next;
+                state.done = !data.next;
+                options.info.textContent = options.summary(data) + `（共 ${data.count} 条，已加载 ${state.rows.length} 条）`;
+            })
+            .catch(() => {
+                if (seq === state.seq) options.info.textContent = '加载失败，请刷新页面重试';
+            })
+            .finally(() => {
+                if (seq !== state.seq) return;
+                state.loading = false;
+                render();
+            });
+    }
+
+    function spacer(height) {
+        if (height <= 0) return '';
+        return `<tr class="score-spacer" style="height:${height}px"><td colspan="${state.columns.length}"></td></tr>`;
+    }
+
+    function render() {
+        frame = null;
+        const total = state.rows.length;
+        const first = Math.max(Math.floor(viewport.scrollTop / SCORE_ROW_HEIGHT) - SCORE_OVERSCAN, 0);
+        const last = Math.min(Math.ceil((viewport.scrollTop + viewport.clientHeight) / SCORE_ROW_HEIGHT) + SCORE_OVERSCAN, total);
+
+        let html = spacer(first * SCORE_ROW_HEIGHT);
+        for (let i = first; i < last; i++) {
+            const row = state.rows[i];
+            html += '<tr class="score-row">' + state.columns.map(c => {
+                const text = escapeHtml(c.render(row));
+                return `<td class="${c.className || ''}" title="${text}">${text}</td>`;
+            }).join('') + '</tr>';
+        }
+        html += spacer((total - last) * SCORE_ROW_HEIGHT);
+        tbody.innerHTML = html;
+
+        // 接近已加载数据末尾时加载下一页
+        if (!state.done && last >= total - SCORE_OVERSCAN) {
+            loadMore();
+        }
+    }
+
+    viewport.addEventListener('scroll', () => {
+        if (!frame) frame = requestAnimationFrame(render);
+    });
+
+    let inputTimer = null;
+    options.filters.querySelectorAll('[name]').forEach(el => {
+        el.addEventListener('change', reload);
+        if (el.tagName === 'INPUT') {
+            el.addEventListener('input', () => {
+                clearTimeout(inputTimer);
+                inputTimer = setTimeout(reload, 300);
+            });
+        }
+    });
+
+    reload();
+}
+
+document.addEventListener('DOMContentLoaded', function () {
+
+    // 重点工作指标：每个指标一行，各角色评价得分系数 + 合计
+    createScoreTable({
+        viewport: document.getElementById('zdgzTable'),
+        filters: document.getElementById('zdgzFilters'),
+        info: document.getElementById('zdgzInfo'),
+        columns: data => [
+            {title: '部门', render: r => r.dept_name},
+            {title: '指标', render: r => r.indicator_name},
+            ...data.roles.map(role => ({
+                title: role,
+                className: 'weighted-score',
+                render: r => formatScore(r.scores[role])
+            })),
+            {title: '合计总分', className: 'total-score', render: r => r.total.toFixed(2)}
+        ],
+        summary: () => ''
+    });
+
+    // 满意度：每个 部门 × 角色 一行，统计信息中显示各部门合计
+    createScoreTable({
+        viewport: document.getElementById('mydTable'),
+        filters: document.getElementById('mydFilters'),
+        info: document.getElementById('mydInfo'),
+        columns: () => [
+            {title: '部门', render: r => r.dept_name},
+            {title: '打分角色', render: r => r.role_name},
+            {title: '基础平均分', render: r => formatScore(r.avg_score)},
+            {title: '权重', render: r => formatScore(r.myd_weight)},
+            {title: '加权得分', className: 'weighted-score', render: r => formatScore(r.weighted_score)}
+        ],
+        summary: data => {
+            const totals = Object.entries(data.dept_totals);
+            if (totals.length === 0) return '';
+            return '合计总分：' + totals.map(([dept, total]) => `${dept} ${total.toFixed(2)}`).join('；');
+        }
+    });
+});
@@ -0,0 +1,109 @@
+/* ================= Excel 上传 ================= */
+document.getElementById('uploadForm').addEventListener('submit', function (e) {
+    e.preventDefault();
+
+    runJob('/admin/zdgz/import', new FormData(this), document.getElementById('result'));
+});
+
+/* ================= 权限配置 ================= */
+function enableEdit() {
+    document.querySelectorAll('#permTable input[type="checkbox"]').forEach(cb => {
+        cb.disabled = false;
+    });
+    document.querySelectorAll('#permTable input[data-weight]').forEach(inp => {
+        inp.disabled = false;
+    });
+    document.getElementById('permTable').classList.remove('readonly');
+    document.getElementById('saveBtn').disabled = false;
+}
+
+function save() {
+    const data = [];
+
+    document.querySelectorAll('#permTable tbody tr').forEach(tr => {
+        const roleId = tr.dataset.roleId;
+        const depts = [];
+
+        tr.querySelectorAll('input[type="checkbox"]').forEach(cb => {
+            if (cb.checked) {
+                depts.push(cb.dataset.department);
+            }
+        });
+
+        const weightInput = tr.querySelector('input[data-weight]');
+        const weight = weightInput ? parseFloat(weightInput.value || 0) : 0;
+
+        data.push({
+            role_id: roleId,
+            zdgz_weight: weight,
+            departments: depts
+        });
+    });
+
+    document.getElementById('saveBtn').disabled = true;
+
+    fetch('/admin/zdgz/permission/save', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(data)
+    })
+    .then(res => res.json())
+    .then(resp => {
+        if (resp.error) {
+            alert('保存失败：' + resp.error);
+            document.getElementById('saveBtn').disabled = false;
+            return;
+        }
+
+        alert(resp.msg || '保存成功');
+
+        document.querySelectorAll('#permTable input').forEach(inp => {
+            inp.disabled = true;
+        });
+        document.getElementById('permTable').classList.add('readonly');
+    });
+}
+
+function uploadEvidence(id, input) {
+    const file = input.files[0];
+    if (!file) return;
+
+    const fd = new FormData();
+    fd.append('zdgz_id', id);
+    fd.append('file', file);
+
+    fetch('/admin/zdgz/evidence/upload', {
+        method: 'POST',
+        body: fd
+    })
+    .then(res => res.json())
+    .then(data => {
+        if (data.error) {
+            alert(data.error);
+        } else {
+            alert('上传成功');
+            location.reload();
+        }
+    })
+    .catch(() => alert('上传失败'));
+}
+function toggleWorkDesc(id, el) {
+    const div = document.getElementById('wd-' + id);
+    if (div.classList.contains('expanded')) {
+        div.classList.remove('expanded');
+        el.innerText = '展开';
+    } else {
+        div.classList.add('expanded');
+        el.innerText = '收起';
+    }
+}
+function toggleIndicatorDesc(id, el) {
+    const div = document.getElementById('desc-' + id);
+    if (div.classList.contains('expanded')) {
+        div.classList.remove('expanded');
+        el.innerText = '展开';
+    } else {
+        div.classList.add('expanded');
+        el.innerText = '收起';
+    }
+}
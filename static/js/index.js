@@ -0,0 +1,219 @@
+document.addEventListener('DOMContentLoaded', function () {
+
+    function getTotalZdgzDeptCount() {
+        return document.querySelectorAll('.mb-4.p-3.border.rounded > h5').length;
+    }
+
+    /* ========= 恢复草稿 ========= */
+    const draft = JSON.parse(document.getElementById('draftData').textContent);
+    document.querySelectorAll('.zdgz-select, .satisfaction-select').forEach(sel => {
+        if (draft[sel.name] !== undefined) {
+            sel.value = draft[sel.name];
+        }
+    });
+
+    /* ========= 自动保存草稿（只上报变化的评分项，合并后发送）========= */
+    let draftChanges = {};
+    let draftTimer = null;
+
+    function sendDraft(useBeacon) {
+        clearTimeout(draftTimer);
+        draftTimer = null;
+        if (Object.keys(draftChanges).length === 0) return;
+
+        const body = JSON.stringify({changes: draftChanges});
+        draftChanges = {};
+
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon('/score/draft', new Blob([body], {type: 'application/json'}));
+            return;
+        }
+        fetch('/score/draft', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: body
+        }).catch(() => {
+            // 网络异常时并入下一次发送
+            Object.assign(draftChanges, JSON.parse(body).changes, draftChanges);
+        });
+    }
+
+    document.querySelectorAll('.zdgz-select, .satisfaction-select').forEach(sel => {
+        sel.addEventListener('change', function () {
+            draftChanges[this.name] = this.value;
+            if (!draftTimer) {
+                draftTimer = setTimeout(() => sendDraft(false), 2000);
+            }
+        });
+    });
+
+    window.addEventListener('pagehide', () => sendDraft(true));
+
+    /* ========= 重点工作指标 ========= */
+    const zdgzSelects = document.querySelectorAll('.zdgz-select');
+    const zdgzTotal = zdgzSelects.length;
+    const zdgzMaxExcellent = Math.floor(zdgzTotal * 0.6);
+
+    document.getElementById('maxExcellent').textContent = zdgzMaxExcellent;
+
+    function getZdgzExcellentCount() {
+        let count = 0;
+        zdgzSelects.forEach(sel => {
+            if (parseFloat(sel.value) === 130) count++;
+        });
+        return count;
+    }
+
+    function getExcellentCountByDept() {
+        const deptMap = new Map();
+
+        document.querySelectorAll('.zdgz-select').forEach(sel => {
+            if (parseFloat(sel.value) === 130) {
+                // 找到所属部门容器
+                const deptBox = sel.closest('.mb-4.p-3.border.rounded');
+                if (!deptBox) return;
+
+                const deptName = deptBox.querySelector('h5')?.innerText || '未知部门';
+
+                deptMap.set(deptName, (deptMap.get(deptName) || 0) + 1);
+            }
+        });
+
+        return deptMap;
+    }
+
+    function updateZdgzExcellentLimit() {
+        const count = getZdgzExcellentCount();
+        document.getElementById('currentExcellent').textContent = count;
+
+        const reachLimit = count >= zdgzMaxExcellent;
+        zdgzSelects.forEach(sel => {
+            sel.querySelectorAll('option').forEach(opt => {
+                if (parseFloat(opt.value) === 130) {
+                    opt.disabled = reachLimit && parseFloat(sel.value) !== 130;
+                }
+            });
+        });
+    }
+
+    zdgzSelects.forEach(sel => {
+        sel.addEventListener('change', updateZdgzExcellentLimit);
+    });
+
+    updateZdgzExcellentLimit();
+
+
+    /* ========= 满意度 ========= */
+    const satSelects = document.querySelectorAll('.satisfaction-select');
+    const satTotal = satSelects.length;
+//        const satMaxExcellent = Math.floor(satTotal * 0.6);
+
+//        document.getElementById('maxExcellentSatisfaction').textContent = satMaxExcellent;
+
+    function getSatisfactionExcellentCount() {
+        let count = 0;
+        satSelects.forEach(sel => {
+            if (parseFloat(sel.value) >= 120) count++;
+        });
+        return count;
+    }
+
+//        function updateSatisfactionExcellentLimit() {
+//            const count = getSatisfactionExcellentCount();
+//            document.getElementById('currentExcellentSatisfaction').textContent = count;
+
+//            const reachLimit = count >= satMaxExcellent;
+//            satSelects.forEach(sel => {
+//                sel.querySelectorAll('option').forEach(opt => {
+//                    const score = parseFloat(opt.value);
+//                    if (score >= 120) {
+//                        opt.disabled = reachLimit && parseFloat(sel.value) < 120;
+//                    }
+//                });
+//            });
+//        }
+
+//        satSelects.forEach(sel => {
+//            sel.addEventListener('change', updateSatisfactionExcellentLimit);
+//        });
+
+//        updateSatisfactionExcellentLimit();
+
+    const form = document.querySelector('form');
+
+    form.addEventListener('submit', function (e) {
+
+        const zdgzExcellent = getZdgzExcellentCount();
+        const satExcellent = getSatisfactionExcellentCount();
+        const deptExcellentMap = getExcellentCountByDept();
+
+        const totalDeptCount = getTotalZdgzDeptCount();
+
+        if (totalDeptCount >= 3) {
+            let qualifiedDeptCount = 0;
+            deptExcellentMap.forEach(count => {
+                if (count >= 4) qualifiedDeptCount++;
+            });
+
+            if (qualifiedDeptCount < 2) {
+                e.preventDefault();
+                alert('重点工作指标评分要求：当可评分部门不少于 3 个时，至少需有 2 个部门，每个部门评出不少于 4 项“优秀”。');
+                return;
+            }
+        }
+
+        if (zdgzExcellent > zdgzMaxExcellent) {
+            e.preventDefault();
+            alert(`重点工作指标“优秀”数量超出限制（最多 ${zdgzMaxExcellent} 项），请调整后再提交。`);
+            return;
+        }
+
+//            if (satExcellent > satMaxExcellent) {
+//                e.preventDefault();
+//                alert(`满意度评分“优秀”数量超出限制（最多 ${satMaxExcellent} 个部门），请调整后再提交。`);
+//                return;
+//            }
+
+        e.preventDefault();
+        if (!submitBtn.disabled) {
+            submitBallot(1);
+        }
+    });
+
+    /* ========= 提交（服务器繁忙返回 503 时按 Retry-After 自动重试）========= */
+    const submitBtn = form.querySelector('button[type="submit"]');
+    const submitText = submitBtn.innerHTML;
+    const maxSubmitAttempts = 10;
+
+    function submitBallot(attempt) {
+        submitBtn.disabled = true;
+        fetch(form.action, {
+            method: 'POST',
+            headers: {'Accept': 'text/html'},
+            body: new FormData(form)
+        }).then(resp => {
+            if (resp.status === 503 && attempt < maxSubmitAttempts) {
+                // 加随机抖动，避免被拒绝的提交同时重试
+                const retryAfter = parseFloat(resp.headers.get('Retry-After')) || 2;
+                const delay = retryAfter * 1000 * (1 + Math.random());
+                submitBtn.textContent = `提交人数较多，${Math.ceil(delay / 1000)} 秒后自动重试…`;
+                setTimeout(() => submitBallot(attempt + 1), delay);
+                return;
+            }
+            if (resp.redirected) {
+                window.location.href = resp.url;
+                return;
+            }
+            return resp.text().then(html => {
+                document.open();
+                document.write(html);
+                document.close();
+            });
+        }).catch(() => {
+            // 网络异常时恢复按钮，由用户重新提交
+            submitBtn.disabled = false;
+            submitBtn.innerHTML = submitText;
+            alert('网络异常，提交失败，请稍后重新提交。');
+        });
+    }
+});
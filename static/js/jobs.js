@@ -0,0 +1,117 @@
+/* ================= 后台任务提交与轮询 ================= */
+
+/**
+ * 轮询任务状态直至完成或失败
+ * @param {string} jobId 任务ID
+ * @param {function} onProgress 进度回调 onProgress(status)
+ * @returns {Promise<object>} 完成时的任务状态；失败时 reject 错误信息
+ */
+function pollJob(jobId, onProgress) {
+    return new Promise((resolve, reject) => {
+        let delay = 500;
+
+        const tick = () => {
+            fetch(`/admin/jobs/${jobId}`, {cache: 'no-store'})
+                .then(res => res.json())
+                .then(status => {
+                    if (status.error && !status.state) {
+                        reject(status.error);
+                        return;
+                    }
+                    if (onProgress) {
+                        onProgress(status);
+                    }
+                    if (status.state === 'done') {
+                        resolve(status);
+                    } else if (status.state === 'failed') {
+                        reject(status.error || '任务执行失败');
+                    } else {
+                        delay = Math.min(delay * 1.5, 3000);
+                        setTimeout(tick, delay);
+                    }
+                })
+                .catch(() => {
+                    // 网络抖动时继续轮询
+                    delay = Math.min(delay * 2, 5000);
+                    setTimeout(tick, delay);
+                });
+        };
+
+        tick();
+    });
+}
+
+/**
+ * 提交任务并轮询，在容器中显示进度与结果；有结果文件时自动下载
+ * @param {string} url 提交地址
+ * @param {FormData|null} body 表单数据
+ * @param {HTMLElement} container 显示进度的容器
+ * @returns {Promise<object|null>} 完成时的任务状态；失败时为 null
+ */
+function runJob(url, body, container) {
+    container.innerHTML = '<div class="alert alert-info">任务已提交，请稍候…</div>';
+
+    return fetch(url, {method: 'POST', body: body})
+        .then(res => res.json())
+        .then(data => {
+            if (data.download_url && !data.job_id) {
+                // 结果已缓存，无需排队
+                return {message: '已完成', download_url: data.download_url};
+            }
+            if (!data.job_id) {
+                throw data.error || '提交失败';
+            }
+            return pollJob(data.job_id, status => showJobProgress(container, status));
+        })
+        .then(status => {
+            showJobAlert(container, 'success', status.message || '已完成');
+            if (status.download_url) {
+                window.location.href = status.download_url;
+            }
+            return status;
+        })
+        .catch(error => {
+            showJobAlert(container, 'danger', typeof error === 'string' ? error : '请求失败');
+            return null;
+        });
+}
+
+/**
+ * 在容器中显示提示；任务消息、错误信息来自服务端，按纯文本显示
+ * @param {HTMLElement} container 容器
+ * @param {string} type 提示类型（success / danger / info）
+ * @param {string} text 提示文字
+ */
+function showJobAlert(container, type, text) {
+    const box = document.createElement('div');
+    box.className = `alert alert-${type}`;
+    box.textContent = text;
+    container.replaceChildren(box);
+}
+
+/**
+ * 在容器中显示任务进度（消息按纯文本显示）
+ * @param {HTMLElement} container 容器
+ * @param {object} status 任务状态
+ */
+function showJobProgress(container, status) {
+    const progress = status.progress || {};
+    const message = progress.message || (status.state === 'queued' ? '排队中' : '处理中');
+    let percent = 100;
+    let text = message;
+
+    if (progress.total) {
+        percent = Math.floor(progress.done * 100 / progress.total);
+        text = `${message}（${progress.done} / ${progress.total}）`;
+    }
+
+    const animated = progress.total ? '' : ' progress-bar-striped progress-bar-animated';
+    container.innerHTML = `
+        <div class="alert alert-info mb-0">
+            <div class="mb-2 job-progress-text"></div>
+            <div class="progress">
+                <div class="progress-bar${animated}" role="progressbar" style="width: ${percent}%"></div>
+            </div>
+        </div>`;
+    container.querySelector('.job-progress-text').textContent = text;
+}
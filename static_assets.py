@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from flask import request, send_from_directory
+
+logger = logging.getLogger(__name__)
+
+
+class StaticAssets:
+    """
+    构建后静态资源的引用与发送
+
+    功能:
+    - url_for('static', filename=...) 自动替换为 build_static.py 生成的带指纹文件名
+    - 带指纹的文件按 Accept-Encoding 发送预压缩的 .br / .gz 版本，并设置永久缓存
+    - 未构建（无 manifest）或文件不在 manifest 中时，沿用 Flask 默认的静态文件处理
+    - 源文件在构建后被修改（哈希与 manifest 记录不一致）的条目不使用，直接发送源文件
+
+    部署在 nginx 之后时，也可由 nginx 直接提供 static/dist（gzip_static / brotli_static）
+    """
+
+    def __init__(self, app=None, enabled=True, max_age=31536000):
+        self.enabled = enabled
+        self.max_age = max_age
+        self.manifest = {}
+        self._built = set()
+        self._default_view = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.static_folder = app.static_folder
+        self.load_manifest()
+
+        self._default_view = app.view_functions['static']
+        app.view_functions['static'] = self.send_static
+        app.url_defaults(self._url_defaults)
+
+    def load_manifest(self):
+        """
+        读取 static/dist/manifest.json，跳过源文件已变化的条目
+        """
+        path = os.path.join(self.static_folder, 'dist', 'manifest.json')
+        self.manifest = {}
+        self._built = set()
+        if not self.enabled or not os.path.exists(path):
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+
+        stale = []
+        for source, entry in entries.items():
+            # 旧格式（只有构建后路径）无法校验，视为过期
+            if not isinstance(entry, dict) or self._source_hash(source) != entry.get('source'):
+                stale.append(source)
+                continue
+            self.manifest[source] = entry['file']
+        self._built = set(self.manifest.values())
+
+        if stale:
+            logger.warning('以下静态文件在构建后已修改，使用源文件（请重新运行 build_static.py）: %s',
+                           ', '.join(stale))
+
+    def _source_hash(self, source):
+        try:
+            with open(os.path.join(self.static_folder, source), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()[:16]
+        except OSError:
+            return None
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint != 'static':
+            return
+        hashed = self.manifest.get(values.get('filename'))
+        if hashed:
+            values['filename'] = hashed
+
+    def send_static(self, filename):
+        if filename not in self._built:
+            return self._default_view(filename=filename)
+
+        # 按客户端支持的编码选择预压缩版本
+        path = filename
+        encoding = None
+        accept = request.accept_encodings
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accept.quality(candidate) > 0 and os.path.exists(os.path.join(self.static_folder, filename + suffix)):
+                path = filename + suffix
+                encoding = candidate
+                break
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(self.static_folder, path, mimetype=mimetype, max_age=self.max_age)
+        response.headers['Cache-Control'] = f'public, max-age={self.max_age}, immutable'
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,141 @@
+from database import db
+
+
+def iter_zdgz_rows(file):
+    """
+    逐行读取重点工作指标 Excel（只读模式，内存占用与文件大小无关）
+
+    - Excel 第一行是表头，数据从 A2 开始
+    - A: 部门（合并单元格时沿用上一行部门）
+    - B: 绩效指标
+    - C: 指标含义
+    - D: 完成情况（1-1000字）
+
+    Args:
+        file: 文件路径或文件对象
+
+    Yields:
+        dict: {'department', 'indicator_name', 'description', 'work_desc'}
+
+    Raises:
+        ValueError: 数据不符合要求，异常信息可直接展示给用户
+    """
+    # openpyxl 较重，仅导入时加载，评价人访问的进程无需承担
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file, read_only=True)
+    try:
+        sheet = wb.active
+        current_department = None
+
+        # 从第 2 行开始读取（跳过表头）
+        for row, values in enumerate(sheet.iter_rows(min_row=2, max_col=4, values_only=True), start=2):
+            department, indicator_name, description, work_desc = (tuple(values) + (None,) * 4)[:4]
+            if department:
+                current_department = str(department).strip()
+
+            # B、C、D 都为空，认为到末尾
+            if not indicator_name and not description and not work_desc:
+                break
+
+            # 基础清洗
+            indicator_name = db.clean_text(indicator_name) if indicator_name else None
+            description = db.clean_text(description) if description else "无指标含义"
+            work_desc = db.clean_text(work_desc)
+
+            # 完成情况字数校验
+            if work_desc:
+                length = len(work_desc)
+                if length < 1 or length > 1000:
+                    raise ValueError(f'第 {row} 行完成情况字数为 {length}，需在 1–1000 字之间')
+
+            yield {
+                'department': current_department,
+                'indicator_name': indicator_name,
+                'description': description,
+                'work_desc': work_desc
+            }
+    finally:
+        wb.close()
+
+
+def parse_zdgz_workbook(file):
+    """
+    解析重点工作指标 Excel（格式见 iter_zdgz_rows）
+
+    Args:
+        file: 文件路径或文件对象
+
+    Returns:
+        list: [{'department', 'indicator_name', 'description', 'work_desc'}, ...]
+
+    Raises:
+        ValueError: 数据不符合要求，异常信息可直接展示给用户
+    """
+    rows = list(iter_zdgz_rows(file))
+    if not rows:
+        raise ValueError('Excel 中未读取到任何指标数据')
+
+    return rows
+
+
+def replace_zdgz(rows, progress=None, batch_size=1000):
+    """
+    用新数据整体替换重点工作指标（单个事务）
+
+    - 按 batch_size 分批插入，rows 可以是 iter_zdgz_rows 的生成器，边读边写
+    - 任一行出错时回滚，原有指标保持不变
+
+    Args:
+        rows: parse_zdgz_workbook / iter_zdgz_rows 的返回值
+        progress: 进度回调 progress(已写入数量)
+        batch_size: 每批插入条数
+
+    Returns:
+        int: 插入条数
+
+    Raises:
+        ValueError: 数据不符合要求或没有任何数据
+    """
+    sql = """
+        INSERT INTO zdgz (
+            department,
+            indicator_name,
+            description,
+            work_desc
+        )
+        VALUES (%s, %s, %s, %s)
+    """
+    count = 0
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # 清空旧数据
+            cursor.execute("DELETE FROM zdgz")
+
+            # 分批插入新数据
+            batch = []
+            for r in rows:
+                batch.append((r['department'], r['indicator_name'], r['description'], r['work_desc']))
+                if len(batch) >= batch_size:
+                    cursor.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+                    if progress:
+                        progress(count)
+            if batch:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                if progress:
+                    progress(count)
+
+            if not count:
+                raise ValueError('Excel 中未读取到任何指标数据')
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    db.ref_cache.bump('zdgz')
+    return count
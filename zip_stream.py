@@ -0,0 +1,111 @@
+import os
+import time
+import zipfile
+from contextlib import closing
+
+# 本身已压缩的格式，以 ZIP_STORED 原样存入，不再重复压缩
+STORED_EXT = {'.pdf', '.zip', '.xlsx', '.docx', '.pptx', '.rar', '.7z', '.gz', '.jpg', '.jpeg', '.png'}
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _StreamBuffer:
+    """
+    只写、不可 seek 的缓冲区
+
+    zipfile 检测到输出不可 seek 时，各条目改用数据描述符（data descriptor）在文件内容之后
+    写入 CRC 与大小，因此可以边读边输出，无需回写本地文件头
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _compress_type(name):
+    if os.path.splitext(name)[1].lower() in STORED_EXT:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def zip_stream(entries, chunk_size=CHUNK_SIZE):
+    """
+    流式生成 ZIP 文件
+
+    功能:
+    - 逐个读取文件、逐块输出，内存占用与文件总大小无关，第一块数据立即可发送
+    - PDF、ZIP、xlsx 等已压缩格式原样存储，其余文件 deflate 压缩
+    - 文件不存在时跳过，并在压缩包末尾附带“缺失文件.txt”说明
+    - entries 可以是生成器，条目在需要时才读取或生成
+
+    Args:
+        entries: 可迭代的 (压缩包内路径, 来源)，来源为文件绝对路径、文件内容 bytes，
+                 或返回可读文件对象的无参函数（如对象存储中的文件，不存在时抛出 FileNotFoundError）
+        chunk_size: 每次读取的字节数
+
+    Yields:
+        bytes: ZIP 数据块
+    """
+    buffer = _StreamBuffer()
+    missing = []
+
+    with zipfile.ZipFile(buffer, 'w', allowZip64=True) as zf:
+        for arcname, path in entries:
+            if isinstance(path, (bytes, bytearray)):
+                info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.compress_type = _compress_type(arcname)
+                zf.writestr(info, path)
+                yield buffer.drain()
+                continue
+
+            if callable(path):
+                try:
+                    src = path()
+                except FileNotFoundError:
+                    missing.append(arcname)
+                    continue
+                info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+                info.external_attr = 0o644 << 16
+                # 大小未知（如对象存储中的文件）：预留 ZIP64 字段，超过 2 GiB 时不会在发送途中失败
+                force_zip64 = True
+            elif os.path.isfile(path):
+                info = zipfile.ZipInfo.from_file(path, arcname)
+                src = open(path, 'rb')
+                force_zip64 = False
+            else:
+                missing.append(arcname)
+                continue
+
+            info.compress_type = _compress_type(arcname)
+
+            with closing(src), zf.open(info, 'w', force_zip64=force_zip64) as dest:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dest.write(block)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+        if missing:
+            zf.writestr('缺失文件.txt', '以下佐证材料文件不存在：\n' + '\n'.join(missing) + '\n')
+
+    # 中央目录在关闭时写入
+    yield buffer.drain()